@@ -1,202 +1,239 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Load dataset
-df = pd.read_csv('datasets/restaurant_dataset_cleaned.csv')
-
-print("=== ANALISIS DATASET RESTAURANT UNTUK PROJECT AI BUSINESS IMPACT PREDICTOR ===")
-print()
-
-# 1. Basic Information
-print("1. INFORMASI DASAR DATASET")
-print("-" * 50)
-print(f"Jumlah baris: {len(df):,}")
-print(f"Jumlah kolom: {len(df.columns)}")
-print(f"Ukuran dataset: {df.shape}")
-print(f"Memory usage: {df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
-print()
-
-# 2. Data Quality Assessment
-print("2. KUALITAS DATA")
-print("-" * 50)
-print("Missing values per kolom:")
-missing_data = df.isnull().sum()
-missing_percentage = (missing_data / len(df) * 100).round(2)
-for col in df.columns:
-    if missing_data[col] > 0:
-        print(f"  {col}: {missing_data[col]:,} ({missing_percentage[col]}%)")
+"""
+Analisis dataset restoran untuk project AI Business Impact Predictor.
+
+Semua statistik dihitung oleh dataset_profile.profile_dataset dalam satu kali
+baca per chunk, sehingga dataset yang lebih besar dari memori tetap bisa
+dianalisis. Laporan dicetak sebagai teks dan bisa disimpan sebagai JSON.
+
+Usage:
+    python analyze_restaurant_dataset.py
+    python analyze_restaurant_dataset.py datasets/competition_ready_dataset.csv --json results/profile.json
+"""
+
+import argparse
+import os
+
+from dataset_profile import DEFAULT_CHUNK_SIZE, DEFAULT_TARGET, profile_dataset, report_to_json
+from dataset_store import DATASETS
+
+DEFAULT_INPUT = DATASETS['restaurant_cleaned']
+
+DEMOGRAPHIC_FEATURES = ['Jumlah Penduduk', 'Luas Wilayah (km²)', 'Kepadatan (jiwa/km²)']
+BUSINESS_FEATURES = ['jumlah_mall', 'jumlah_minimarket', 'jumlah_taman']
+
+
+def print_feature_stats(title, features, columns):
+    print(title)
+    for feature in features:
+        if feature in columns:
+            column = columns[feature]
+            print(f"  {feature}:")
+            print(f"    Range: {column['min']:.2f} - {column['max']:.2f}")
+            print(f"    Mean: {column['mean']:.2f}")
+            print(f"    Unique values: {column['distinct_at_least']}")
+    print()
+
+
+def assess_usefulness(report):
+    """Skor kegunaan dataset (maks 10) beserta catatan tiap kriteria"""
+    columns = report['columns']
+    rows = report['rows']
+    score = 0
+    checks = []
+
+    target = columns.get(DEFAULT_TARGET)
+    if target is not None and rows and (rows - target['missing']) / rows >= 0.7:
+        score += 3
+        checks.append("✓ Target variable (rating) coverage: BAIK (≥70%)")
+    else:
+        score += 1
+        checks.append("⚠ Target variable (rating) coverage: KURANG (<70%)")
+
+    if len(report['numeric_columns']) >= 5:
+        score += 2
+        checks.append("✓ Feature diversity: BAIK (≥5 numeric features)")
+    else:
+        score += 1
+        checks.append("⚠ Feature diversity: CUKUP (<5 numeric features)")
+
+    kecamatan = columns.get('kecamatan')
+    if kecamatan is not None and kecamatan['distinct_at_least'] >= 15:
+        score += 2
+        checks.append("✓ Geographic coverage: BAIK (≥15 kecamatan)")
+    else:
+        score += 1
+        checks.append("⚠ Geographic coverage: TERBATAS (<15 kecamatan)")
+
+    if rows >= 1000:
+        score += 2
+        checks.append("✓ Sample size: SANGAT BAIK (≥1000 samples)")
+    elif rows >= 500:
+        score += 1
+        checks.append("✓ Sample size: BAIK (≥500 samples)")
+    else:
+        checks.append("⚠ Sample size: KURANG (<500 samples)")
+
+    completeness = report['completeness_pct']
+    if completeness >= 80:
+        score += 1
+        checks.append(f"✓ Data completeness: BAIK ({completeness:.1f}%)")
+    else:
+        checks.append(f"⚠ Data completeness: KURANG ({completeness:.1f}%)")
+
+    if score >= 8:
+        recommendation = "SANGAT BERGUNA - Dataset ini sangat cocok untuk project AI business impact predictor"
+    elif score >= 6:
+        recommendation = "BERGUNA - Dataset ini dapat digunakan dengan beberapa penyesuaian"
+    elif score >= 4:
+        recommendation = "CUKUP BERGUNA - Perlu preprocessing tambahan dan feature engineering"
     else:
-        print(f"  {col}: Complete ✓")
-print()
-
-# 3. Target Variable Analysis (google_rating)
-print("3. ANALISIS TARGET VARIABLE (google_rating)")
-print("-" * 50)
-valid_ratings = df['google_rating'].dropna()
-print(f"Data rating yang valid: {len(valid_ratings):,} dari {len(df):,} ({len(valid_ratings)/len(df)*100:.1f}%)")
-print(f"Range rating: {valid_ratings.min():.1f} - {valid_ratings.max():.1f}")
-print(f"Mean rating: {valid_ratings.mean():.2f}")
-print(f"Median rating: {valid_ratings.median():.2f}")
-print(f"Standard deviation: {valid_ratings.std():.2f}")
-print()
-
-# Rating distribution
-rating_dist = valid_ratings.value_counts().sort_index()
-print("Distribusi rating:")
-for rating, count in rating_dist.head(10).items():
-    print(f"  {rating:.1f}: {count:,} restoran ({count/len(valid_ratings)*100:.1f}%)")
-print()
-
-# 4. Feature Analysis
-print("4. ANALISIS FITUR PREDIKTIF")
-print("-" * 50)
-
-# Demographic features
-demographic_features = ['Jumlah Penduduk', 'Luas Wilayah (km²)', 'Kepadatan (jiwa/km²)']
-print("Fitur Demografis:")
-for feature in demographic_features:
-    if feature in df.columns:
-        values = df[feature].dropna()
-        print(f"  {feature}:")
-        print(f"    Range: {values.min():.2f} - {values.max():.2f}")
-        print(f"    Mean: {values.mean():.2f}")
-        print(f"    Unique values: {values.nunique()}")
-print()
-
-# Business environment features
-business_features = ['jumlah_mall', 'jumlah_minimarket', 'jumlah_taman']
-print("Fitur Lingkungan Bisnis:")
-for feature in business_features:
-    if feature in df.columns:
-        values = df[feature].dropna()
-        print(f"  {feature}:")
-        print(f"    Range: {values.min():.2f} - {values.max():.2f}")
-        print(f"    Mean: {values.mean():.2f}")
-        print(f"    Unique values: {values.nunique()}")
-print()
-
-# 5. Geographic Coverage
-print("5. CAKUPAN GEOGRAFIS")
-print("-" * 50)
-kecamatan_stats = df['kecamatan'].value_counts()
-print(f"Total kecamatan: {df['kecamatan'].nunique()}")
-print(f"Kecamatan dengan restoran terbanyak:")
-for kec, count in kecamatan_stats.head(5).items():
-    print(f"  {kec}: {count:,} restoran")
-print()
-print(f"Kecamatan dengan restoran tersedikit:")
-for kec, count in kecamatan_stats.tail(5).items():
-    print(f"  {kec}: {count:,} restoran")
-print()
-
-# 6. Business Status Analysis
-print("6. ANALISIS STATUS BISNIS")
-print("-" * 50)
-business_status = df['business_status'].value_counts()
-for status, count in business_status.items():
-    print(f"  {status}: {count:,} ({count/len(df)*100:.1f}%)")
-print()
-
-# 7. Price Range Analysis
-print("7. ANALISIS RENTANG HARGA")
-print("-" * 50)
-price_data = df['price_range_rupiah'].dropna()
-print(f"Data harga tersedia: {len(price_data):,} dari {len(df):,} ({len(price_data)/len(df)*100:.1f}%)")
-if len(price_data) > 0:
-    price_dist = price_data.value_counts()
-    print("Distribusi rentang harga:")
-    for price, count in price_dist.head(5).items():
-        print(f"  {price}: {count:,} ({count/len(price_data)*100:.1f}%)")
-print()
-
-# 8. Correlation Analysis
-print("8. ANALISIS KORELASI DENGAN TARGET")
-print("-" * 50)
-numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
-if 'google_rating' in numeric_columns:
-    correlations = df[numeric_columns].corr()['google_rating'].abs().sort_values(ascending=False)
-    print("Korelasi absolut dengan google_rating:")
-    for feature, corr in correlations.items():
-        if feature != 'google_rating' and not pd.isna(corr):
-            print(f"  {feature}: {corr:.3f}")
-print()
-
-# 9. Data Usefulness Assessment
-print("9. PENILAIAN KEGUNAAN DATA UNTUK PROJECT")
-print("-" * 50)
-
-usefulness_score = 0
-max_score = 10
-
-# Check target variable quality
-if df['google_rating'].notna().sum() / len(df) >= 0.7:
-    usefulness_score += 3
-    print("✓ Target variable (rating) coverage: BAIK (≥70%)")
-else:
-    usefulness_score += 1
-    print("⚠ Target variable (rating) coverage: KURANG (<70%)")
-
-# Check feature diversity
-if len(numeric_columns) >= 5:
-    usefulness_score += 2
-    print("✓ Feature diversity: BAIK (≥5 numeric features)")
-else:
-    usefulness_score += 1
-    print("⚠ Feature diversity: CUKUP (<5 numeric features)")
-
-# Check geographic coverage
-if df['kecamatan'].nunique() >= 15:
-    usefulness_score += 2
-    print("✓ Geographic coverage: BAIK (≥15 kecamatan)")
-else:
-    usefulness_score += 1
-    print("⚠ Geographic coverage: TERBATAS (<15 kecamatan)")
-
-# Check sample size
-if len(df) >= 1000:
-    usefulness_score += 2
-    print("✓ Sample size: SANGAT BAIK (≥1000 samples)")
-elif len(df) >= 500:
-    usefulness_score += 1
-    print("✓ Sample size: BAIK (≥500 samples)")
-else:
-    print("⚠ Sample size: KURANG (<500 samples)")
-
-# Check data completeness
-completeness = (df.notna().sum().sum() / (len(df) * len(df.columns))) * 100
-if completeness >= 80:
-    usefulness_score += 1
-    print(f"✓ Data completeness: BAIK ({completeness:.1f}%)")
-else:
-    print(f"⚠ Data completeness: KURANG ({completeness:.1f}%)")
-
-print()
-print(f"SKOR KEGUNAAN: {usefulness_score}/{max_score}")
-
-if usefulness_score >= 8:
-    recommendation = "SANGAT BERGUNA - Dataset ini sangat cocok untuk project AI business impact predictor"
-elif usefulness_score >= 6:
-    recommendation = "BERGUNA - Dataset ini dapat digunakan dengan beberapa penyesuaian"
-elif usefulness_score >= 4:
-    recommendation = "CUKUP BERGUNA - Perlu preprocessing tambahan dan feature engineering"
-else:
-    recommendation = "KURANG BERGUNA - Perlu perbaikan signifikan atau data tambahan"
-
-print(f"REKOMENDASI: {recommendation}")
-
-print()
-print("10. REKOMENDASI PENGGUNAAN")
-print("-" * 50)
-print("Untuk project AI Business Impact Predictor, dataset ini dapat digunakan untuk:")
-print("• Prediksi rating restoran berdasarkan lokasi dan lingkungan bisnis")
-print("• Analisis dampak fasilitas publik (mall, minimarket, taman) terhadap performa bisnis")
-print("• Identifikasi lokasi optimal untuk membuka restoran baru")
-print("• Analisis kompetisi restoran per kecamatan")
-print()
-print("Perbaikan yang disarankan:")
-print("• Lengkapi data price_range yang masih banyak missing")
-print("• Tambahkan fitur seperti kategori makanan, jam operasi, fasilitas")
-print("• Normalisasi data rating untuk mengatasi outlier")
-print("• Feature engineering untuk membuat fitur kompetisi dan density")
+        recommendation = "KURANG BERGUNA - Perlu perbaikan signifikan atau data tambahan"
+
+    return {'score': score, 'max_score': 10, 'checks': checks, 'recommendation': recommendation}
+
+
+def print_report(report):
+    """Cetak laporan teks dari hasil profile_dataset"""
+    columns = report['columns']
+    rows = report['rows']
+
+    print("=== ANALISIS DATASET RESTAURANT UNTUK PROJECT AI BUSINESS IMPACT PREDICTOR ===")
+    print()
+
+    # 1. Basic Information
+    print("1. INFORMASI DASAR DATASET")
+    print("-" * 50)
+    print(f"Jumlah baris: {rows:,}")
+    print(f"Jumlah kolom: {len(columns)}")
+    print(f"Ukuran dataset: {(rows, len(columns))}")
+    print(f"Memory usage: {report['memory_bytes'] / 1024**2:.2f} MB")
+    print()
+
+    # 2. Data Quality Assessment
+    print("2. KUALITAS DATA")
+    print("-" * 50)
+    print("Missing values per kolom:")
+    for name, column in columns.items():
+        if column['missing'] > 0:
+            print(f"  {name}: {column['missing']:,} ({round(column['missing_pct'], 2)}%)")
+        else:
+            print(f"  {name}: Complete ✓")
+    print()
+
+    # 3. Target Variable Analysis (google_rating)
+    target = columns.get(DEFAULT_TARGET)
+    if target is not None and target['kind'] == 'numeric':
+        print(f"3. ANALISIS TARGET VARIABLE ({DEFAULT_TARGET})")
+        print("-" * 50)
+        valid = rows - target['missing']
+        print(f"Data rating yang valid: {valid:,} dari {rows:,} ({valid/rows*100:.1f}%)")
+        print(f"Range rating: {target['min']:.1f} - {target['max']:.1f}")
+        print(f"Mean rating: {target['mean']:.2f}")
+        print(f"Median rating: {target['quantiles']['0.5']:.2f}")
+        print(f"Standard deviation: {target['std']:.2f}")
+        print()
+
+        if 'lowest_values' in target:
+            print("Distribusi rating:")
+            for rating, count in target['lowest_values']:
+                print(f"  {rating:.1f}: {count:,} restoran ({count/valid*100:.1f}%)")
+            print()
+
+    # 4. Feature Analysis
+    print("4. ANALISIS FITUR PREDIKTIF")
+    print("-" * 50)
+    print_feature_stats("Fitur Demografis:", DEMOGRAPHIC_FEATURES, columns)
+    print_feature_stats("Fitur Lingkungan Bisnis:", BUSINESS_FEATURES, columns)
+
+    # 5. Geographic Coverage
+    if 'kecamatan' in columns:
+        kecamatan = columns['kecamatan']
+        print("5. CAKUPAN GEOGRAFIS")
+        print("-" * 50)
+        print(f"Total kecamatan: {kecamatan['distinct_at_least']}")
+        print(f"Kecamatan dengan restoran terbanyak:")
+        for kec, count in kecamatan.get('top_values', [])[:5]:
+            print(f"  {kec}: {count:,} restoran")
+        print()
+        print(f"Kecamatan dengan restoran tersedikit:")
+        for kec, count in kecamatan.get('bottom_values', []):
+            print(f"  {kec}: {count:,} restoran")
+        print()
+
+    # 6. Business Status Analysis
+    if 'business_status' in columns:
+        print("6. ANALISIS STATUS BISNIS")
+        print("-" * 50)
+        for status, count in columns['business_status'].get('top_values', []):
+            print(f"  {status}: {count:,} ({count/rows*100:.1f}%)")
+        print()
+
+    # 7. Price Range Analysis
+    if 'price_range_rupiah' in columns:
+        price = columns['price_range_rupiah']
+        print("7. ANALISIS RENTANG HARGA")
+        print("-" * 50)
+        price_count = rows - price['missing']
+        print(f"Data harga tersedia: {price_count:,} dari {rows:,} ({price_count/rows*100:.1f}%)")
+        if price_count > 0:
+            print("Distribusi rentang harga:")
+            for price_range, count in price.get('top_values', [])[:5]:
+                print(f"  {price_range}: {count:,} ({count/price_count*100:.1f}%)")
+        print()
+
+    # 8. Correlation Analysis
+    print("8. ANALISIS KORELASI DENGAN TARGET")
+    print("-" * 50)
+    if report['target'] is not None:
+        print(f"Korelasi absolut dengan {DEFAULT_TARGET}:")
+        for feature, corr in report['correlations'].items():
+            print(f"  {feature}: {abs(corr):.3f}")
+    print()
+
+    # 9. Data Usefulness Assessment
+    print("9. PENILAIAN KEGUNAAN DATA UNTUK PROJECT")
+    print("-" * 50)
+    usefulness = report.get('usefulness') or assess_usefulness(report)
+    for check in usefulness['checks']:
+        print(check)
+    print()
+    print(f"SKOR KEGUNAAN: {usefulness['score']}/{usefulness['max_score']}")
+    print(f"REKOMENDASI: {usefulness['recommendation']}")
+
+    print()
+    print("10. REKOMENDASI PENGGUNAAN")
+    print("-" * 50)
+    print("Untuk project AI Business Impact Predictor, dataset ini dapat digunakan untuk:")
+    print("• Prediksi rating restoran berdasarkan lokasi dan lingkungan bisnis")
+    print("• Analisis dampak fasilitas publik (mall, minimarket, taman) terhadap performa bisnis")
+    print("• Identifikasi lokasi optimal untuk membuka restoran baru")
+    print("• Analisis kompetisi restoran per kecamatan")
+    print()
+    print("Perbaikan yang disarankan:")
+    print("• Lengkapi data price_range yang masih banyak missing")
+    print("• Tambahkan fitur seperti kategori makanan, jam operasi, fasilitas")
+    print("• Normalisasi data rating untuk mengatasi outlier")
+    print("• Feature engineering untuk membuat fitur kompetisi dan density")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profil dataset restoran (satu kali baca, per chunk)")
+    parser.add_argument('input_file', nargs='?', default=DEFAULT_INPUT, help="File CSV atau Parquet")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Baris per chunk (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--json', help="Simpan laporan terstruktur ke file JSON")
+    args = parser.parse_args(argv)
+
+    report = profile_dataset(args.input_file, chunk_size=args.chunk_size)
+    report['usefulness'] = assess_usefulness(report)
+    print_report(report)
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            f.write(report_to_json(report))
+        print(f"\n💾 Laporan JSON disimpan ke: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Persistent SQLite cache for Google Maps API responses.
+
+get_rating_API.py and get_address_taman_full.py re-run the same Places and
+Geocoding queries on every enrichment run. CachedMapsClient wraps a
+googlemaps-style client and stores each response keyed by endpoint and
+normalized request parameters, so later runs only spend quota on new
+queries. Empty responses ("Not Found") are cached too, with a shorter TTL.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+DEFAULT_CACHE_PATH = './datasets/google_maps_cache.sqlite'
+
+# Google allows caching Places content for up to 30 days
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_NEGATIVE_TTL_SECONDS = 7 * 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    endpoint   TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    response   TEXT NOT NULL,
+    negative   INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (endpoint, key)
+)
+"""
+
+
+def normalize_query(text):
+    """Case-, whitespace- and unicode-insensitive form of a query string."""
+    text = unicodedata.normalize('NFKC', str(text)).lower()
+    text = re.sub(r'\s*,\s*', ', ', text)
+    return re.sub(r'\s+', ' ', text).strip(' ,')
+
+
+def make_key(params):
+    """Stable key for request parameters; string values are normalized."""
+    normalized = {}
+    for name, value in params.items():
+        if isinstance(value, str):
+            value = normalize_query(value)
+        elif isinstance(value, (list, tuple)):
+            value = sorted(str(item) for item in value)
+        normalized[name] = value
+    return json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+
+
+class ResponseCache:
+    """
+    Thread-safe SQLite response store with TTLs and hit statistics.
+
+    Args:
+        path: SQLite file (created if missing); ':memory:' for a throwaway cache.
+        ttl: Seconds a positive response stays valid (None = forever).
+        negative_ttl: Seconds an empty response stays valid (None = forever).
+        clock: Wall-clock time source (injectable for tests).
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL_SECONDS,
+                 negative_ttl=DEFAULT_NEGATIVE_TTL_SECONDS, clock=time.time):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.stores = 0
+
+    def get(self, endpoint, params):
+        """Return (True, response) for a valid cached entry, else (False, None)."""
+        key = make_key(params)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT response, negative, expires_at FROM responses WHERE endpoint = ? AND key = ?',
+                (endpoint, key)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+            response, negative, expires_at = row
+            if expires_at is not None and expires_at <= self._clock():
+                self._conn.execute('DELETE FROM responses WHERE endpoint = ? AND key = ?', (endpoint, key))
+                self._conn.commit()
+                self.expired += 1
+                self.misses += 1
+                return False, None
+            if negative:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, json.loads(response)
+
+    def put(self, endpoint, params, response, negative=False):
+        """Store a response; negative entries use negative_ttl."""
+        ttl = self.negative_ttl if negative else self.ttl
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                (endpoint, make_key(params), json.dumps(response, ensure_ascii=False), int(negative), now,
+                 None if ttl is None else now + ttl)
+            )
+            self._conn.commit()
+            self.stores += 1
+
+    def purge_expired(self):
+        """Delete expired entries; returns the number removed."""
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?',
+                                        (self._clock(),))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                'size': size,
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'stores': self.stores,
+                'hit_rate': (self.hits + self.negative_hits) / lookups if lookups else 0.0
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _is_empty(endpoint, response):
+    """True for 'Not Found' responses of the supported endpoints."""
+    if endpoint == 'geocode':
+        return not response
+    if endpoint == 'places':
+        return not response.get('results')
+    if endpoint == 'place':
+        return not response.get('result')
+    return False
+
+
+class CachedMapsClient:
+    """
+    googlemaps-style client (places, place, geocode) backed by a ResponseCache.
+
+    Only misses reach the wrapped client; errors are never cached.
+    `requests` counts the calls that reached it (network requests).
+    """
+
+    def __init__(self, client, cache):
+        self.client = client
+        self.cache = cache
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _call(self, endpoint, params):
+        found, response = self.cache.get(endpoint, params)
+        if found:
+            return response
+        with self._lock:
+            self.requests += 1
+        response = getattr(self.client, endpoint)(**params)
+        self.cache.put(endpoint, params, response, negative=_is_empty(endpoint, response))
+        return response
+
+    def places(self, **kwargs):
+        return self._call('places', kwargs)
+
+    def place(self, **kwargs):
+        return self._call('place', kwargs)
+
+    def geocode(self, address=None, **kwargs):
+        return self._call('geocode', dict(kwargs, address=address))
+
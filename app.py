@@ -9,21 +9,76 @@ Streamlit web application untuk memprediksi kesuksesan bisnis F&B berdasarkan lo
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
 import json
 import os
+import time
 import warnings
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
 
+from fnb_features import build_kecamatan_table, check_feature_names
+from fnb_scoring import predict_for_kecamatan, scan_grid, score_kecamatan_rows
+from business_rules import validate_business_logic
+from artifact_loader import load_artifacts
+from prediction_cache import PredictionCache
+from micro_batching import MicroBatcher
+from validation_stats import load_thresholds
+from stage_timer import STAGE_TIMER, stage
+
 # Suppress warnings for cleaner output
 warnings.filterwarnings('ignore')
 
+# Direktori model dan konfigurasi cache prediksi
+MODEL_DIR = Path("models/competition")
+PREDICTION_CACHE_SIZE = 1024
+PREDICTION_CACHE_TTL = 3600  # detik
+
+# Micro-batching prediksi antar sesi. Tanpa jeda tunggu, batch terbentuk dari
+# request yang mengantre selama batch sebelumnya diskor; menunggu 1-2 ms
+# hanya menambah latensi pada jumlah pengguna serentak yang kecil
+# (lihat benchmarks/bench_micro_batching.py)
+PREDICTION_BATCH_SIZE = 64
+PREDICTION_BATCH_WAIT = 0.0  # detik
+
+# Jumlah rerun terakhir yang disimpan untuk panel debug latensi
+RERUN_HISTORY_SIZE = 50
+
+# Panel admin waktu per tahap prediksi (FNB_ADMIN_PANEL=1 streamlit run app.py)
+ADMIN_PANEL = os.environ.get('FNB_ADMIN_PANEL') == '1'
+
+# Label rentang harga untuk input price_range 1-4
+PRICE_RANGE_LABELS = {
+    1: "Rp 15.000 - 50.000",
+    2: "Rp 50.000 - 100.000",
+    3: "Rp 100.000 - 200.000",
+    4: "Rp 200.000 - 500.000"
+}
+
 # Konfigurasi halaman
 st.set_page_config(
     page_title="Prediksi Kelayakan Usaha F&B Bandung",
     layout="wide"
 )
 
+# st.fragment hanya menjalankan ulang bagian yang widget-nya berubah;
+# pada Streamlit lama seluruh script dijalankan ulang seperti biasa
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+@contextmanager
+def timed_rerun(scope):
+    """Catat durasi satu rerun (script penuh atau fragment) di session state"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        history = st.session_state.setdefault('rerun_timings', deque(maxlen=RERUN_HISTORY_SIZE))
+        history.append({
+            'Bagian': scope,
+            'Durasi (ms)': (time.perf_counter() - start) * 1000,
+            'Waktu': time.strftime('%H:%M:%S')
+        })
+
 @st.cache_resource
 def load_assets():
     """
@@ -31,57 +86,12 @@ def load_assets():
     Menggunakan cache untuk menghindari pemuatan berulang.
     """
     try:
-        # Path ke direktori model
-        model_dir = Path("models/competition")
-        
-        # Memuat model
-        model = joblib.load(model_dir / "final_competition_model.pkl")
-        
-        # Memuat scaler
-        scaler = joblib.load(model_dir / "competition_scaler.pkl")
-        
-        # Memuat label encoders
-        le_kategori = joblib.load(model_dir / "label_encoder_kategori.pkl")
-        le_target = joblib.load(model_dir / "label_encoder_target.pkl")
-        
-        # Memuat feature names - dengan mapping manual untuk menghindari masalah encoding
-        feature_names = [
-            'Jumlah Penduduk',
-            'Luas Wilayah (km²)',
-            'Kepadatan (jiwa/km²)',
-            'jumlah_mall',
-            'jumlah_minimarket',
-            'jumlah_taman',
-            'jumlah_ulasan',
-            'google_rating',
-            'mall_per_capita',
-            'minimarket_density',
-            'taman_per_capita',
-            'ulasan_per_capita',
-            'competition_density',
-            'market_potential',
-            'infrastructure_score',
-            'retail_accessibility',
-            'rating_normalized',
-            'log_jumlah_ulasan',
-            'log_kepadatan',
-            'kategori_resto_encoded',
-            'price_range_encoded',
-            'high_rating',
-            'excellent_rating',
-            'high_volume_reviews',
-            'very_high_volume_reviews',
-            'price_category_interaction',
-            'rating_review_interaction',
-            'density_infrastructure'
-        ]
+        # Model, scaler, encoder, target mapping dan daftar fitur dimuat paralel;
+        # waktu impor dan muat per komponen disimpan untuk dipantau
+        artifacts, load_timings = load_artifacts(str(MODEL_DIR))
         
-        # Fix encoding issues with special characters
-        feature_names = [name.replace('km�', 'km²').replace('jiwa/km�', 'jiwa/km²') for name in feature_names]
-        
-        # Memuat target mapping
-        with open(model_dir / "target_mapping.json", 'r', encoding='utf-8') as f:
-            target_mapping = json.load(f)
+        # Urutan fitur harus sama dengan mesin fitur vektor
+        check_feature_names(artifacts['feature_names'])
         
         # Memuat data kecamatan
         with open("bandung_kecamatan_data.json", 'r', encoding='utf-8') as f:
@@ -90,186 +100,177 @@ def load_assets():
         # Konversi ke DataFrame
         df_kecamatan = pd.DataFrame(kecamatan_data)
         
+        # Fitur yang hanya bergantung pada kecamatan dihitung sekali di sini
+        kecamatan_table = build_kecamatan_table(df_kecamatan)
+        
+        # Label dari id kelas, dihitung sekali (bukan di setiap prediksi)
+        target_mapping_inv = {v: k for k, v in artifacts['target_mapping'].items()}
+        
+        # Ambang validasi dari statistik dataset yang tersimpan (tanpa scan ulang dataset)
+        validation_thresholds = load_thresholds()
+        
         return {
-            'model': model,
-            'scaler': scaler,
-            'le_kategori': le_kategori,
-            'le_target': le_target,
-            'feature_names': feature_names,
-            'target_mapping': target_mapping,
-            'df_kecamatan': df_kecamatan
+            'model': artifacts['model'],
+            'scoring_model': artifacts['scoring_model'],
+            'flat_model_enabled': artifacts['flat_model_enabled'],
+            'scaler': artifacts['scaler'],
+            'le_kategori': artifacts['le_kategori'],
+            'le_target': artifacts['le_target'],
+            'feature_names': artifacts['feature_names'],
+            'target_mapping': artifacts['target_mapping'],
+            'target_mapping_inv': target_mapping_inv,
+            'df_kecamatan': df_kecamatan,
+            'kecamatan_table': kecamatan_table,
+            'validation_thresholds': validation_thresholds,
+            'load_timings': load_timings.as_dict()
         }
     
     except Exception as e:
         st.error(f"Error memuat aset: {str(e)}")
         st.stop()
 
-def validate_business_logic(target_ulasan, target_rating, kecamatan_data):
-    """
-    Validasi logika bisnis berdasarkan analisis data real dari dataset.
-    Data menunjukkan:
-    - Rating rata-rata: 4.51
-    - Ulasan rata-rata: 517, median: 202
-    - Bisnis dengan rating ≥4.8: rata-rata hanya 79 ulasan, maksimal 200 ulasan
-    - P95 ulasan: 2,819
-    - P99 ulasan: 5,025
-    """
-    warnings = []
-    errors = []
-    
-    jumlah_penduduk = kecamatan_data['Jumlah Penduduk']
-    
-    # Validasi berdasarkan data real: Rating vs Ulasan
-    if target_rating >= 4.8:
-        # Berdasarkan data, bisnis rating ≥4.8 rata-rata hanya 79 ulasan, max 200
-        if target_ulasan > 200:
-            errors.append(f"Rating {target_rating} dengan {target_ulasan:,} ulasan sangat tidak realistis. "
-                         f"Dari dataset real, bisnis dengan rating ≥4.8 maksimal hanya 200 ulasan (rata-rata 79).")
-        elif target_ulasan > 100:
-            warnings.append(f"Rating {target_rating} dengan {target_ulasan} ulasan cukup optimis. "
-                           f"Bisnis rating tinggi dalam dataset rata-rata hanya 79 ulasan.")
-    
-    elif target_rating >= 4.5:
-        # Rating tinggi tapi tidak ekstrem
-        if target_ulasan > 1000:
-            warnings.append(f"Rating {target_rating} dengan {target_ulasan:,} ulasan memerlukan kualitas sangat konsisten.")
-        elif target_ulasan > 500:
-            warnings.append(f"Mempertahankan rating {target_rating} dengan {target_ulasan} ulasan butuh manajemen kualitas ketat.")
-    
-    # Validasi jumlah ulasan berdasarkan persentil dataset
-    if target_ulasan > 5000:  # P99: 5,025
-        errors.append(f"Target {target_ulasan:,} ulasan melebihi 99% bisnis terbaik di dataset (maksimal realistis: ~5,000 ulasan).")
-    elif target_ulasan > 2800:  # P95: 2,819
-        warnings.append(f"Target {target_ulasan:,} ulasan sangat tinggi - hanya 5% bisnis terbaik yang mencapainya.")
-    elif target_ulasan > 950:  # P90: 958
-        warnings.append(f"Target {target_ulasan:,} ulasan tinggi - perlu strategi marketing dan kualitas konsisten.")
-    
-    # Validasi berdasarkan populasi
-    review_percentage = (target_ulasan / jumlah_penduduk) * 100
-    if review_percentage > 3:  # Lebih ketat dari sebelumnya
-        errors.append(f"Target ulasan ({target_ulasan:,}) tidak realistis untuk populasi {jumlah_penduduk:,.0f} orang "
-                     f"({review_percentage:.1f}% populasi). Maksimal realistis: ~{int(jumlah_penduduk * 0.03):,} ulasan.")
-    elif review_percentage > 1:
-        warnings.append(f"Target {review_percentage:.1f}% populasi memberi ulasan cukup optimis.")
-    
-    # Validasi rating yang terlalu rendah
-    if target_rating < 3.0:
-        errors.append(f"Rating {target_rating} terlalu rendah untuk bisnis yang viable. "
-                     f"Minimal target rating 3.0 untuk bisnis yang sustainable.")
-    elif target_rating < 3.5:
-        warnings.append(f"Rating {target_rating} di bawah rata-rata market (4.51). Pertimbangkan target yang lebih tinggi.")
-    
-    # Validasi kombinasi rating rendah dengan ulasan tinggi
-    if target_rating < 4.0 and target_ulasan > 500:
-        warnings.append(f"Rating {target_rating} dengan {target_ulasan} ulasan menunjukkan masalah kualitas yang serius.")
-    
-    return warnings, errors
-
-def create_feature_engineered_data(input_data, kecamatan_data):
-    """
-    Melakukan feature engineering pada data input.
-    """
-    # Gabungkan data input dengan data kecamatan
-    combined_data = {**kecamatan_data, **input_data}
-    
-    # Basic features
-    data = {
-        'Jumlah Penduduk': combined_data['Jumlah Penduduk'],
-        'Luas Wilayah (km²)': combined_data['Luas Wilayah (km²)'],
-        'Kepadatan (jiwa/km²)': combined_data['Kepadatan (jiwa/km²)'],
-        'jumlah_mall': combined_data['jumlah_mall'],
-        'jumlah_minimarket': combined_data['jumlah_minimarket'],
-        'jumlah_taman': combined_data['jumlah_taman'],
-        'jumlah_ulasan': combined_data['jumlah_ulasan'],
-        'google_rating': combined_data['google_rating']
-    }
-    
-    # Feature engineering - sama seperti di training
-    data['mall_per_capita'] = data['jumlah_mall'] / data['Jumlah Penduduk'] * 1000
-    data['minimarket_density'] = data['jumlah_minimarket'] / data['Luas Wilayah (km²)']
-    data['taman_per_capita'] = data['jumlah_taman'] / data['Jumlah Penduduk'] * 1000
-    data['ulasan_per_capita'] = data['jumlah_ulasan'] / data['Jumlah Penduduk'] * 1000
-    
-    # Competition dan market metrics
-    data['competition_density'] = data['jumlah_ulasan'] / data['Luas Wilayah (km²)']
-    data['market_potential'] = data['Kepadatan (jiwa/km²)'] * (data['jumlah_mall'] + data['jumlah_minimarket'])
-    data['infrastructure_score'] = data['jumlah_mall'] + data['jumlah_minimarket'] + data['jumlah_taman']
-    data['retail_accessibility'] = data['jumlah_mall'] + data['jumlah_minimarket']
-    
-    # Normalisasi dan log transform
-    data['rating_normalized'] = data['google_rating'] / 5.0
-    data['log_jumlah_ulasan'] = np.log1p(data['jumlah_ulasan'])
-    data['log_kepadatan'] = np.log1p(data['Kepadatan (jiwa/km²)'])
-    
-    # Encoding categorical
-    data['kategori_resto_encoded'] = combined_data['kategori_resto_encoded']
-    data['price_range_encoded'] = combined_data['price_range'] - 1  # 1-4 menjadi 0-3
-    
-    # Binary features
-    data['high_rating'] = 1 if data['google_rating'] >= 4.0 else 0
-    data['excellent_rating'] = 1 if data['google_rating'] >= 4.5 else 0
-    data['high_volume_reviews'] = 1 if data['jumlah_ulasan'] >= 100 else 0
-    data['very_high_volume_reviews'] = 1 if data['jumlah_ulasan'] >= 500 else 0
-    
-    # Interaction features
-    data['price_category_interaction'] = data['price_range_encoded'] * data['kategori_resto_encoded']
-    data['rating_review_interaction'] = data['rating_normalized'] * data['log_jumlah_ulasan']
-    data['density_infrastructure'] = data['log_kepadatan'] * data['infrastructure_score']
-    
-    return data
-
-def make_prediction(assets, kecamatan_terpilih, kategori_resto, target_rating, target_ulasan, price_range):
+def make_prediction(assets, kecamatan_terpilih, kategori_resto, target_rating, target_ulasan, price_range,
+                    batcher=None):
     """
     Melakukan prediksi berdasarkan input pengguna dengan validasi logika bisnis.
+    Jika batcher (lihat get_prediction_batcher) diberikan, skoring dilakukan
+    bersama request lain yang sedang menunggu.
     """
-    # Ambil data kecamatan yang dipilih
-    kecamatan_data = assets['df_kecamatan'][
-        assets['df_kecamatan']['kecamatan'] == kecamatan_terpilih
-    ].iloc[0].to_dict()
+    # Ambil data kecamatan yang dipilih dari tabel yang sudah dihitung di load_assets
+    with stage('kecamatan_lookup'):
+        kecamatan_table = assets['kecamatan_table']
+        kecamatan_data = kecamatan_table['records'][kecamatan_terpilih]
     
     # Validasi logika bisnis
-    warnings, errors = validate_business_logic(target_ulasan, target_rating, kecamatan_data)
+    with stage('validate_business_logic'):
+        warnings, errors = validate_business_logic(target_ulasan, target_rating, kecamatan_data,
+                                                   assets.get('validation_thresholds'))
     
     # Jika ada error, return dengan pesan error
     if errors:
         return None, None, None, None, errors, warnings
     
     # Encode kategori restoran
-    kategori_encoded = assets['le_kategori'].transform([kategori_resto])[0]
-    
-    # Siapkan input data
-    input_data = {
-        'jumlah_ulasan': target_ulasan,
-        'google_rating': target_rating,
-        'kategori_resto_encoded': kategori_encoded,
-        'price_range': price_range
-    }
-    
-    # Lakukan feature engineering
-    processed_data = create_feature_engineered_data(input_data, kecamatan_data)
-    
-    # Buat DataFrame dengan urutan fitur yang sama dengan training
-    feature_data = {}
-    for feature in assets['feature_names']:
-        feature_data[feature] = [processed_data.get(feature, 0)]
-    
-    X_df = pd.DataFrame(feature_data)
-    
-    # Scaling
-    X_scaled = assets['scaler'].transform(X_df)
+    with stage('kategori_transform'):
+        kategori_encoded = assets['le_kategori'].transform([kategori_resto])[0]
+    
+    # Tahap fitur, scaling dan predict_proba dicatat di fnb_scoring
+    if batcher is not None:
+        # Digabung dengan prediksi sesi lain yang datang bersamaan (satu predict_proba)
+        row = (kecamatan_table['index'][kecamatan_terpilih], target_rating, target_ulasan,
+               kategori_encoded, price_range)
+        with stage('micro_batch'):
+            prediction, probabilities = batcher((assets, row))
+    else:
+        # Hanya fitur rating, ulasan, dan kategori yang dihitung per request (N=1)
+        predictions, probabilities = predict_for_kecamatan(
+            kecamatan_table, kecamatan_table['index'][kecamatan_terpilih],
+            target_rating, target_ulasan, kategori_encoded, price_range,
+            assets['scoring_model'], assets['scaler']
+        )
+        prediction = predictions[0]
+        probabilities = probabilities[0]
     
-    # Prediksi
-    prediction = assets['model'].predict(X_scaled)[0]
-    probabilities = assets['model'].predict_proba(X_scaled)[0]
+    # Konversi kembali ke label (prediction = argmax predict_proba, lihat fnb_scoring.score_matrix)
+    with stage('label_mapping'):
+        target_mapping_inv = assets['target_mapping_inv']
+        predicted_label = target_mapping_inv[prediction]
+        
+        # Ambil probabilitas tertinggi
+        max_prob = np.max(probabilities)
     
-    # Konversi kembali ke label
-    target_mapping_inv = {v: k for k, v in assets['target_mapping'].items()}
-    predicted_label = target_mapping_inv[prediction]
+    return predicted_label, max_prob, probabilities, target_mapping_inv, [], warnings
+
+@st.cache_data
+def get_input_options():
+    """
+    Pilihan input dan label target yang diturunkan dari aset.
+    Dihitung sekali, bukan pada setiap rerun; dikosongkan bersama load_assets.
+    """
+    assets = load_assets()
+    return {
+        'kecamatan': sorted(assets['df_kecamatan']['kecamatan'].unique()),
+        'kategori': list(assets['le_kategori'].classes_),
+        'target_mapping_inv': assets['target_mapping_inv']
+    }
+
+@st.cache_data
+def get_kecamatan_metrics(kecamatan):
+    """Metrik panel Informasi Kecamatan yang sudah diformat, per kolom tampilan"""
+    info = load_assets()['kecamatan_table']['records'][kecamatan]
+    return [
+        [("Jumlah Penduduk", f"{info['Jumlah Penduduk']:,.0f}"),
+         ("Jumlah Mall", f"{info['jumlah_mall']:.0f}")],
+        [("Luas Wilayah", f"{info['Luas Wilayah (km²)']:.2f} km²"),
+         ("Jumlah Minimarket", f"{info['jumlah_minimarket']:.0f}")],
+        [("Kepadatan Penduduk", f"{info['Kepadatan (jiwa/km²)']:,.0f} jiwa/km²"),
+         ("Jumlah Taman", f"{info['jumlah_taman']:.0f}")]
+    ]
+
+def clear_asset_caches():
+    """Kosongkan aset dan semua tampilan turunannya (mis. setelah model berubah)"""
+    load_assets.clear()
+    get_input_options.clear()
+    get_kecamatan_metrics.clear()
+
+@st.cache_resource
+def get_prediction_cache():
+    """
+    Cache prediksi bersama untuk semua sesi (LRU + TTL).
+    Otomatis dikosongkan jika file model di MODEL_DIR berubah.
+    """
+    return PredictionCache(maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL, model_dir=MODEL_DIR)
+
+def score_prediction_batch(items):
+    """
+    Skor sekumpulan request (assets, baris) dari MicroBatcher sekaligus.
+    Request dikelompokkan per objek assets, sehingga request yang masih
+    memakai aset lama saat model dimuat ulang tetap diskor dengan modelnya sendiri.
+    """
+    groups = {}
+    for position, (assets, row) in enumerate(items):
+        groups.setdefault(id(assets), (assets, []))[1].append(position)
+    
+    results = [None] * len(items)
+    for assets, positions in groups.values():
+        predictions, probabilities = score_kecamatan_rows(
+            assets['kecamatan_table'], [items[position][1] for position in positions],
+            assets['scoring_model'], assets['scaler']
+        )
+        for i, position in enumerate(positions):
+            results[position] = (predictions[i], probabilities[i])
+    return results
+
+@st.cache_resource
+def get_prediction_batcher():
+    """
+    Antrian micro-batching bersama untuk semua sesi: prediksi yang datang
+    bersamaan digabung menjadi satu matriks untuk scaler dan model.
+    """
+    return MicroBatcher(score_prediction_batch, max_batch_size=PREDICTION_BATCH_SIZE,
+                        max_wait=PREDICTION_BATCH_WAIT, name='prediction-batcher')
+
+def cached_make_prediction(kecamatan_terpilih, kategori_resto, target_rating, target_ulasan, price_range):
+    """
+    make_prediction dengan memoization berdasarkan input yang dinormalisasi
+    (rating dibulatkan ke langkah 0.1 seperti pada UI).
+    """
+    cache = get_prediction_cache()
     
-    # Ambil probabilitas tertinggi
-    max_prob = np.max(probabilities)
+    # Model berubah: muat ulang aset agar hasil baru tidak berasal dari model lama
+    if cache.refresh_if_models_changed():
+        clear_asset_caches()
+    assets = load_assets()
     
-    return predicted_label, max_prob, probabilities, target_mapping_inv, [], warnings
+    key = cache.make_key(kecamatan_terpilih, kategori_resto, price_range, target_rating, target_ulasan)
+    # Prediksi dihitung dari nilai yang sama dengan kunci cache, agar hit dan miss selalu sama
+    kecamatan, kategori, price, rating, ulasan = key
+    # Total per request termasuk cache hit; tahap di dalam make_prediction hanya saat miss
+    with stage('cached_make_prediction'):
+        return cache.get_or_compute(
+            key, lambda: make_prediction(assets, kecamatan, kategori, rating, ulasan, price,
+                                         batcher=get_prediction_batcher())
+        )
 
 def show_overview():
     """Halaman Overview - Penjelasan tentang AI Predictor"""
@@ -376,8 +377,29 @@ def show_prediction():
     """Halaman Prediksi - Form input dan hasil analisis"""
     st.subheader("Analisis Potensi Kesuksesan Bisnis Food & Beverage Berdasarkan Lokasi Strategis")
     
-    # Memuat aset
+    # Perubahan input hanya menjalankan ulang fragment ini, bukan seluruh halaman
+    prediction_section()
+    
     assets = load_assets()
+    with st.expander("Waktu Muat Model"):
+        load_timings = assets['load_timings']
+        st.dataframe(
+            pd.DataFrame(sorted(load_timings.items(), key=lambda item: item[1], reverse=True),
+                         columns=['Komponen', 'Detik']),
+            hide_index=True
+        )
+        engine = "ensemble diratakan (NumPy)" if assets['flat_model_enabled'] else "predict_proba asli"
+        st.caption(f"Mesin prediksi: {engine}")
+
+@fragment
+def prediction_section():
+    """Input, informasi kecamatan dan hasil analisis (satu fragment)"""
+    with timed_rerun("Fragment Predict"):
+        render_prediction_section()
+
+def render_prediction_section():
+    # Pilihan input diambil dari tampilan turunan yang di-cache
+    options = get_input_options()
     
     # BAGIAN 1: INPUT DETAIL USAHA
     st.header("Masukkan Detail Usaha")
@@ -387,18 +409,16 @@ def show_prediction():
     
     with input_col1:
         # Input kecamatan
-        kecamatan_options = sorted(assets['df_kecamatan']['kecamatan'].unique())
         kecamatan_terpilih = st.selectbox(
             "Pilih Kecamatan:",
-            kecamatan_options,
+            options['kecamatan'],
             index=0
         )
         
         # Input kategori restoran
-        kategori_options = list(assets['le_kategori'].classes_)
         kategori_resto = st.selectbox(
             "Kategori Restoran:",
-            kategori_options,
+            options['kategori'],
             index=0
         )
         
@@ -406,12 +426,7 @@ def show_prediction():
         price_range = st.selectbox(
             "Rentang Harga:",
             options=[1, 2, 3, 4],
-            format_func=lambda x: {
-                1: "Rp 15.000 - 50.000",
-                2: "Rp 50.000 - 100.000", 
-                3: "Rp 100.000 - 200.000",
-                4: "Rp 200.000 - 500.000"
-            }[x],
+            format_func=lambda x: PRICE_RANGE_LABELS[x],
             index=2
         )
     
@@ -440,8 +455,8 @@ def show_prediction():
     st.markdown("---")
     if st.button("Lakukan Prediksi", type="primary", use_container_width=True):
         # Lakukan prediksi
-        predicted_label, max_prob, probabilities, target_mapping_inv, errors, warnings = make_prediction(
-            assets, kecamatan_terpilih, kategori_resto, target_rating, target_ulasan, price_range
+        predicted_label, max_prob, probabilities, target_mapping_inv, errors, warnings = cached_make_prediction(
+            kecamatan_terpilih, kategori_resto, target_rating, target_ulasan, price_range
         )
         
         # Tampilkan error jika ada
@@ -470,26 +485,13 @@ def show_prediction():
     st.header("Informasi Kecamatan")
     
     if kecamatan_terpilih:
-        kecamatan_info = assets['df_kecamatan'][
-            assets['df_kecamatan']['kecamatan'] == kecamatan_terpilih
-        ].iloc[0]
-        
         st.subheader(f"Kecamatan {kecamatan_terpilih.title()}")
         
         # Tampilkan metrics dalam 3 kolom
-        info_col1, info_col2, info_col3 = st.columns(3)
-        
-        with info_col1:
-            st.metric("Jumlah Penduduk", f"{kecamatan_info['Jumlah Penduduk']:,.0f}")
-            st.metric("Jumlah Mall", f"{kecamatan_info['jumlah_mall']:.0f}")
-        
-        with info_col2:
-            st.metric("Luas Wilayah", f"{kecamatan_info['Luas Wilayah (km²)']:.2f} km²")
-            st.metric("Jumlah Minimarket", f"{kecamatan_info['jumlah_minimarket']:.0f}")
-        
-        with info_col3:
-            st.metric("Kepadatan Penduduk", f"{kecamatan_info['Kepadatan (jiwa/km²)']:,.0f} jiwa/km²")
-            st.metric("Jumlah Taman", f"{kecamatan_info['jumlah_taman']:.0f}")
+        for info_col, metrics in zip(st.columns(3), get_kecamatan_metrics(kecamatan_terpilih)):
+            with info_col:
+                for label, value in metrics:
+                    st.metric(label, value)
     
     # BAGIAN 3: HASIL ANALISIS
     if st.session_state.get('prediction_made', False):
@@ -548,6 +550,135 @@ def show_prediction():
             st.warning("**Catatan Penting:**")
             for warning in st.session_state['warnings']:
                 st.warning(f"- {warning}")
+    
+    # Statistik cache prediksi
+    with st.expander("Statistik Cache Prediksi"):
+        cache_stats = get_prediction_cache().stats()
+        stat_col1, stat_col2, stat_col3 = st.columns(3)
+        stat_col1.metric("Hit", f"{cache_stats['hits']:,}")
+        stat_col2.metric("Miss", f"{cache_stats['misses']:,}")
+        stat_col3.metric("Hit Rate", f"{cache_stats['hit_rate']:.1%}")
+        st.caption(f"Ukuran: {cache_stats['size']:,}/{cache_stats['maxsize']:,} | TTL: {cache_stats['ttl']} detik | "
+                   f"Eviction: {cache_stats['evictions']:,} | Kedaluwarsa: {cache_stats['expirations']:,} | "
+                   f"Invalidasi model: {cache_stats['invalidations']:,}")
+
+def show_sweep():
+    """Halaman Scan Lokasi - Skenario what-if untuk semua kombinasi kecamatan"""
+    st.subheader("Scan Semua Kecamatan untuk Konsep Usaha Anda")
+    st.write("""
+    Mode ini menilai **setiap kecamatan** untuk setiap kombinasi kategori, rentang harga, 
+    target rating, dan target ulasan yang dipilih dalam satu kali prediksi batch, 
+    lalu mengurutkan hasilnya berdasarkan probabilitas **Go**.
+    """)
+    
+    sweep_section()
+
+@fragment
+def sweep_section():
+    """Pilihan scan dan hasilnya (satu fragment)"""
+    with timed_rerun("Fragment Scan Lokasi"):
+        render_sweep_section()
+
+def render_sweep_section():
+    # Memuat aset
+    assets = load_assets()
+    
+    sweep_col1, sweep_col2 = st.columns(2)
+    
+    with sweep_col1:
+        kategori_options = get_input_options()['kategori']
+        kategori_scan = st.multiselect("Kategori Restoran:", kategori_options, default=kategori_options)
+        price_scan = st.multiselect(
+            "Rentang Harga:",
+            options=list(PRICE_RANGE_LABELS),
+            default=list(PRICE_RANGE_LABELS),
+            format_func=lambda x: PRICE_RANGE_LABELS[x]
+        )
+    
+    with sweep_col2:
+        rating_scan = st.multiselect(
+            "Target Google Rating:",
+            options=[3.5, 3.8, 4.0, 4.2, 4.4, 4.6, 4.8],
+            default=[4.0, 4.2, 4.4, 4.6]
+        )
+        ulasan_scan = st.multiselect(
+            "Target Jumlah Ulasan:",
+            options=[20, 50, 100, 200, 500, 1000, 2000],
+            default=[50, 100, 200, 500]
+        )
+    
+    if not (kategori_scan and price_scan and rating_scan and ulasan_scan):
+        st.info("Pilih minimal satu nilai untuk setiap dimensi scan.")
+        return
+    
+    total = len(assets['kecamatan_table']['names']) * len(kategori_scan) * len(price_scan) * len(rating_scan) * len(ulasan_scan)
+    if st.button(f"Jalankan Scan ({total:,} kombinasi)", type="primary", use_container_width=True):
+        results = scan_grid(
+            assets['kecamatan_table'], kategori_scan, assets['scoring_model'], assets['scaler'],
+            assets['target_mapping'], price_ranges=sorted(price_scan), ratings=sorted(rating_scan),
+            reviews=sorted(ulasan_scan), kategori_encoder=assets['le_kategori']
+        )
+        results['price_range'] = results['price_range'].map(PRICE_RANGE_LABELS)
+        st.session_state['sweep_results'] = results
+    
+    if 'sweep_results' in st.session_state:
+        results = st.session_state['sweep_results']
+        
+        # Kecamatan terbaik: probabilitas Go tertinggi dari semua kombinasi
+        st.header("Kecamatan Terbaik")
+        best_per_kecamatan = results.drop_duplicates('kecamatan').head(10)
+        st.dataframe(best_per_kecamatan, use_container_width=True, hide_index=True)
+        
+        st.header("Semua Kombinasi")
+        st.dataframe(results, use_container_width=True, hide_index=True)
+        st.download_button(
+            "Unduh Hasil (CSV)",
+            results.to_csv(index=False).encode('utf-8'),
+            file_name="scan_lokasi_fnb.csv",
+            mime="text/csv"
+        )
+
+def show_rerun_debug():
+    """Panel debug: latensi rerun script penuh dan fragment"""
+    with st.expander("Debug: Latensi Rerun"):
+        history = list(st.session_state.get('rerun_timings', []))
+        if not history:
+            st.caption("Belum ada rerun yang tercatat.")
+            return
+        
+        df_timings = pd.DataFrame(history)
+        summary = df_timings.groupby('Bagian')['Durasi (ms)'].agg(['count', 'median', 'max']).reset_index()
+        summary.columns = ['Bagian', 'Jumlah', 'Median (ms)', 'Maks (ms)']
+        st.dataframe(summary.round(1), hide_index=True)
+        st.dataframe(df_timings.iloc[::-1].head(10).round(1), hide_index=True)
+        st.caption(f"{len(history)} rerun terakhir (maks {RERUN_HISTORY_SIZE}). Rerun fragment saja tidak "
+                   f"menjalankan ulang panel ini; datanya tampil pada rerun penuh berikutnya.")
+        st.button("Perbarui", key="refresh_rerun_debug")
+
+def show_stage_timing():
+    """Panel admin: persentil durasi per tahap make_prediction (seluruh sesi)"""
+    with st.expander("Admin: Waktu per Tahap Prediksi"):
+        enabled = st.toggle("Catat waktu per tahap", value=STAGE_TIMER.enabled, key="stage_timing_enabled")
+        STAGE_TIMER.enabled = enabled
+        
+        summary = STAGE_TIMER.summary()
+        if summary:
+            df_stages = pd.DataFrame(summary)
+            df_stages.columns = ['Tahap', 'Jumlah', 'Rata-rata (ms)', 'P50 (ms)', 'P95 (ms)', 'P99 (ms)', 'Maks (ms)']
+            st.dataframe(df_stages.round(3), hide_index=True)
+        else:
+            st.caption("Belum ada data. Aktifkan pencatatan lalu lakukan prediksi.")
+        st.caption("Data dicatat untuk seluruh sesi dalam proses ini. Persentil diestimasi dari histogram "
+                   "(bucket +25%); tahap fitur, scaling dan predict_proba dicatat per batch.")
+        
+        col1, col2, col3 = st.columns(3)
+        col1.download_button("Prometheus", STAGE_TIMER.to_prometheus(), file_name="stage_timings.prom",
+                             mime="text/plain")
+        col2.download_button("JSON", json.dumps(STAGE_TIMER.to_dict(), indent=2), file_name="stage_timings.json",
+                             mime="application/json")
+        if col3.button("Reset", key="reset_stage_timing"):
+            STAGE_TIMER.reset()
+            st.rerun()
 
 def main():
     """Fungsi utama dengan navigasi"""
@@ -556,13 +687,21 @@ def main():
     st.title("AI Business Impact Predictor")
     
     # Navbar horizontal menggunakan tabs
-    tab1, tab2 = st.tabs(["Overview", "Predict"])
-    
-    with tab1:
-        show_overview()
+    with timed_rerun("Script penuh"):
+        tab1, tab2, tab3 = st.tabs(["Overview", "Predict", "Scan Lokasi"])
+        
+        with tab1:
+            show_overview()
+        
+        with tab2:
+            show_prediction()
+        
+        with tab3:
+            show_sweep()
     
-    with tab2:
-        show_prediction()
+    show_rerun_debug()
+    if ADMIN_PANEL:
+        show_stage_timing()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
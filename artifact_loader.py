@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Shared, concurrent loader for the model artifacts in models/competition.
+
+Both the Streamlit app (app.py) and the CLI (predict_fnb_business_success.py)
+load their artifacts through load_artifacts(). The model (with its heavy
+xgboost/lightgbm imports) and the small artifacts (scaler, encoders, target
+mapping, feature list) are loaded on a thread pool, and every import and
+load step is timed so cold-start time can be tracked per component.
+"""
+
+import importlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# Artifact key -> (file name, description used in error messages)
+ARTIFACT_FILES = {
+    'model': ('final_competition_model.pkl', "Model file"),
+    'scaler': ('competition_scaler.pkl', "Scaler file"),
+    'feature_names': ('feature_names_competition.txt', "Feature names file"),
+    'le_kategori': ('label_encoder_kategori.pkl', "Category label encoder file"),
+    'le_target': ('label_encoder_target.pkl', "Target label encoder file"),
+    'target_mapping': ('target_mapping.json', "Target mapping file")
+}
+
+# Imported on the calling thread before the pool starts: every pickle needs
+# them, and importing the same package from several threads at once can hit
+# the import system's deadlock detection
+SHARED_PACKAGES = ('joblib', 'sklearn.preprocessing')
+
+# Libraries needed to unpickle the ensemble members (model thread only)
+MODEL_PACKAGES = ('xgboost', 'lightgbm')
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class LoadTimings:
+    """Thread-safe record of per-component import/load durations in seconds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seconds = {}
+
+    @contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._seconds[name] = elapsed
+
+    def as_dict(self):
+        with self._lock:
+            return dict(self._seconds)
+
+    def report(self):
+        """Lines of 'component: seconds', slowest first."""
+        items = sorted(self.as_dict().items(), key=lambda item: item[1], reverse=True)
+        width = max((len(name) for name, _ in items), default=0)
+        return [f"{name:<{width}} : {seconds:.3f}s" for name, seconds in items]
+
+    def to_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+
+def timed_import(module_name, timings):
+    """Import a module, recording the time as 'import:<module_name>'."""
+    with timings.measure(f'import:{module_name}'):
+        return importlib.import_module(module_name)
+
+
+def artifact_path(model_dir, key):
+    return os.path.join(model_dir, ARTIFACT_FILES[key][0])
+
+
+def check_artifacts(model_dir, keys=None):
+    """Raise FileNotFoundError for the first missing artifact."""
+    if not os.path.isdir(model_dir):
+        raise FileNotFoundError(f"Competition directory not found: {model_dir}")
+    for key in keys or ARTIFACT_FILES:
+        path = artifact_path(model_dir, key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{ARTIFACT_FILES[key][1]} not found: {path}")
+
+
+def _load_pickle(joblib, path, timings, name):
+    with timings.measure(name):
+        return joblib.load(path)
+
+
+def _load_model(joblib, model_dir, timings, compile_flat):
+    """Import the ensemble libraries, unpickle the model and optionally flatten it."""
+    for package in MODEL_PACKAGES:
+        timed_import(package, timings)
+    model = _load_pickle(joblib, artifact_path(model_dir, 'model'), timings, 'model')
+    if not compile_flat:
+        return model, model, False
+
+    from flat_ensemble import compile_model
+    with timings.measure('flat_ensemble'):
+        scoring_model, flat_model_enabled = compile_model(model)
+    return model, scoring_model, flat_model_enabled
+
+
+def _load_feature_names(path, timings):
+    # The file is latin-1 encoded ("km\xb2"), so read it explicitly to match the scaler's names
+    with timings.measure('feature_names'):
+        with open(path, 'r', encoding='latin-1') as f:
+            return [line.strip() for line in f if line.strip()]
+
+
+def _load_json(path, timings, name):
+    with timings.measure(name):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
+def load_artifacts(model_dir, compile_flat=True, max_workers=DEFAULT_MAX_WORKERS, timings=None,
+                   use_bundle=True):
+    """
+    Load every model artifact concurrently.
+
+    If model_dir contains an up-to-date single-file bundle (model_bundle.py)
+    it is memory-mapped instead, recorded as the 'bundle' timing.
+
+    Args:
+        model_dir: Directory containing the ARTIFACT_FILES.
+        compile_flat: Also build the flattened ensemble (flat_ensemble.compile_model).
+        max_workers: Thread pool size.
+        timings: Optional LoadTimings to record into.
+        use_bundle: Prefer model_dir's bundle when it is newer than the artifacts.
+
+    Returns:
+        tuple: (artifacts dict with keys model, scoring_model, flat_model_enabled,
+        scaler, feature_names, le_kategori, le_target, target_mapping; LoadTimings)
+
+    Raises:
+        FileNotFoundError: If the directory or an artifact is missing.
+        ImportError: If a package needed to unpickle the model is missing.
+    """
+    timings = timings or LoadTimings()
+    if use_bundle:
+        import model_bundle
+        if model_bundle.bundle_is_current(model_dir):
+            with timings.measure('total'), timings.measure('bundle'):
+                artifacts = model_bundle.load_bundle(model_bundle.bundle_path(model_dir))
+            if not compile_flat:
+                artifacts.update({'scoring_model': artifacts['model'], 'flat_model_enabled': False})
+            return artifacts, timings
+
+    check_artifacts(model_dir)
+
+    with timings.measure('total'):
+        joblib, _ = (timed_import(package, timings) for package in SHARED_PACKAGES)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            # Submitted first: the model dominates cold start
+            model_future = pool.submit(_load_model, joblib, model_dir, timings, compile_flat)
+            futures = {
+                key: pool.submit(_load_pickle, joblib, artifact_path(model_dir, key), timings, key)
+                for key in ('scaler', 'le_kategori', 'le_target')
+            }
+            futures.update({
+                'target_mapping': pool.submit(_load_json, artifact_path(model_dir, 'target_mapping'),
+                                              timings, 'target_mapping'),
+                'feature_names': pool.submit(_load_feature_names, artifact_path(model_dir, 'feature_names'),
+                                             timings)
+            })
+            artifacts = {key: future.result() for key, future in futures.items()}
+            model, scoring_model, flat_model_enabled = model_future.result()
+
+    artifacts.update({'model': model, 'scoring_model': scoring_model, 'flat_model_enabled': flat_model_enabled})
+    return artifacts, timings
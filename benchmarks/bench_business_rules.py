@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Business-rule validation benchmark: per-row calls vs evaluate_rules().
+
+Times validate_business_logic() in a Python loop (the app's per-request
+path, messages formatted for every row) against one vectorized
+evaluate_rules() call over the same rows, and checks that the lazily
+rendered messages of a sample of rows are identical.
+
+Usage:
+    python benchmarks/bench_business_rules.py --rows 1000000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from business_rules import evaluate_rules, validate_business_logic
+
+KECAMATAN_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bandung_kecamatan_data.json')
+
+# Rows timed with the per-row loop; the total is extrapolated
+LOOP_ROWS = 20_000
+CHECKED_ROWS = 2_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized business-rule validation")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with open(KECAMATAN_DATA_PATH, 'r', encoding='utf-8') as f:
+        kecamatan = json.load(f)
+    rng = np.random.default_rng(args.seed)
+    ulasan = rng.integers(0, 8000, args.rows)
+    rating = np.round(rng.uniform(2.5, 5.0, args.rows), 1)
+    records = [kecamatan[i] for i in rng.integers(0, len(kecamatan), args.rows)]
+    penduduk = np.array([record['Jumlah Penduduk'] for record in records], dtype=np.float64)
+
+    loop_rows = min(LOOP_ROWS, args.rows)
+    start = time.perf_counter()
+    for i in range(loop_rows):
+        validate_business_logic(int(ulasan[i]), float(rating[i]), records[i])
+    loop_seconds = (time.perf_counter() - start) / loop_rows * args.rows
+
+    start = time.perf_counter()
+    violations = evaluate_rules(ulasan, rating, penduduk)
+    vector_seconds = time.perf_counter() - start
+
+    for i in rng.integers(0, args.rows, min(CHECKED_ROWS, args.rows)):
+        expected = validate_business_logic(int(ulasan[i]), float(rating[i]), records[i])
+        if violations.messages(i) != expected:
+            raise AssertionError(f"row {i}: {violations.messages(i)} != {expected}")
+
+    print(f"=== Business rules: {args.rows:,} rows ===")
+    print(f"per-row validate_business_logic: {loop_seconds:8.2f} s (extrapolated from {loop_rows:,} rows)")
+    print(f"evaluate_rules (vectorized):     {vector_seconds:8.2f} s ({loop_seconds / vector_seconds:.0f}x)")
+    print(f"rows with errors: {violations.has_errors.mean() * 100:.1f}%, "
+          f"codes: {violations.codes.nbytes / 1024 ** 2:.1f} MB; {CHECKED_ROWS:,} sampled rows match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dataset load benchmark: inferred-dtype CSV vs typed Parquet (dataset_store.py).
+
+For every registered dataset, times pd.read_csv (what the scripts do today),
+a full typed Parquet read and a Parquet read of a few analysis columns, and
+reports the in-memory footprint (memory_usage(deep=True)) of each.
+
+Usage:
+    python benchmarks/bench_dataset_store.py --repeats 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pandas as pd
+
+from dataset_store import DATASETS, convert_dataset, csv_path, load_dataset, parquet_path
+
+ANALYSIS_COLUMNS = ['kecamatan', 'kategori_resto', 'google_rating', 'jumlah_ulasan']
+
+
+def measure(load, repeats):
+    """Median load time in ms and memory of the loaded frame in MB."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        df = load()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CSV vs typed Parquet dataset loading")
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('datasets', nargs='*', help=f"Dataset names (default: all of {', '.join(DATASETS)})")
+    args = parser.parse_args()
+
+    print("=== Dataset Load Benchmark (median of {} runs) ===".format(args.repeats))
+    print(f"{'dataset':<20} {'variant':<18} {'ms':>8} {'MB':>8} {'disk KB':>9}")
+    for name in args.datasets or list(DATASETS):
+        convert_dataset(name)
+        columns = [column for column in ANALYSIS_COLUMNS if column in pd.read_csv(csv_path(name), nrows=0).columns]
+        variants = [
+            ('csv (inferred)', lambda: pd.read_csv(csv_path(name)), csv_path(name)),
+            ('parquet (all)', lambda: load_dataset(name), parquet_path(name)),
+            (f'parquet ({len(columns)} cols)', lambda: load_dataset(name, columns=columns), parquet_path(name)),
+        ]
+        for label, load, path in variants:
+            ms, mb = measure(load, args.repeats)
+            print(f"{name:<20} {label:<18} {ms:>8.1f} {mb:>8.2f} {os.path.getsize(path) / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
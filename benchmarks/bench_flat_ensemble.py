@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Latency benchmark for the flattened ensemble engine.
+
+Times VotingClassifier.predict_proba against flat_ensemble.FlatEnsemble at
+several batch sizes and checks that the probabilities agree within 1e-6.
+The flat engine is timed without its fallback, so the crossover point used
+for flat_ensemble.FLAT_MAX_ROWS can be read off the output.
+
+Usage:
+    python benchmarks/bench_flat_ensemble.py --batch-sizes 1,100,100000
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flat_ensemble import FlatEnsemble
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                                  'models', 'competition', 'final_competition_model.pkl')
+
+# Maximum allowed absolute probability difference
+TOLERANCE = 1e-6
+
+
+def time_call(func, X, repeats):
+    """Best wall time of func(X) over repeats runs, and the last result."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func(X)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_benchmark(model, batch_sizes=(1, 100, 100_000), repeats=5, seed=42):
+    """
+    Time both engines for every batch size.
+
+    Rows are drawn from a standard normal, i.e. already standardized like
+    the scaler output the model sees in production.
+    """
+    start = time.perf_counter()
+    flat = FlatEnsemble.from_voting_classifier(model)
+    export_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    results = []
+    for batch_size in batch_sizes:
+        X = rng.normal(size=(batch_size, flat.n_features_in_))
+        # Large batches are slow on the original path; one run is enough there
+        runs = repeats if batch_size <= 1000 else 1
+        original_seconds, original = time_call(model.predict_proba, X, runs)
+        flat_seconds, flattened = time_call(flat.predict_proba, X, runs)
+        max_diff = float(np.abs(original - flattened).max())
+        if max_diff > TOLERANCE:
+            raise AssertionError(f"Flattened probabilities differ by {max_diff:.2e} at batch size {batch_size}")
+        results.append({
+            'batch_size': batch_size,
+            'original_seconds': original_seconds,
+            'flat_seconds': flat_seconds,
+            'speedup': original_seconds / flat_seconds,
+            'max_abs_diff': max_diff
+        })
+    return {'export_seconds': export_seconds, 'n_nodes': len(flat.arrays['feature']),
+            'n_trees': len(flat.arrays['roots']), 'batches': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the flattened ensemble engine")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help="Path to final_competition_model.pkl")
+    parser.add_argument('--batch-sizes', default='1,100,100000', help="Comma-separated batch sizes")
+    parser.add_argument('--repeats', type=int, default=5, help="Repetitions per small batch (best is kept)")
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    model = joblib.load(args.model)
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+    result = run_benchmark(model, batch_sizes, args.repeats)
+
+    print("=== Flattened Ensemble Benchmark ===")
+    print(f"Export            : {result['n_trees']:,} trees, {result['n_nodes']:,} nodes "
+          f"in {result['export_seconds']:.2f}s")
+    for row in result['batches']:
+        print(f"Batch {row['batch_size']:>8,} : predict_proba {row['original_seconds'] * 1000:9.2f} ms | "
+              f"flat {row['flat_seconds'] * 1000:9.2f} ms | {row['speedup']:6.1f}x | "
+              f"max diff {row['max_abs_diff']:.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Throughput vs latency of in-process micro-batching (micro_batching.py).
+
+N caller threads each make single predictions the way app.make_prediction
+does. Without batching every call runs its own scaling pass and
+predict_proba; with a MicroBatcher the concurrent calls are scored as one
+matrix. For each concurrency level, reports calls/s, p50/p99 latency and
+the mean batch size per configuration.
+
+Usage:
+    python benchmarks/bench_micro_batching.py --concurrency 1,4,16,64 --waits-ms 0,1,2
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from artifact_loader import load_artifacts
+from fnb_features import build_kecamatan_table
+from fnb_scoring import score_kecamatan_rows
+from micro_batching import MicroBatcher
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MODEL_DIR = os.path.join(ROOT_DIR, 'models', 'competition')
+KECAMATAN_DATA_PATH = os.path.join(ROOT_DIR, 'bandung_kecamatan_data.json')
+
+
+def make_rows(kecamatan_table, n_kategori, n, seed):
+    rng = random.Random(seed)
+    return [(rng.randrange(len(kecamatan_table['names'])), round(rng.uniform(3.5, 4.7), 1),
+             rng.randint(10, 500), rng.randrange(n_kategori), rng.randint(1, 4)) for _ in range(n)]
+
+
+def run_level(predict, rows, concurrency):
+    """Call predict(row) for every row from `concurrency` threads; returns (latencies ms, seconds)."""
+    latencies = []
+    lock = threading.Lock()
+    next_index = iter(range(len(rows)))
+
+    def caller():
+        local = []
+        while True:
+            with lock:
+                i = next(next_index, None)
+            if i is None:
+                break
+            start = time.perf_counter()
+            predict(rows[i])
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=caller) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.asarray(latencies), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched vs per-call scoring")
+    parser.add_argument('--concurrency', default='1,2,4,8,16,32,64', help="Comma-separated caller thread counts")
+    parser.add_argument('--calls', type=int, default=3000, help="Predictions per level and configuration")
+    parser.add_argument('--waits-ms', default='0,1,2', help="Comma-separated MicroBatcher max_wait values in ms")
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--json', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    artifacts, _ = load_artifacts(MODEL_DIR)
+    with open(KECAMATAN_DATA_PATH, 'r', encoding='utf-8') as f:
+        kecamatan_table = build_kecamatan_table(json.load(f))
+    model, scaler = artifacts['scoring_model'], artifacts['scaler']
+    rows = make_rows(kecamatan_table, len(artifacts['le_kategori'].classes_), args.calls, seed=0)
+
+    def score(batch):
+        _, probabilities = score_kecamatan_rows(kecamatan_table, batch, model, scaler)
+        return probabilities
+
+    configurations = [('per call', None)]
+    configurations += [(f'batched, wait {wait:g} ms', wait) for wait in map(float, args.waits_ms.split(','))]
+
+    results = []
+    print(f"=== Micro-batching benchmark: {args.calls} calls per level, batch <= {args.max_batch_size} ===")
+    print(f"{'callers':>7} {'configuration':<22} {'calls/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'batch':>6}")
+    for concurrency in [int(level) for level in args.concurrency.split(',')]:
+        for label, wait_ms in configurations:
+            batcher = None
+            if wait_ms is None:
+                predict = lambda row: score([row])[0]
+            else:
+                batcher = MicroBatcher(score, max_batch_size=args.max_batch_size, max_wait=wait_ms / 1000)
+                predict = batcher
+            run_level(predict, rows[:100], min(concurrency, 4))  # warm-up
+            before = batcher.stats() if batcher else None
+            latencies, seconds = run_level(predict, rows, concurrency)
+            mean_batch = 1.0
+            if batcher:
+                after = batcher.stats()
+                mean_batch = (after['items'] - before['items']) / max(1, after['batches'] - before['batches'])
+                batcher.close()
+            p50, p99 = np.percentile(latencies, [50, 99])
+            results.append({'concurrency': concurrency, 'configuration': label, 'calls_per_second': len(rows) / seconds,
+                            'p50_ms': p50, 'p99_ms': p99, 'mean_batch_size': mean_batch})
+            print(f"{concurrency:>7} {label:<22} {len(rows) / seconds:>9.0f} {p50:>8.2f} {p99:>8.2f} {mean_batch:>6.1f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
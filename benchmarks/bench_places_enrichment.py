@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Places enrichment throughput benchmark (offline, FakePlacesClient).
+
+Compares the previous serial loop of get_rating_API.main (one business at a
+time, 0.1s between query variants, 0.5s after every row) with the
+concurrent engine in places_enrichment.py, including simulated transient
+errors that are retried.
+
+Usage:
+    python benchmarks/bench_places_enrichment.py --rows 400 --concurrency 16 --rate 50
+"""
+
+import argparse
+import functools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from get_rating_API import search_place_details
+from places_enrichment import FakePlacesClient, enrich
+
+
+def make_rows(n_rows):
+    return [(f"Resto {i}", f"Jl. Contoh No. {i}") for i in range(n_rows)]
+
+
+def run_serial(rows, client, row_delay=0.5):
+    """The previous loop: serial lookups with fixed sleeps."""
+    start = time.perf_counter()
+    results = []
+    for name, address in rows:
+        results.append(search_place_details(client, name, address))
+        time.sleep(row_delay)
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serial vs concurrent Places enrichment")
+    parser.add_argument('--rows', type=int, default=400, help="Businesses for the concurrent engine")
+    parser.add_argument('--serial-rows', type=int, default=20, help="Businesses timed on the serial loop")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=50.0, help="Requests per second")
+    parser.add_argument('--latency', type=float, default=0.05, help="Simulated seconds per API call")
+    parser.add_argument('--error-rate', type=float, default=0.05, help="Share of calls raising a timeout")
+    args = parser.parse_args()
+
+    serial_client = FakePlacesClient(latency=args.latency, error_rate=args.error_rate)
+    serial_rows = make_rows(args.serial_rows)
+    serial_results, serial_seconds = run_serial(serial_rows, serial_client)
+    serial_calls = sum(serial_client.calls.values())
+
+    client = FakePlacesClient(latency=args.latency, error_rate=args.error_rate)
+    results, report = enrich(make_rows(args.rows), functools.partial(search_place_details, query_delay=0),
+                             client, concurrency=args.concurrency, requests_per_second=args.rate)
+
+    serial_rate = len(serial_rows) / serial_seconds
+    concurrent_rate = report['rows'] / report['seconds']
+    found = sum(result['status'] == 'Success' for result in results)
+    serial_found = sum(result['status'] == 'Success' for result in serial_results)
+
+    print("=== Places Enrichment Benchmark (FakePlacesClient) ===")
+    print(f"Serial loop : {len(serial_rows):,} rows in {serial_seconds:.1f}s "
+          f"({serial_rate:.2f} rows/s, {serial_calls / serial_seconds:.1f} req/s, "
+          f"{serial_found / len(serial_rows):.0%} found)")
+    print(f"Concurrent  : {report['rows']:,} rows in {report['seconds']:.1f}s "
+          f"({concurrent_rate:.2f} rows/s, {report['requests_per_second']:.1f} req/s, "
+          f"{found / report['rows']:.0%} found, {report['retries']} retries, {report['failures']} failures)")
+    print(f"Speedup     : {concurrent_rate / serial_rate:.1f}x "
+          f"(6,700 rows: ~{6700 / serial_rate / 60:.0f} min -> ~{6700 / concurrent_rate / 60:.1f} min)")
+
+
+if __name__ == "__main__":
+    main()
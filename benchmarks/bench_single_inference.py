@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Single-request inference: predict() + predict_proba() vs one predict_proba().
+
+The original make_prediction called model.predict(X) and then
+model.predict_proba(X), evaluating every tree of the soft-voting ensemble
+twice, and rebuilt the inverse target mapping on every call. The app now
+takes the label from the argmax of a single predict_proba
+(fnb_scoring.score_matrix) and looks it up in the mapping precomputed in
+load_assets.
+
+First checks that the labels are identical: model.predict() against the
+argmax path (with the scoring model the app uses, e.g. the flattened
+ensemble) over --rows requests covering every kecamatan and category.
+Then times one request per call for:
+
+    legacy        model.predict + model.predict_proba + mapping rebuild
+    single pass   model.predict_proba + argmax + precomputed mapping
+    app path      score_matrix (scaling + scoring_model) + precomputed mapping
+
+Usage:
+    python benchmarks/bench_single_inference.py --rows 20000 --calls 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from artifact_loader import load_artifacts
+from fnb_features import build_kecamatan_feature_matrix, build_kecamatan_table
+from fnb_scoring import scale_features, score_matrix
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MODEL_DIR = os.path.join(ROOT_DIR, 'models', 'competition')
+KECAMATAN_DATA_PATH = os.path.join(ROOT_DIR, 'bandung_kecamatan_data.json')
+
+
+def make_requests(kecamatan_table, n_kategori, n, seed=0):
+    """Random requests over every kecamatan/category, wide rating and review ranges."""
+    rng = np.random.default_rng(seed)
+    return (rng.integers(0, len(kecamatan_table['names']), n), np.round(rng.uniform(3.0, 5.0, n), 1),
+            rng.integers(0, 6000, n), rng.integers(0, n_kategori, n), rng.integers(1, 5, n))
+
+
+def check_labels(kecamatan_table, requests, artifacts):
+    """Assert model.predict() == argmax of the scoring path; returns the row count."""
+    model, scaler, target_mapping = artifacts['model'], artifacts['scaler'], artifacts['target_mapping']
+    target_mapping_inv = {v: k for k, v in target_mapping.items()}
+    X = build_kecamatan_feature_matrix(kecamatan_table, *requests)
+    X_scaled = scale_features(scaler, X.copy())
+    expected = model.predict(X_scaled)
+    predictions, _ = score_matrix(X, artifacts['scoring_model'], scaler)
+    mismatches = np.flatnonzero(predictions != expected)
+    if len(mismatches):
+        raise AssertionError(f"{len(mismatches)} of {len(expected)} labels differ, e.g. row {mismatches[0]}: "
+                             f"{target_mapping_inv[expected[mismatches[0]]]} != "
+                             f"{target_mapping_inv[predictions[mismatches[0]]]}")
+    return len(expected)
+
+
+def time_per_call(function, rows):
+    start = time.perf_counter()
+    for row in rows:
+        function(row)
+    return (time.perf_counter() - start) / len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single-pass vs double inference per request")
+    parser.add_argument('--rows', type=int, default=20_000, help="Requests checked for identical labels")
+    parser.add_argument('--calls', type=int, default=2_000, help="Single-row requests timed per variant")
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    artifacts, _ = load_artifacts(MODEL_DIR)
+    with open(KECAMATAN_DATA_PATH, 'r', encoding='utf-8') as f:
+        kecamatan_table = build_kecamatan_table(json.load(f))
+    n_kategori = len(artifacts['le_kategori'].classes_)
+    checked = check_labels(kecamatan_table, make_requests(kecamatan_table, n_kategori, args.rows), artifacts)
+
+    model, scoring_model, scaler = artifacts['model'], artifacts['scoring_model'], artifacts['scaler']
+    target_mapping = artifacts['target_mapping']
+    target_mapping_inv = {v: k for k, v in target_mapping.items()}
+    requests = make_requests(kecamatan_table, n_kategori, args.calls, seed=1)
+    X = build_kecamatan_feature_matrix(kecamatan_table, *requests)
+    scaled_rows = [row.reshape(1, -1) for row in scale_features(scaler, X.copy())]
+    raw_rows = [np.asfortranarray(row.reshape(1, -1)) for row in X]
+
+    def legacy(X_scaled):
+        prediction = model.predict(X_scaled)[0]
+        probabilities = model.predict_proba(X_scaled)[0]
+        inverse = {v: k for k, v in target_mapping.items()}
+        return inverse[prediction], np.max(probabilities)
+
+    def single_pass(X_scaled):
+        probabilities = model.predict_proba(X_scaled)[0]
+        return target_mapping_inv[model.classes_[np.argmax(probabilities)]], np.max(probabilities)
+
+    def app_path(X_row):
+        predictions, probabilities = score_matrix(X_row.copy(order='F'), scoring_model, scaler)
+        return target_mapping_inv[predictions[0]], np.max(probabilities[0])
+
+    # Warm-up, then the same requests for every variant
+    for function, rows in ((legacy, scaled_rows), (single_pass, scaled_rows), (app_path, raw_rows)):
+        time_per_call(function, rows[:50])
+    legacy_seconds = time_per_call(legacy, scaled_rows)
+    single_seconds = time_per_call(single_pass, scaled_rows)
+    app_seconds = time_per_call(app_path, raw_rows)
+
+    print(f"=== Single-request inference: {args.calls:,} calls ({type(model).__name__}, "
+          f"scoring model {type(scoring_model).__name__}) ===")
+    print(f"labels identical for {checked:,} requests (model.predict vs argmax predict_proba)")
+    print(f"legacy (predict + predict_proba) : {legacy_seconds * 1000:7.3f} ms/request")
+    print(f"single predict_proba             : {single_seconds * 1000:7.3f} ms/request "
+          f"({legacy_seconds / single_seconds:.2f}x)")
+    print(f"app path (score_matrix)          : {app_seconds * 1000:7.3f} ms/request "
+          f"({legacy_seconds / app_seconds:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Load test for the HTTP prediction service (prediction_service.py).
+
+Starts the service on a free local port (or targets --url), then, for each
+concurrency level, runs that many client threads with keep-alive
+connections sending random /predict requests and reports throughput,
+latency percentiles and the service's mean micro-batch size.
+
+Usage:
+    python benchmarks/load_test_service.py --workers 2 --concurrency 1,8,32
+    python benchmarks/load_test_service.py --url http://127.0.0.1:8000 --requests 2000
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+import numpy as np
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SERVICE_SCRIPT = os.path.join(ROOT_DIR, 'prediction_service.py')
+
+STARTUP_TIMEOUT_SECONDS = 120
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def request_json(url, method='GET', body=None, timeout=10):
+    parts = urllib.parse.urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=timeout)
+    try:
+        connection.request(method, parts.path, body=json.dumps(body) if body is not None else None,
+                           headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def start_service(args):
+    """Run prediction_service.py on a free port and wait until /health answers."""
+    port = free_port()
+    command = [sys.executable, SERVICE_SCRIPT, '--port', str(port), '--workers', str(args.workers),
+               '--max-batch-size', str(args.max_batch_size), '--max-wait-ms', str(args.max_wait_ms)]
+    process = subprocess.Popen(command, cwd=ROOT_DIR)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"service exited with code {process.returncode}")
+        try:
+            request_json(url + '/health', timeout=1)
+            return process, url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("service did not start in time")
+
+
+def make_payloads(options, n, seed):
+    """Random requests within the business rules (rating 3.5-4.7, 10-500 reviews)."""
+    rng = random.Random(seed)
+    return [json.dumps({
+        'kecamatan': rng.choice(options['kecamatan']),
+        'kategori_resto': rng.choice(options['kategori_resto']),
+        'target_rating': round(rng.uniform(3.5, 4.7), 1),
+        'target_ulasan': rng.randint(10, 500),
+        'price_range': rng.choice(options['price_range']),
+    }) for _ in range(n)]
+
+
+def run_level(url, payloads, concurrency):
+    """Send all payloads from `concurrency` threads; returns (latencies ms, errors, seconds)."""
+    parts = urllib.parse.urlsplit(url)
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    next_index = iter(range(len(payloads)))
+
+    def client():
+        connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        local = []
+        try:
+            while True:
+                with lock:
+                    i = next(next_index, None)
+                if i is None:
+                    break
+                start = time.perf_counter()
+                try:
+                    connection.request('POST', '/predict', body=payloads[i],
+                                       headers={'Content-Type': 'application/json'})
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status != 200:
+                        raise RuntimeError(f"HTTP {response.status}")
+                except Exception as e:
+                    connection.close()
+                    with lock:
+                        errors.append(str(e))
+                    continue
+                local.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+            with lock:
+                latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.asarray(latencies), errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the FnB prediction HTTP service")
+    parser.add_argument('--url', help="Target a running service instead of starting one")
+    parser.add_argument('--concurrency', default='1,4,16,64', help="Comma-separated client thread counts")
+    parser.add_argument('--requests', type=int, default=2000, help="Requests per concurrency level")
+    parser.add_argument('--workers', type=int, default=2, help="Service scoring processes (when started here)")
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_service(args)
+    try:
+        _, options = request_json(url + '/options')
+        payloads = make_payloads(options, args.requests, args.seed)
+        run_level(url, payloads[:50], 4)  # warm-up
+
+        print(f"=== Prediction service load test: {url}, {args.requests} requests per level ===")
+        print(f"{'clients':>7} {'req/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+              f"{'batch':>6} {'errors':>6}")
+        for concurrency in [int(level) for level in args.concurrency.split(',')]:
+            before = request_json(url + '/health')[1]['micro_batching']
+            latencies, errors, seconds = run_level(url, payloads, concurrency)
+            after = request_json(url + '/health')[1]['micro_batching']
+            batches = after['batches'] - before['batches']
+            mean_batch = (after['items'] - before['items']) / batches if batches else 0.0
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) if len(latencies) else (np.nan,) * 3
+            print(f"{concurrency:>7} {len(latencies) / seconds:>9.0f} {p50:>8.2f} {p90:>8.2f} {p99:>8.2f} "
+                  f"{latencies.max() if len(latencies) else np.nan:>8.2f} {mean_batch:>6.1f} {len(errors):>6}")
+            if errors:
+                print(f"        first error: {errors[0]}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
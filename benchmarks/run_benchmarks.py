@@ -0,0 +1,425 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark suite for the prediction and enrichment hot paths.
+
+`run` first runs the correctness checks (a failure exits with status 1
+before anything is timed), then times each benchmark below and writes
+the metrics as JSON; `compare` checks a result file against a stored baseline and exits with
+status 1 if any metric got worse by more than --threshold.
+
+    cold_start        fresh interpreter: import + app.load_assets() and
+                      import + load_model_and_components() (CLI)
+    make_prediction   single-row app.make_prediction() latency (no batcher)
+    predict_proba     scoring-model throughput at several batch sizes
+    features          fnb_features.build_feature_matrix() throughput
+    places            search_place_details() and cari_alamat_taman() against
+                      FakePlacesClient (no network, no delays): the Python
+                      overhead of one lookup including the query fallbacks
+
+    labels (check)    model.predict() == argmax of the app's scoring path
+                      (bench_single_inference.check_labels) over 20,000
+                      requests covering every kecamatan and category
+    resume (check)    get_rating_API streaming output cut by a "crash" inside
+                      a quoted multi-line alamat resumes to the same rows as
+                      an uninterrupted run, without duplicates
+
+Every metric is the median over --repeats runs. The results carry the
+environment (Python, library versions, CPUs, git commit); compare results
+from the same machine only.
+
+Usage:
+    python benchmarks/run_benchmarks.py run --output bench_results.json
+    python benchmarks/run_benchmarks.py run --only make_prediction,predict_proba --compare benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py compare benchmarks/baseline.json bench_results.json --threshold 0.15
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+BASELINE_PATH = os.path.join(ROOT_DIR, 'benchmarks', 'baseline.json')
+SUITE_VERSION = 1
+
+CHECKS = ['labels', 'resume']
+BENCHMARKS = ['cold_start', 'make_prediction', 'predict_proba', 'features', 'places']
+PROBA_BATCH_SIZES = [1, 16, 256, 4096]
+DEFAULT_THRESHOLD = 0.15
+
+# Runs in a fresh interpreter so imports and artifact loading are cold
+COLD_START_CODE = {
+    'app': "import app\n"
+           "t1 = time.perf_counter()\n"
+           "app.load_assets()\n",
+    'cli': "import predict_fnb_business_success as cli\n"
+           "t1 = time.perf_counter()\n"
+           "cli.load_model_and_components()\n",
+}
+COLD_START_TEMPLATE = """
+import contextlib, io, json, time, warnings
+warnings.filterwarnings('ignore')
+t0 = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+{body}
+t2 = time.perf_counter()
+print(json.dumps({{'import_s': t1 - t0, 'load_s': t2 - t1}}))
+"""
+
+
+def metric(value, unit, better):
+    return {'value': float(value), 'unit': unit, 'better': better}
+
+
+def median_of(runs, key):
+    return float(np.median([run[key] for run in runs]))
+
+
+def check_labels(rows=20_000):
+    from artifact_loader import load_artifacts
+    from bench_single_inference import KECAMATAN_DATA_PATH, MODEL_DIR, check_labels, make_requests
+    from fnb_features import build_kecamatan_table
+
+    artifacts, _ = load_artifacts(MODEL_DIR)
+    with open(KECAMATAN_DATA_PATH, 'r', encoding='utf-8') as f:
+        kecamatan_table = build_kecamatan_table(json.load(f))
+    requests = make_requests(kecamatan_table, len(artifacts['le_kategori'].classes_), rows)
+    return f"labels identical for {check_labels(kecamatan_table, requests, artifacts):,} requests"
+
+
+def check_resume(rows=40, chunk_size=8):
+    import functools
+    import shutil
+    import tempfile
+
+    import pandas as pd
+
+    from get_rating_API import CSV_READ_OPTIONS, enrich_csv_streaming, search_place_details
+    from places_enrichment import FakePlacesClient
+
+    def enrich_into(output_file):
+        enrich_csv_streaming(input_file, output_file, functools.partial(search_place_details, query_delay=0),
+                             FakePlacesClient(latency=0), chunk_size=chunk_size, requests_per_second=1e6)
+        return pd.read_csv(output_file, **CSV_READ_OPTIONS).drop(columns='processed_at')
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        input_file = os.path.join(tmp_dir, 'input.csv')
+        pd.DataFrame({
+            'nama': [f"Warung \"Kopi\" {i}" for i in range(rows)],
+            'alamat': [f"Jl. Dago No. {i},\nRT 0{i % 9}/RW 02,\nCoblong" for i in range(rows)],
+        }).to_csv(input_file, index=False)
+        expected = enrich_into(os.path.join(tmp_dir, 'expected.csv'))
+        with open(os.path.join(tmp_dir, 'expected.csv'), 'rb') as f:
+            data = f.read()
+
+        # Cut after an embedded newline (looks like a complete line) and mid-field, in a later chunk
+        alamat_start = data.index(b'"Jl. Dago No. 20,')
+        cuts = [data.index(b'\n', alamat_start) + 1, alamat_start + 8]
+        for cut in cuts:
+            output_file = os.path.join(tmp_dir, f'cut_{cut}.csv')
+            with open(output_file, 'wb') as f:
+                f.write(data[:cut])
+            resumed = enrich_into(output_file)
+            assert resumed.equals(expected), f"resume after a cut at byte {cut} differs from an uninterrupted run"
+    finally:
+        shutil.rmtree(tmp_dir)
+    return f"{len(cuts)} cuts inside a quoted multi-line alamat resumed to {len(expected)} rows"
+
+
+CHECK_FUNCTIONS = {
+    'labels': check_labels,
+    'resume': check_resume,
+}
+
+
+def bench_cold_start(repeats):
+    metrics = {}
+    for name, body in COLD_START_CODE.items():
+        code = COLD_START_TEMPLATE.format(body='\n'.join('    ' + line for line in body.splitlines()))
+        runs = []
+        for _ in range(repeats):
+            output = subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, capture_output=True,
+                                    text=True, check=True).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        metrics[f'cold_start.{name}.import_s'] = metric(median_of(runs, 'import_s'), 's', 'lower')
+        metrics[f'cold_start.{name}.load_s'] = metric(median_of(runs, 'load_s'), 's', 'lower')
+        metrics[f'cold_start.{name}.total_s'] = metric(
+            float(np.median([run['import_s'] + run['load_s'] for run in runs])), 's', 'lower')
+    return metrics
+
+
+def _load_app_assets():
+    import streamlit.logger
+
+    # Bare mode (no `streamlit run`) logs a warning per cached call
+    streamlit.logger.set_log_level('error')
+    os.chdir(ROOT_DIR)  # app.py opens its data files relative to the repo root
+    import app
+    return app, app.load_assets()
+
+
+def bench_make_prediction(repeats, calls=2000):
+    app, assets = _load_app_assets()
+    rng = random.Random(0)
+    kecamatan = sorted(assets['kecamatan_table']['names'])
+    kategori = list(assets['le_kategori'].classes_)
+    requests = [(rng.choice(kecamatan), rng.choice(kategori), round(rng.uniform(3.5, 4.7), 1),
+                 rng.randint(10, 500), rng.randint(1, 4)) for _ in range(calls)]
+
+    runs = []
+    for _ in range(repeats):
+        latencies = np.empty(calls)
+        for i, request in enumerate(requests):
+            start = time.perf_counter()
+            app.make_prediction(assets, *request)
+            latencies[i] = time.perf_counter() - start
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        runs.append({'p50': p50, 'p99': p99, 'rate': calls / latencies.sum()})
+    return {
+        'make_prediction.p50_ms': metric(median_of(runs, 'p50'), 'ms', 'lower'),
+        'make_prediction.p99_ms': metric(median_of(runs, 'p99'), 'ms', 'lower'),
+        'make_prediction.calls_per_s': metric(median_of(runs, 'rate'), 'calls/s', 'higher'),
+    }
+
+
+def bench_predict_proba(repeats, rows_per_size=8192):
+    from artifact_loader import load_artifacts
+    from bench_feature_engineering import make_synthetic_rows
+    from fnb_features import build_feature_matrix
+    from fnb_scoring import scale_features
+
+    artifacts, _ = load_artifacts(os.path.join(ROOT_DIR, 'models', 'competition'))
+    model = artifacts['scoring_model']
+    columns = make_synthetic_rows(max(PROBA_BATCH_SIZES), seed=0)
+    X = scale_features(artifacts['scaler'], build_feature_matrix(columns))
+
+    metrics = {}
+    for batch_size in PROBA_BATCH_SIZES:
+        batches = max(1, rows_per_size // batch_size)
+        batch = X[:batch_size]
+        model.predict_proba(batch)  # warm-up
+        runs = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(batches):
+                model.predict_proba(batch)
+            runs.append({'rate': batches * batch_size / (time.perf_counter() - start)})
+        metrics[f'predict_proba.batch_{batch_size}.rows_per_s'] = metric(median_of(runs, 'rate'), 'rows/s', 'higher')
+    return metrics
+
+
+def bench_features(repeats, n_rows=1_000_000):
+    from bench_feature_engineering import make_synthetic_rows
+    from fnb_features import FEATURE_NAMES, build_feature_matrix
+
+    columns = make_synthetic_rows(n_rows, seed=0)
+    out = np.empty((n_rows, len(FEATURE_NAMES)), dtype=np.float64, order='F')
+    runs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        build_feature_matrix(columns, out=out)
+        runs.append({'rate': n_rows / (time.perf_counter() - start)})
+    return {'features.build_feature_matrix.rows_per_s': metric(median_of(runs, 'rate'), 'rows/s', 'higher')}
+
+
+def bench_places(repeats, lookups=2000):
+    from get_address_taman_full import cari_alamat_taman
+    from get_rating_API import search_place_details
+    from places_enrichment import FakePlacesClient
+
+    rows = [(f"Warung Kopi {i}", f"Jl. Dago No. {i}, Coblong") for i in range(lookups)]
+    taman = [{'nama_taman': f"Taman {i}", 'kecamatan': 'Coblong'} for i in range(lookups)]
+    cases = {
+        'search_place_details': lambda client: [search_place_details(client, name, address, query_delay=0)
+                                                for name, address in rows],
+        'cari_alamat_taman': lambda client: [cari_alamat_taman(client, row, query_delay=0) for row in taman],
+    }
+
+    metrics = {}
+    for name, run_lookups in cases.items():
+        runs = []
+        for _ in range(repeats):
+            client = FakePlacesClient(latency=0)
+            start = time.perf_counter()
+            run_lookups(client)
+            seconds = time.perf_counter() - start
+            runs.append({'rate': lookups / seconds, 'calls': sum(client.calls.values()) / lookups})
+        metrics[f'places.{name}.lookups_per_s'] = metric(median_of(runs, 'rate'), 'lookups/s', 'higher')
+        metrics[f'places.{name}.api_calls_per_lookup'] = metric(median_of(runs, 'calls'), 'calls', 'lower')
+    return metrics
+
+
+BENCHMARK_FUNCTIONS = {
+    'cold_start': bench_cold_start,
+    'make_prediction': bench_make_prediction,
+    'predict_proba': bench_predict_proba,
+    'features': bench_features,
+    'places': bench_places,
+}
+
+
+def environment():
+    import pandas as pd
+    import sklearn
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scikit-learn': sklearn.__version__,
+        'git_commit': commit,
+    }
+
+
+def run_checks(names=CHECKS):
+    """Run the correctness checks; returns the names of those that failed."""
+    failed = []
+    for name in names:
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                detail = CHECK_FUNCTIONS[name]()
+        except Exception as e:
+            print(f"❌ check {name}: {type(e).__name__}: {e}")
+            failed.append(name)
+        else:
+            print(f"✅ check {name}: {detail}")
+    return failed
+
+
+def run_suite(names, repeats):
+    metrics = {}
+    for name in names:
+        print(f"⏱️ {name} ...", flush=True)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = BENCHMARK_FUNCTIONS[name](repeats)
+        for key, result in results.items():
+            print(f"   {key:<52} {result['value']:>14,.3f} {result['unit']}")
+        print(f"   ({time.perf_counter() - start:.1f}s)")
+        metrics.update(results)
+    return {
+        'suite_version': SUITE_VERSION,
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'settings': {'benchmarks': names, 'repeats': repeats},
+        'metrics': metrics,
+    }
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Relative change of every metric present in both results.
+
+    Returns:
+        list: (name, baseline value, current value, change, regressed)
+        with change > 0 meaning better.
+    """
+    rows = []
+    for name, base in baseline['metrics'].items():
+        if name not in current['metrics']:
+            continue
+        value = current['metrics'][name]['value']
+        change = (value - base['value']) / base['value'] if base['value'] else 0.0
+        if base['better'] == 'lower':
+            change = -change
+        rows.append((name, base['value'], value, change, change < -threshold))
+    return rows
+
+
+def print_comparison(baseline, current, threshold):
+    rows = compare_results(baseline, current, threshold)
+    print(f"Baseline: {baseline['created_at']} @ {baseline['environment']['git_commit']}, "
+          f"current: {current['created_at']} @ {current['environment']['git_commit']}")
+    differences = [key for key in sorted(set(baseline['environment']) | set(current['environment']))
+                   if key != 'git_commit' and baseline['environment'].get(key) != current['environment'].get(key)]
+    if differences:
+        print("⚠️ Environments differ; changes may not be regressions:")
+        for key in differences:
+            print(f"   {key}: {baseline['environment'].get(key)} -> {current['environment'].get(key)}")
+    print(f"{'metric':<52} {'baseline':>14} {'current':>14} {'change':>8}")
+    for name, base, value, change, regressed in rows:
+        flag = '  ❌ regression' if regressed else ''
+        print(f"{name:<52} {base:>14,.3f} {value:>14,.3f} {change:>+8.1%}{flag}")
+    run = current['settings']['benchmarks']
+    missing = sorted(name for name in set(baseline['metrics']) - set(current['metrics'])
+                     if name.split('.')[0] in run)
+    if missing:
+        print(f"Not in the current results: {', '.join(missing)}")
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {threshold:.0%}")
+    else:
+        print(f"\n✅ No regressions beyond {threshold:.0%} ({len(rows)} metrics compared)")
+    return not regressions
+
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite for the prediction and enrichment hot paths")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Run the benchmarks and write JSON results")
+    run_parser.add_argument('--only', help=f"Comma-separated subset of: {','.join(BENCHMARKS)}")
+    run_parser.add_argument('--repeats', type=int, default=5, help="Runs per metric (the median is kept)")
+    run_parser.add_argument('--output', default='bench_results.json', help="Results JSON")
+    run_parser.add_argument('--compare', metavar='BASELINE', help="Compare against this baseline afterwards")
+    run_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help="Relative change counted as a regression (0.15 = 15%%)")
+    run_parser.add_argument('--skip-checks', action='store_true', help="Time without running the correctness checks")
+
+    compare_parser = subparsers.add_parser('compare', help="Flag regressions against a baseline")
+    compare_parser.add_argument('baseline', nargs='?', default=BASELINE_PATH)
+    compare_parser.add_argument('current', nargs='?', default='bench_results.json')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        names = args.only.split(',') if args.only else BENCHMARKS
+        unknown = sorted(set(names) - set(BENCHMARKS))
+        if unknown:
+            parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+        warnings.filterwarnings('ignore')
+        output = os.path.abspath(args.output)  # make_prediction changes into the repo root
+        if not args.skip_checks and run_checks():
+            print("❌ Correctness checks failed; nothing timed")
+            return 1
+        results = run_suite(names, args.repeats)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results written to: {output}")
+        if not args.compare:
+            return 0
+        print()
+        return 0 if print_comparison(load_results(args.compare), results, args.threshold) else 1
+
+    return 0 if print_comparison(load_results(args.baseline), load_results(args.current), args.threshold) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Business-logic validation of prediction targets (rating, review count).
+
+Shared by the Streamlit app (app.py), the HTTP prediction service
+(prediction_service.py) and the batch CLI so they reject and warn about
+the same inputs with the same messages.
+
+The rules are data: RULES lists each rule's condition over the request
+(rating, ulasan, review_pct = reviews as % of the kecamatan population)
+against named THRESHOLDS. evaluate_rules() applies them as boolean masks
+over whole arrays and returns one bitmask of violated rules per row
+(RULE_CODES); message strings are only formatted when
+RuleViolations.messages() is called for a row. Rules in the same group
+are exclusive, as in an if/elif chain: the first matching rule wins.
+"""
+
+import operator
+
+import numpy as np
+
+# Cut-offs from the dataset analysis (rating mean 4.51, reviews P90 958,
+# P95 2,819, P99 5,025; rating >= 4.8 has at most 200 reviews, mean 79).
+# validation_stats.py recomputes the data-driven ones from the dataset.
+THRESHOLDS = {
+    'high_rating': 4.8,
+    'high_rating_review_cap': 200,
+    'high_rating_review_warn': 100,
+    'good_rating': 4.5,
+    'good_rating_review_strict': 1000,
+    'good_rating_review_warn': 500,
+    'reviews_p99': 5000,
+    'reviews_p95': 2800,
+    'reviews_p90': 950,
+    'population_error_pct': 3,
+    'population_warn_pct': 1,
+    'min_rating': 3.0,
+    'low_rating': 3.5,
+    'quality_rating': 4.0,
+    'quality_reviews': 500,
+    # Reference statistics quoted in the messages
+    'rating_mean': 4.51,
+    'high_rating_review_mean': 79,
+}
+
+OPERATORS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+
+# Evaluation and message order (matches the original if/elif chains)
+RULES = [
+    {'name': 'high_rating_too_many_reviews', 'group': 'rating_reviews', 'severity': 'error',
+     'when': [('rating', '>=', 'high_rating'), ('ulasan', '>', 'high_rating_review_cap')],
+     'message': "Rating {rating} dengan {ulasan:,} ulasan sangat tidak realistis. "
+                "Dari dataset real, bisnis dengan rating ≥{high_rating} maksimal hanya "
+                "{high_rating_review_cap} ulasan (rata-rata {high_rating_review_mean})."},
+    {'name': 'high_rating_many_reviews', 'group': 'rating_reviews', 'severity': 'warning',
+     'when': [('rating', '>=', 'high_rating'), ('ulasan', '>', 'high_rating_review_warn')],
+     'message': "Rating {rating} dengan {ulasan} ulasan cukup optimis. "
+                "Bisnis rating tinggi dalam dataset rata-rata hanya {high_rating_review_mean} ulasan."},
+    {'name': 'good_rating_very_many_reviews', 'group': 'rating_reviews', 'severity': 'warning',
+     'when': [('rating', '>=', 'good_rating'), ('rating', '<', 'high_rating'),
+              ('ulasan', '>', 'good_rating_review_strict')],
+     'message': "Rating {rating} dengan {ulasan:,} ulasan memerlukan kualitas sangat konsisten."},
+    {'name': 'good_rating_many_reviews', 'group': 'rating_reviews', 'severity': 'warning',
+     'when': [('rating', '>=', 'good_rating'), ('rating', '<', 'high_rating'),
+              ('ulasan', '>', 'good_rating_review_warn')],
+     'message': "Mempertahankan rating {rating} dengan {ulasan} ulasan butuh manajemen kualitas ketat."},
+    {'name': 'reviews_above_p99', 'group': 'reviews', 'severity': 'error',
+     'when': [('ulasan', '>', 'reviews_p99')],
+     'message': "Target {ulasan:,} ulasan melebihi 99% bisnis terbaik di dataset "
+                "(maksimal realistis: ~{reviews_p99:,} ulasan)."},
+    {'name': 'reviews_above_p95', 'group': 'reviews', 'severity': 'warning',
+     'when': [('ulasan', '>', 'reviews_p95')],
+     'message': "Target {ulasan:,} ulasan sangat tinggi - hanya 5% bisnis terbaik yang mencapainya."},
+    {'name': 'reviews_above_p90', 'group': 'reviews', 'severity': 'warning',
+     'when': [('ulasan', '>', 'reviews_p90')],
+     'message': "Target {ulasan:,} ulasan tinggi - perlu strategi marketing dan kualitas konsisten."},
+    {'name': 'population_share_unrealistic', 'group': 'population', 'severity': 'error',
+     'when': [('review_pct', '>', 'population_error_pct')],
+     'message': "Target ulasan ({ulasan:,}) tidak realistis untuk populasi {penduduk:,.0f} orang "
+                "({review_pct:.1f}% populasi). Maksimal realistis: ~{max_reviews:,} ulasan."},
+    {'name': 'population_share_optimistic', 'group': 'population', 'severity': 'warning',
+     'when': [('review_pct', '>', 'population_warn_pct')],
+     'message': "Target {review_pct:.1f}% populasi memberi ulasan cukup optimis."},
+    {'name': 'rating_too_low', 'group': 'low_rating', 'severity': 'error',
+     'when': [('rating', '<', 'min_rating')],
+     'message': "Rating {rating} terlalu rendah untuk bisnis yang viable. "
+                "Minimal target rating {min_rating} untuk bisnis yang sustainable."},
+    {'name': 'rating_below_market', 'group': 'low_rating', 'severity': 'warning',
+     'when': [('rating', '<', 'low_rating')],
+     'message': "Rating {rating} di bawah rata-rata market ({rating_mean}). Pertimbangkan target yang lebih tinggi."},
+    {'name': 'low_rating_many_reviews', 'group': 'quality', 'severity': 'warning',
+     'when': [('rating', '<', 'quality_rating'), ('ulasan', '>', 'quality_reviews')],
+     'message': "Rating {rating} dengan {ulasan} ulasan menunjukkan masalah kualitas yang serius."},
+]
+
+# Rule name -> bit in the per-row violation code
+RULE_CODES = {rule['name']: 1 << i for i, rule in enumerate(RULES)}
+ERROR_CODES = sum(RULE_CODES[rule['name']] for rule in RULES if rule['severity'] == 'error')
+CODE_DTYPE = np.uint16
+
+
+class RuleViolations:
+    """
+    Per-row violation codes with lazily rendered messages.
+
+    Attributes:
+        codes: uint16 array, bit RULE_CODES[name] set for each violated rule.
+    """
+
+    def __init__(self, codes, target_ulasan, target_rating, jumlah_penduduk, thresholds):
+        self.codes = codes
+        self._ulasan = target_ulasan
+        self._rating = target_rating
+        self._penduduk = jumlah_penduduk
+        self._thresholds = thresholds
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def has_errors(self):
+        """Boolean mask of rows rejected by at least one error rule."""
+        return (self.codes & ERROR_CODES) != 0
+
+    def rule_names(self, row):
+        """Names of the rules violated by one row."""
+        code = int(self.codes[row])
+        return [rule['name'] for rule in RULES if code & RULE_CODES[rule['name']]]
+
+    def messages(self, row):
+        """
+        Format the messages of one row.
+
+        Returns:
+            tuple: (warnings, errors) lists of strings, as validate_business_logic.
+        """
+        return render_messages(int(self.codes[row]), self._ulasan[row].item(), self._rating[row].item(),
+                               self._penduduk[row].item(), self._thresholds)
+
+
+def render_messages(code, target_ulasan, target_rating, jumlah_penduduk, thresholds=THRESHOLDS):
+    """(warnings, errors) message lists for one violation code."""
+    warnings, errors = [], []
+    if not code:
+        return warnings, errors
+    fields = dict(thresholds, rating=target_rating, ulasan=target_ulasan, penduduk=jumlah_penduduk,
+                  review_pct=(target_ulasan / jumlah_penduduk) * 100,
+                  max_reviews=int(jumlah_penduduk * (thresholds['population_error_pct'] / 100)))
+    for rule in RULES:
+        if code & RULE_CODES[rule['name']]:
+            (errors if rule['severity'] == 'error' else warnings).append(rule['message'].format(**fields))
+    return warnings, errors
+
+
+def rule_code(target_ulasan, target_rating, jumlah_penduduk, thresholds=THRESHOLDS):
+    """Violation code of a single request (plain Python, no array overhead)."""
+    values = {'ulasan': target_ulasan, 'rating': target_rating,
+              'review_pct': (target_ulasan / jumlah_penduduk) * 100}
+    code = 0
+    matched = set()
+    for rule in RULES:
+        if rule['group'] in matched:
+            continue
+        if all(OPERATORS[op](values[field], thresholds[threshold]) for field, op, threshold in rule['when']):
+            code |= RULE_CODES[rule['name']]
+            matched.add(rule['group'])
+    return code
+
+
+def evaluate_rules(target_ulasan, target_rating, jumlah_penduduk, thresholds=None):
+    """
+    Evaluate every rule over arrays of requests.
+
+    Args:
+        target_ulasan, target_rating, jumlah_penduduk: Scalars or arrays
+            broadcastable to length N (the kecamatan population per row).
+        thresholds: Overrides for THRESHOLDS.
+
+    Returns:
+        RuleViolations
+    """
+    thresholds = dict(THRESHOLDS, **(thresholds or {}))
+    ulasan, rating, penduduk = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(target_ulasan)), np.atleast_1d(np.asarray(target_rating)),
+        np.atleast_1d(np.asarray(jumlah_penduduk))
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = {'ulasan': ulasan, 'rating': rating, 'review_pct': (ulasan / penduduk) * 100}
+
+    codes = np.zeros(len(ulasan), dtype=CODE_DTYPE)
+    unmatched = {}
+    for rule in RULES:
+        hit = unmatched.setdefault(rule['group'], np.ones(len(ulasan), dtype=bool)).copy()
+        for field, op, threshold in rule['when']:
+            hit &= OPERATORS[op](values[field], thresholds[threshold])
+        unmatched[rule['group']] &= ~hit
+        codes[hit] |= CODE_DTYPE(RULE_CODES[rule['name']])
+    return RuleViolations(codes, ulasan, rating, penduduk, thresholds)
+
+
+def validate_business_logic(target_ulasan, target_rating, kecamatan_data, thresholds=None):
+    """
+    Validasi logika bisnis berdasarkan analisis data real dari dataset.
+    Data menunjukkan:
+    - Rating rata-rata: 4.51
+    - Ulasan rata-rata: 517, median: 202
+    - Bisnis dengan rating ≥4.8: rata-rata hanya 79 ulasan, maksimal 200 ulasan
+    - P95 ulasan: 2,819
+    - P99 ulasan: 5,025
+
+    Versi satu request dari evaluate_rules; mengembalikan (warnings, errors).
+    thresholds menimpa THRESHOLDS, mis. hasil validation_stats.load_thresholds().
+    """
+    thresholds = dict(THRESHOLDS, **thresholds) if thresholds else THRESHOLDS
+    jumlah_penduduk = kecamatan_data['Jumlah Penduduk']
+    code = rule_code(target_ulasan, target_rating, jumlah_penduduk, thresholds)
+    return render_messages(code, target_ulasan, target_rating, jumlah_penduduk, thresholds)
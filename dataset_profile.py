@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Single-pass, chunked dataset profiler.
+
+profile_dataset() reads a CSV or Parquet file chunk by chunk and updates
+one ColumnProfile per column: row and missing counts, exact value counts
+(up to MAX_TRACKED_VALUES distinct values), and for numeric columns
+min/max, mean/std (merged per chunk with Chan's parallel formulas),
+KLL quantiles and the Pearson correlation with a target column
+(pairwise-complete, like DataFrame.corr()). Memory depends on the chunk
+size and the number of distinct values, not on the number of rows. The
+result is a plain dict that serializes to JSON (NaN -> null).
+"""
+
+import json
+import math
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from dataset_store import iter_chunks
+from quantile_sketch import DEFAULT_K, KLLSketch
+
+DEFAULT_CHUNK_SIZE = 50_000
+DEFAULT_TARGET = 'google_rating'
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Beyond this many distinct values a column only reports a lower bound
+MAX_TRACKED_VALUES = 10_000
+TOP_VALUES = 10
+
+
+class _Moments:
+    """Running count/mean/M2, merged per chunk."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x):
+        n_b = len(x)
+        if not n_b:
+            return
+        mean_b = float(x.mean())
+        m2_b = float(((x - mean_b) ** 2).sum())
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * self.n * n_b / n
+        self.n = n
+
+    def std(self):
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else math.nan
+
+
+class _CoMoments:
+    """Running Pearson correlation over rows where both values are present."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.c_xy = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+
+    def update(self, x, y):
+        both = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[both], y[both]
+        n_b = len(x)
+        if not n_b:
+            return
+        mean_x, mean_y = float(x.mean()), float(y.mean())
+        dx, dy = x - mean_x, y - mean_y
+        n = self.n + n_b
+        delta_x, delta_y = mean_x - self.mean_x, mean_y - self.mean_y
+        factor = self.n * n_b / n
+        self.c_xy += float((dx * dy).sum()) + delta_x * delta_y * factor
+        self.m2_x += float((dx * dx).sum()) + delta_x ** 2 * factor
+        self.m2_y += float((dy * dy).sum()) + delta_y ** 2 * factor
+        self.mean_x += delta_x * n_b / n
+        self.mean_y += delta_y * n_b / n
+        self.n = n
+
+    def correlation(self):
+        denominator = math.sqrt(self.m2_x * self.m2_y)
+        return self.c_xy / denominator if self.n > 1 and denominator > 0 else math.nan
+
+
+def _python_value(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+class ColumnProfile:
+    """Streaming statistics for one column."""
+
+    def __init__(self, name, numeric, sketch_k=DEFAULT_K, seed=0):
+        self.name = name
+        self.numeric = numeric
+        self.rows = 0
+        self.missing = 0
+        self.values = Counter()
+        self.distinct_floor = 0
+        if numeric:
+            self.moments = _Moments()
+            self.sketch = KLLSketch(k=sketch_k, seed=seed)
+            self.target_moments = _CoMoments()
+
+    def update(self, series, target=None):
+        """Fold one chunk of the column in (target: float array of the target column)."""
+        missing = series.isna()
+        self.rows += len(series)
+        self.missing += int(missing.sum())
+        present = series[~missing]
+
+        if self.values is not None:
+            counts = present.value_counts()
+            counts = counts[counts > 0]
+            self.values.update(dict(zip(counts.index.tolist(), counts.to_numpy().tolist())))
+            if len(self.values) > MAX_TRACKED_VALUES:
+                self.distinct_floor = len(self.values)
+                self.values = None
+        else:
+            self.distinct_floor = max(self.distinct_floor, int(present.nunique()))
+
+        if self.numeric:
+            x = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64)
+            valid = x[~np.isnan(x)]
+            self.moments.update(valid)
+            self.sketch.update(valid)
+            if target is not None:
+                self.target_moments.update(x, target)
+
+    def to_dict(self, quantiles=DEFAULT_QUANTILES, with_target=True):
+        profile = {
+            'kind': 'numeric' if self.numeric else 'categorical',
+            'rows': self.rows,
+            'missing': self.missing,
+            'missing_pct': self.missing / self.rows * 100 if self.rows else 0.0,
+            'distinct': len(self.values) if self.values is not None else None,
+            'distinct_at_least': len(self.values) if self.values is not None else self.distinct_floor,
+        }
+        if self.values is not None:
+            profile['top_values'] = [[value, count] for value, count in self.values.most_common(TOP_VALUES)]
+            profile['bottom_values'] = [[value, count] for value, count in self.values.most_common()[-5:]]
+        if self.numeric:
+            present = self.moments.n > 0
+            profile.update({
+                'min': self.sketch.min if present else math.nan,
+                'max': self.sketch.max if present else math.nan,
+                'mean': self.moments.mean if present else math.nan,
+                'std': self.moments.std(),
+                'quantiles': {str(q): float(value)
+                              for q, value in zip(quantiles, self.sketch.quantiles(quantiles))},
+                'correlation_with_target': self.target_moments.correlation() if with_target else None,
+            })
+            if self.values is not None:
+                profile['lowest_values'] = [[value, self.values[value]] for value in sorted(self.values)[:TOP_VALUES]]
+        return profile
+
+
+def profile_chunks(chunks, target=DEFAULT_TARGET, quantiles=DEFAULT_QUANTILES, sketch_k=DEFAULT_K, seed=0):
+    """
+    Profile an iterable of DataFrame chunks in a single pass.
+
+    Column kinds (numeric or categorical) are fixed by the first chunk;
+    later numeric chunks are coerced with pd.to_numeric.
+
+    Returns:
+        dict: rows, chunks, memory_bytes, target, columns (per-column
+        profiles), correlations (|r| descending), numeric_columns and
+        completeness_pct.
+    """
+    profiles = None
+    rows = 0
+    n_chunks = 0
+    memory_bytes = 0
+    for chunk in chunks:
+        if profiles is None:
+            profiles = {
+                name: ColumnProfile(name, pd.api.types.is_numeric_dtype(chunk[name]), sketch_k, seed)
+                for name in chunk.columns
+            }
+        target_values = None
+        if target in profiles and profiles[target].numeric:
+            target_values = pd.to_numeric(chunk[target], errors='coerce').to_numpy(dtype=np.float64)
+        for name, profile in profiles.items():
+            profile.update(chunk[name], target_values if name != target else None)
+        rows += len(chunk)
+        n_chunks += 1
+        memory_bytes += int(chunk.memory_usage(deep=True).sum())
+    profiles = profiles or {}
+
+    columns = {name: profile.to_dict(quantiles, with_target=name != target and target in profiles)
+               for name, profile in profiles.items()}
+    correlations = {
+        name: column['correlation_with_target'] for name, column in columns.items()
+        if column['kind'] == 'numeric' and name != target
+        and column['correlation_with_target'] is not None and not math.isnan(column['correlation_with_target'])
+    }
+    cells = rows * len(columns)
+    present = sum(column['rows'] - column['missing'] for column in columns.values())
+    return {
+        'rows': rows,
+        'chunks': n_chunks,
+        'memory_bytes': memory_bytes,
+        'target': target if target in profiles else None,
+        'columns': columns,
+        'correlations': dict(sorted(correlations.items(), key=lambda item: abs(item[1]), reverse=True)),
+        'numeric_columns': [name for name, column in columns.items() if column['kind'] == 'numeric'],
+        'completeness_pct': present / cells * 100 if cells else 0.0,
+    }
+
+
+def profile_dataset(path, chunk_size=DEFAULT_CHUNK_SIZE, columns=None, **kwargs):
+    """Profile a CSV or Parquet file chunk by chunk (see profile_chunks)."""
+    report = profile_chunks(iter_chunks(path, chunk_size, columns=columns), **kwargs)
+    report['source'] = path
+    report['chunk_size'] = chunk_size
+    return report
+
+
+def _json_safe(value):
+    if isinstance(value, dict):
+        return {str(key): _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    value = _python_value(value)
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def report_to_json(report, indent=2):
+    """Serialize a profile report; NaN/inf become null."""
+    return json.dumps(_json_safe(report), indent=indent, ensure_ascii=False)
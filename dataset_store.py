@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Typed Parquet storage for the restaurant datasets.
+
+The CSVs in datasets/ and models/competition/ are re-parsed with inferred
+dtypes by every script (object strings, float64/int64 everywhere). This
+module converts them once to Parquet with an explicit schema: categorical
+columns for repeated labels, float32 numerics and small integer types.
+load_dataset() then reads only the requested columns. A Parquet copy is
+rebuilt automatically when its CSV is newer.
+
+load_normalized() goes one step further: columns that only depend on the
+kecamatan (population, area, density, mall/minimarket/park counts and the
+features derived from them) move into a 30-row dimension table joined by
+an int8 kecamatan_id, and columns with a single value across the dataset
+(dataset_version, training_date, ...) move into DataFrame.attrs.
+
+Usage:
+    python dataset_store.py convert                 # all registered datasets
+    python dataset_store.py convert deployment
+    python dataset_store.py info
+    python dataset_store.py normalize deployment    # fact/dimension footprint
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+PARQUET_DIR = os.path.join(ROOT_DIR, 'datasets', 'parquet')
+
+# Registered datasets: name -> source CSV
+DATASETS = {
+    'competition_ready': os.path.join(ROOT_DIR, 'datasets', 'competition_ready_dataset.csv'),
+    'deployment': os.path.join(ROOT_DIR, 'datasets', 'used', 'final_enriched_dataset_for_deployment.csv'),
+    'competition': os.path.join(ROOT_DIR, 'models', 'competition', 'final_competition_dataset.csv'),
+    'restaurant_cleaned': os.path.join(ROOT_DIR, 'datasets', 'unused', 'restaurant_dataset_cleaned.csv'),
+}
+
+# Repeated labels stored as dictionary-encoded categoricals
+CATEGORY_COLUMNS = {
+    'kecamatan', 'kategori_resto', 'price_range_rupiah', 'rating_category', 'business_status',
+    'population_tier', 'density_tier', 'review_tier', 'success_category', 'market_attractiveness',
+    'business_viability', 'competition_target', 'dataset_version', 'training_date'
+}
+
+# Free-text columns, stored as Arrow strings (pandas 2 would infer object)
+TEXT_COLUMNS = {'nama', 'alamat', 'processed_at'}
+TEXT_DTYPE = pd.StringDtype('pyarrow', na_value=np.nan)
+
+# Integer columns with a known range; other integers become int32
+INTEGER_COLUMNS = {
+    'jumlah_ulasan': 'int32',
+    'kategori_resto_encoded': 'int8',
+    'price_range_encoded': 'int8',
+    'price_category_interaction': 'int16',
+    'high_rating': 'int8',
+    'excellent_rating': 'int8',
+    'high_volume_reviews': 'int8',
+    'very_high_volume_reviews': 'int8',
+}
+
+
+def column_dtype(column, inferred):
+    """Storage dtype of one column given the dtype pandas inferred from the CSV."""
+    if column in CATEGORY_COLUMNS:
+        return 'category'
+    if column in TEXT_COLUMNS:
+        return TEXT_DTYPE
+    if column in INTEGER_COLUMNS and pd.api.types.is_integer_dtype(inferred):
+        return INTEGER_COLUMNS[column]
+    if pd.api.types.is_integer_dtype(inferred):
+        return 'int32'
+    if pd.api.types.is_float_dtype(inferred):
+        return 'float32'
+    return TEXT_DTYPE
+
+
+def dataset_schema(df):
+    """Explicit {column: dtype} schema for a DataFrame read from CSV."""
+    return {column: column_dtype(column, dtype) for column, dtype in df.dtypes.items()}
+
+
+def apply_schema(df, schema=None):
+    """Cast a DataFrame to its storage schema."""
+    schema = schema or dataset_schema(df)
+    return df.astype({column: dtype for column, dtype in schema.items() if column in df.columns})
+
+
+def csv_path(name):
+    """Source CSV of a registered dataset, or `name` itself if it is a path."""
+    return DATASETS.get(name, name)
+
+
+def parquet_path(name, parquet_dir=PARQUET_DIR):
+    stem = name if name in DATASETS else os.path.splitext(os.path.basename(name))[0]
+    return os.path.join(parquet_dir, f"{stem}.parquet")
+
+
+def parquet_is_current(name, parquet_dir=PARQUET_DIR):
+    """True if the Parquet copy exists and is not older than its CSV."""
+    path = parquet_path(name, parquet_dir)
+    return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(csv_path(name))
+
+
+def convert_dataset(name, parquet_dir=PARQUET_DIR):
+    """
+    Convert a dataset's CSV to typed Parquet.
+
+    Returns:
+        str: Path of the written Parquet file.
+    """
+    df = apply_schema(pd.read_csv(csv_path(name)))
+    path = parquet_path(name, parquet_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    df.to_parquet(tmp_path, engine='pyarrow', index=False, compression='zstd')
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_dataset(name, columns=None, convert=True, parquet_dir=PARQUET_DIR):
+    """
+    Load a dataset with its typed schema, reading only `columns`.
+
+    Args:
+        name: Key of DATASETS or a CSV path.
+        columns: Columns to read (None = all).
+        convert: Build or refresh the Parquet copy if it is missing or stale;
+            if False, a stale copy falls back to a typed CSV read.
+
+    Returns:
+        pd.DataFrame
+    """
+    if convert and not parquet_is_current(name, parquet_dir):
+        convert_dataset(name, parquet_dir)
+    if parquet_is_current(name, parquet_dir):
+        df = pd.read_parquet(parquet_path(name, parquet_dir), columns=columns, engine='pyarrow')
+        return df.astype({column: TEXT_DTYPE for column in df.columns if column in TEXT_COLUMNS})
+
+    header = pd.read_csv(csv_path(name), nrows=0)
+    schema = {column: column_dtype(column, dtype) for column, dtype in header.dtypes.items()}
+    # Numeric dtypes can only be forced once the CSV types are known
+    df = pd.read_csv(csv_path(name), usecols=columns,
+                     dtype={column: dtype for column, dtype in schema.items() if dtype == 'category'})
+    return apply_schema(df, dataset_schema(df))
+
+
+def iter_chunks(path, chunk_size, columns=None):
+    """Yield DataFrame chunks from a CSV or Parquet file without loading it whole."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.parquet', '.pq'):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    elif extension == '.csv':
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns)
+    else:
+        raise ValueError(f"Unsupported input format: {path} (expected .csv or .parquet)")
+
+
+def split_kecamatan_dimension(df):
+    """
+    Split a restaurant DataFrame into a fact table and a kecamatan dimension.
+
+    Columns (other than text columns) that hold one value per kecamatan go
+    to the dimension, indexed by kecamatan_id; columns with one value across
+    the whole frame are stored in facts.attrs['constants'].
+
+    Returns:
+        tuple: (facts, kecamatan)
+    """
+    constants = {}
+    kecamatan_columns = []
+    by_kecamatan = df.groupby('kecamatan', observed=True, sort=True)
+    for column in df.columns:
+        if column == 'kecamatan' or column in TEXT_COLUMNS:
+            continue
+        if df[column].nunique(dropna=False) <= 1:
+            value = df[column].iloc[0] if len(df) else None
+            constants[column] = value.item() if hasattr(value, 'item') else value
+        elif by_kecamatan[column].nunique(dropna=False).max() == 1:
+            kecamatan_columns.append(column)
+
+    kecamatan = by_kecamatan[kecamatan_columns].first().reset_index()
+    kecamatan['kecamatan'] = kecamatan['kecamatan'].astype(TEXT_DTYPE)
+    kecamatan.index = pd.RangeIndex(len(kecamatan), name='kecamatan_id')
+    ids = pd.Series(kecamatan.index, index=kecamatan['kecamatan']).astype('int8')
+
+    fact_columns = [column for column in df.columns if column not in constants and column not in kecamatan_columns]
+    facts = df[fact_columns].copy()
+    facts.insert(fact_columns.index('kecamatan'), 'kecamatan_id',
+                 ids.reindex(facts['kecamatan'].astype(TEXT_DTYPE)).to_numpy())
+    facts = facts.drop(columns='kecamatan')
+    facts.attrs = {'constants': constants, 'columns': list(df.columns)}
+    return facts, kecamatan
+
+
+def load_normalized(name, columns=None, convert=True, parquet_dir=PARQUET_DIR):
+    """
+    Load a dataset as (facts, kecamatan) tables (see split_kecamatan_dimension).
+
+    Args:
+        columns: Original column names to keep (None = all); 'kecamatan' is
+            always read to build the join key.
+    """
+    if columns is not None and 'kecamatan' not in columns:
+        columns = ['kecamatan'] + list(columns)
+    return split_kecamatan_dimension(load_dataset(name, columns=columns, convert=convert, parquet_dir=parquet_dir))
+
+
+def denormalize(facts, kecamatan, columns=None):
+    """Rebuild the wide per-restaurant frame (optionally only `columns`)."""
+    wide = facts.join(kecamatan, on='kecamatan_id').drop(columns='kecamatan_id')
+    for column, value in facts.attrs.get('constants', {}).items():
+        wide[column] = value
+    order = [column for column in facts.attrs.get('columns', wide.columns) if column in wide.columns]
+    wide = wide[order]
+    wide.attrs = {}
+    return wide if columns is None else wide[list(columns)]
+
+
+def frame_bytes(*frames):
+    """Deep in-memory size of one or more DataFrames."""
+    return int(sum(frame.memory_usage(deep=True).sum() for frame in frames))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert the restaurant CSVs to typed Parquet")
+    parser.add_argument('command', choices=['convert', 'info', 'normalize'])
+    parser.add_argument('datasets', nargs='*', help=f"Dataset names (default: all of {', '.join(DATASETS)})")
+    args = parser.parse_args(argv)
+    names = args.datasets or list(DATASETS)
+
+    for name in names:
+        if args.command == 'convert':
+            path = convert_dataset(name)
+            print(f"✅ {name}: {os.path.getsize(csv_path(name)):,} bytes CSV -> "
+                  f"{os.path.getsize(path):,} bytes Parquet ({path})")
+            continue
+
+        if args.command == 'normalize':
+            raw = pd.read_csv(csv_path(name))
+            inferred = frame_bytes(raw)
+            facts, kecamatan = load_normalized(name)
+            normalized = frame_bytes(facts, kecamatan)
+            text = frame_bytes(facts[[column for column in facts.columns if column in TEXT_COLUMNS]])
+            raw_text = frame_bytes(raw[[column for column in raw.columns if column in TEXT_COLUMNS]])
+            print(f"{name}: {len(facts):,} facts x {len(facts.columns)} cols + "
+                  f"{len(kecamatan)} kecamatan x {len(kecamatan.columns)} cols, "
+                  f"{len(facts.attrs['constants'])} constants")
+            print(f"  memory: {inferred / 1024:,.0f} KB inferred CSV -> {normalized / 1024:,.0f} KB normalized "
+                  f"({inferred / normalized:.1f}x)")
+            print(f"  without text columns: {(inferred - raw_text) / 1024:,.0f} KB -> "
+                  f"{(normalized - text) / 1024:,.0f} KB ({(inferred - raw_text) / (normalized - text):.1f}x)")
+            continue
+
+        status = "current" if parquet_is_current(name) else "missing/stale"
+        print(f"{name} [{status}] {csv_path(name)}")
+        if status == "current":
+            df = load_dataset(name, convert=False)
+            for column, dtype in df.dtypes.items():
+                print(f"  {column:<28} {str(dtype)}")
+
+
+if __name__ == "__main__":
+    main()
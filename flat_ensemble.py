@@ -0,0 +1,437 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Flattened inference engine for the soft-voting tree ensemble.
+
+final_competition_model.pkl is a VotingClassifier(voting='soft') over
+XGBoost, RandomForest and LightGBM. Calling its predict_proba goes through
+sklearn validation and three separate libraries per request. This module
+exports every tree of every member once, at load time, into one set of flat
+node arrays (feature, threshold, children, leaf values) and evaluates all
+trees together with vectorized NumPy.
+
+Split semantics are reproduced exactly:
+- RandomForest: float32(x) <= threshold
+- XGBoost:      float32(x) <  threshold (float32)
+- LightGBM:     x <= threshold (float64), including missing_type handling
+Float32 comparisons are rewritten as `<=` against float32-rounded values so
+that all trees share one comparison.
+"""
+
+import json
+
+import numpy as np
+
+# Maximum number of (row, tree, class) leaf values gathered at once
+_MAX_GATHER = 1 << 22
+
+# Batches larger than this go to the original model (native, multithreaded),
+# which overtakes NumPy tree traversal beyond a few dozen rows
+FLAT_MAX_ROWS = 32
+
+# Arrays needed by predict_proba (left/right are folded into children)
+_STATE_ARRAYS = ('feature', 'threshold', 'children', 'nan_left', 'zero_missing', 'default_left', 'value', 'roots')
+
+# LightGBM's kZeroThreshold for missing_type == 'Zero'
+_LGB_ZERO_THRESHOLD = 1e-35
+
+
+class UnsupportedModelError(ValueError):
+    """The model (or one of its members) uses a configuration the engine cannot flatten."""
+
+
+class _TreeBuilder:
+    """Accumulates trees into flat node arrays with global node ids."""
+
+    def __init__(self, n_features, n_classes):
+        self.n_features = n_features
+        self.n_classes = n_classes
+        self.feature = []
+        self.threshold = []
+        self.left = []
+        self.right = []
+        self.nan_left = []
+        self.zero_missing = []
+        self.default_left = []
+        self.value = []
+        self.roots = []
+        self.depths = []
+        self.n_nodes = 0
+
+    def add_tree(self, feature, threshold, left, right, value, use_float32,
+                 nan_left=None, zero_missing=None, default_left=None):
+        """
+        Add one tree given per-node arrays with local ids (-1 children mark leaves).
+
+        value has shape (n_nodes, n_classes). Float32 trees read their
+        features from the float32-rounded copy of X (offset n_features).
+        nan_left gives the direction of NaN inputs; nodes flagged in
+        zero_missing send zero inputs to default_left (LightGBM 'Zero').
+        """
+        feature = np.asarray(feature, dtype=np.int64)
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        is_leaf = left < 0
+        local_ids = np.arange(len(feature))
+        no_flags = np.zeros(len(feature), dtype=bool)
+        nan_left = no_flags if nan_left is None else np.asarray(nan_left, dtype=bool)
+        zero_missing = no_flags if zero_missing is None else np.asarray(zero_missing, dtype=bool)
+        default_left = no_flags if default_left is None else np.asarray(default_left, dtype=bool)
+
+        offset = self.n_nodes
+        self.feature.append(np.where(is_leaf, 0, feature + (self.n_features if use_float32 else 0)))
+        self.threshold.append(np.where(is_leaf, np.inf, np.asarray(threshold, dtype=np.float64)))
+        self.left.append(np.where(is_leaf, local_ids, left) + offset)
+        self.right.append(np.where(is_leaf, local_ids, right) + offset)
+        self.nan_left.append(nan_left & ~is_leaf)
+        self.zero_missing.append(zero_missing & ~is_leaf)
+        self.default_left.append(default_left & ~is_leaf)
+        self.value.append(np.asarray(value, dtype=np.float64).reshape(len(feature), self.n_classes))
+        self.roots.append(offset)
+        self.depths.append(_tree_depth(left, right))
+        self.n_nodes += len(feature)
+
+    def arrays(self):
+        return {
+            'feature': np.concatenate(self.feature).astype(np.int32),
+            'threshold': np.concatenate(self.threshold),
+            'left': np.concatenate(self.left).astype(np.int32),
+            'right': np.concatenate(self.right).astype(np.int32),
+            'nan_left': np.concatenate(self.nan_left),
+            'zero_missing': np.concatenate(self.zero_missing),
+            'default_left': np.concatenate(self.default_left),
+            'value': np.concatenate(self.value),
+            'roots': np.asarray(self.roots, dtype=np.int32),
+            'max_depth': np.int32(max(self.depths, default=0))
+        }
+
+
+def _tree_depth(left, right):
+    """Depth (number of splits on the longest path) of a tree with local child ids."""
+    depth, frontier = 0, np.array([0])
+    while True:
+        children = np.concatenate([left[frontier], right[frontier]])
+        children = children[children >= 0]
+        if len(children) == 0:
+            return depth
+        depth += 1
+        frontier = children
+
+
+def _float32_le_threshold(threshold, strict):
+    """
+    Float32 threshold t' such that float32(x) <= t' matches the original split.
+
+    strict=False: float32(x) <= t (t float64, RandomForest) -> round t down to float32.
+    strict=True:  float32(x) <  float32(t) (XGBoost)       -> next float32 below float32(t).
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    t32 = threshold.astype(np.float32)
+    if strict:
+        return np.nextafter(t32, np.float32(-np.inf)).astype(np.float64)
+    rounded_up = t32.astype(np.float64) > threshold
+    t32 = np.where(rounded_up, np.nextafter(t32, np.float32(-np.inf)), t32)
+    return t32.astype(np.float64)
+
+
+def _add_random_forest(builder, forest):
+    """Export a fitted RandomForestClassifier; returns member metadata."""
+    start = len(builder.roots)
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        value = tree.value[:, 0, :].astype(np.float64)
+        value = value / value.sum(axis=1, keepdims=True)
+        missing_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8))
+        builder.add_tree(
+            feature=tree.feature,
+            threshold=_float32_le_threshold(tree.threshold, strict=False),
+            left=tree.children_left,
+            right=tree.children_right,
+            value=value,
+            use_float32=True,
+            nan_left=np.asarray(missing_left, dtype=bool)
+        )
+    return {'kind': 'mean', 'start': start, 'stop': len(builder.roots), 'base': None}
+
+
+def _xgboost_tree_limit(model, n_classes):
+    """Number of trees used by predict_proba (honours early stopping)."""
+    try:
+        best_iteration = model.best_iteration
+    except AttributeError:
+        return None
+    if best_iteration is None:
+        return None
+    return (best_iteration + 1) * n_classes
+
+
+def _add_xgboost(builder, model):
+    """Export a fitted multi-class XGBClassifier (multi:softprob); returns member metadata."""
+    raw = model.get_booster().save_raw('json')
+    learner = json.loads(bytes(raw).decode('utf-8'))['learner']
+    objective = learner['objective']['name']
+    if objective != 'multi:softprob':
+        raise UnsupportedModelError(f"Unsupported XGBoost objective: {objective}")
+    booster = learner['gradient_booster']
+    if booster['name'] != 'gbtree':
+        raise UnsupportedModelError(f"Unsupported XGBoost booster: {booster['name']}")
+
+    base_score = learner['learner_model_param']['base_score']
+    base = np.atleast_1d(np.asarray(json.loads(base_score) if base_score.startswith('[') else float(base_score),
+                                    dtype=np.float64))
+    base = np.broadcast_to(base, (builder.n_classes,)).copy()
+
+    trees = booster['model']['trees']
+    tree_info = booster['model']['tree_info']
+    limit = _xgboost_tree_limit(model, builder.n_classes)
+    if limit is not None:
+        trees, tree_info = trees[:limit], tree_info[:limit]
+
+    start = len(builder.roots)
+    for tree, class_id in zip(trees, tree_info):
+        if any(tree['split_type']):
+            raise UnsupportedModelError("Categorical XGBoost splits are not supported")
+        left = np.asarray(tree['left_children'])
+        conditions = np.asarray(tree['split_conditions'], dtype=np.float64)
+        value = np.zeros((len(left), builder.n_classes))
+        value[:, class_id] = np.where(left < 0, conditions.astype(np.float32), 0.0)
+        builder.add_tree(
+            feature=tree['split_indices'],
+            threshold=_float32_le_threshold(conditions, strict=True),
+            left=left,
+            right=tree['right_children'],
+            value=value,
+            use_float32=True,
+            nan_left=np.asarray(tree['default_left'], dtype=bool)
+        )
+    return {'kind': 'softmax', 'start': start, 'stop': len(builder.roots), 'base': base}
+
+
+def _flatten_lightgbm_tree(root, n_classes, class_id):
+    """Convert a LightGBM dump_model() tree_structure into local node arrays."""
+    nodes = {name: [] for name in ('feature', 'threshold', 'left', 'right',
+                                   'nan_left', 'zero_missing', 'default_left')}
+    value = []
+
+    def visit(n):
+        node_id = len(value)
+        for column in nodes.values():
+            column.append(0)
+        value.append(np.zeros(n_classes))
+        if 'leaf_value' in n:
+            nodes['left'][node_id] = nodes['right'][node_id] = -1
+            value[node_id][class_id] = n['leaf_value']
+            return node_id
+        if n['decision_type'] != '<=':
+            raise UnsupportedModelError("Categorical LightGBM splits are not supported")
+
+        missing_type = n.get('missing_type', 'None')
+        default_left = bool(n.get('default_left', True))
+        threshold = float(n['threshold'])
+        nodes['feature'][node_id] = n['split_feature']
+        nodes['threshold'][node_id] = threshold
+        nodes['default_left'][node_id] = default_left
+        if missing_type == 'NaN':
+            nodes['nan_left'][node_id] = default_left
+        elif missing_type == 'Zero':
+            # NaN is treated as zero, and zero takes the default direction
+            nodes['nan_left'][node_id] = default_left
+            nodes['zero_missing'][node_id] = True
+        else:
+            # NaN is treated as zero and compared normally
+            nodes['nan_left'][node_id] = 0.0 <= threshold
+        nodes['left'][node_id] = visit(n['left_child'])
+        nodes['right'][node_id] = visit(n['right_child'])
+        return node_id
+
+    visit(root)
+    return nodes, np.asarray(value)
+
+
+def _add_lightgbm(builder, model):
+    """Export a fitted multi-class LGBMClassifier; returns member metadata."""
+    dump = model.booster_.dump_model()
+    objective = str(dump.get('objective', ''))
+    if not objective.startswith('multiclass') or objective.startswith('multiclassova'):
+        raise UnsupportedModelError(f"Unsupported LightGBM objective: {objective}")
+    if dump['num_tree_per_iteration'] != builder.n_classes:
+        raise UnsupportedModelError("LightGBM trees per iteration do not match the number of classes")
+
+    tree_info = dump['tree_info']
+    best_iteration = getattr(model, 'best_iteration_', None)
+    if best_iteration:
+        tree_info = tree_info[:best_iteration * builder.n_classes]
+
+    start = len(builder.roots)
+    for i, tree in enumerate(tree_info):
+        nodes, value = _flatten_lightgbm_tree(tree['tree_structure'], builder.n_classes, i % builder.n_classes)
+        builder.add_tree(nodes['feature'], nodes['threshold'], nodes['left'], nodes['right'], value,
+                         use_float32=False, nan_left=nodes['nan_left'], zero_missing=nodes['zero_missing'],
+                         default_left=nodes['default_left'])
+
+    scale = 1.0 / (len(tree_info) // builder.n_classes) if dump.get('average_output') else 1.0
+    return {'kind': 'softmax', 'start': start, 'stop': len(builder.roots), 'base': None, 'scale': scale}
+
+
+_MEMBER_EXPORTERS = {
+    'RandomForestClassifier': _add_random_forest,
+    'XGBClassifier': _add_xgboost,
+    'LGBMClassifier': _add_lightgbm
+}
+
+
+class FlatEnsemble:
+    """
+    Array-based replacement for a soft-voting tree ensemble's predict_proba.
+
+    Exposes classes_ and predict_proba() so it can be passed anywhere the
+    original model is used for probability scoring. When fallback is set,
+    batches larger than max_rows are delegated to fallback.predict_proba.
+    """
+
+    def __init__(self, arrays, members, classes, weights=None, n_features=None,
+                 fallback=None, max_rows=FLAT_MAX_ROWS):
+        self.arrays = arrays
+        self.members = members
+        self.classes_ = np.asarray(classes)
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        self.n_features_in_ = n_features
+        self.fallback = fallback
+        self.max_rows = max_rows
+        self.max_depth = int(arrays['max_depth'])
+        # Interleaved (left, right) child ids: child of node n is children[2n + went_right]
+        if 'children' not in arrays:
+            arrays['children'] = np.column_stack([arrays['left'], arrays['right']]).ravel()
+
+    def to_state(self):
+        """
+        Split the engine into (arrays, metadata) for persistence (see model_bundle.py).
+
+        Only the arrays used by predict_proba are returned; metadata is
+        JSON-serializable.
+        """
+        arrays = {name: self.arrays[name] for name in _STATE_ARRAYS}
+        meta = {
+            'members': [dict(member, base=None if member['base'] is None else np.asarray(member['base']).tolist())
+                        for member in self.members],
+            'classes': self.classes_.tolist(),
+            'weights': None if self.weights is None else self.weights.tolist(),
+            'n_features': None if self.n_features_in_ is None else int(self.n_features_in_),
+            'max_rows': self.max_rows,
+            'max_depth': self.max_depth
+        }
+        return arrays, meta
+
+    @classmethod
+    def from_state(cls, arrays, meta, fallback=None):
+        """Rebuild an engine from to_state() output; arrays may be memory-mapped."""
+        members = [dict(member, base=None if member['base'] is None else np.asarray(member['base']))
+                   for member in meta['members']]
+        return cls(dict(arrays, max_depth=meta['max_depth']), members, meta['classes'], weights=meta['weights'],
+                   n_features=meta['n_features'], fallback=fallback, max_rows=meta['max_rows'])
+
+    @classmethod
+    def from_voting_classifier(cls, model, fallback=False):
+        """
+        Export every tree of a fitted VotingClassifier(voting='soft').
+
+        With fallback=True, large batches are scored by model itself.
+        """
+        if type(model).__name__ != 'VotingClassifier' or getattr(model, 'voting', None) != 'soft':
+            raise UnsupportedModelError("Only soft-voting VotingClassifier models can be flattened")
+
+        n_classes = len(model.classes_)
+        n_features = model.n_features_in_
+        builder = _TreeBuilder(n_features, n_classes)
+        members = []
+        for estimator in model.estimators_:
+            exporter = _MEMBER_EXPORTERS.get(type(estimator).__name__)
+            if exporter is None:
+                raise UnsupportedModelError(f"Unsupported ensemble member: {type(estimator).__name__}")
+            if len(estimator.classes_) != n_classes:
+                raise UnsupportedModelError("Ensemble members must share the ensemble's classes")
+            members.append(exporter(builder, estimator))
+
+        weights = getattr(model, '_weights_not_none', None)
+        return cls(builder.arrays(), members, model.classes_, weights=weights, n_features=n_features,
+                   fallback=model if fallback else None)
+
+    def _leaf_nodes(self, X64):
+        """Return the global leaf node id reached by every (row, tree) pair."""
+        a = self.arrays
+        X = np.concatenate([X64, X64.astype(np.float32).astype(np.float64)], axis=1).ravel()
+        row_offsets = (np.arange(X64.shape[0]) * (2 * X64.shape[1]))[:, None]
+        node = np.broadcast_to(a['roots'], (X64.shape[0], len(a['roots']))).copy()
+        check_missing = bool(np.isnan(X64).any())
+        check_zero = bool(a['zero_missing'].any())
+        for _ in range(self.max_depth):
+            x = X[row_offsets + a['feature'][node]]
+            go_left = x <= a['threshold'][node]
+            if check_zero:
+                is_zero = a['zero_missing'][node] & (np.abs(x) <= _LGB_ZERO_THRESHOLD)
+                go_left = np.where(is_zero, a['default_left'][node], go_left)
+            if check_missing:
+                go_left = np.where(np.isnan(x), a['nan_left'][node], go_left)
+            node = a['children'][2 * node + ~go_left]
+        return node
+
+    def _predict_chunk(self, X64):
+        leaves = self._leaf_nodes(X64)
+        value = self.arrays['value']
+        member_probas = []
+        for member in self.members:
+            start, stop = member['start'], member['stop']
+            scores = value[leaves[:, start:stop]].sum(axis=1)
+            if member['kind'] == 'mean':
+                member_probas.append(scores / max(stop - start, 1))
+                continue
+            scores = scores * member.get('scale', 1.0)
+            if member['base'] is not None:
+                scores = scores + member['base']
+            scores -= scores.max(axis=1, keepdims=True)
+            np.exp(scores, out=scores)
+            member_probas.append(scores / scores.sum(axis=1, keepdims=True))
+        return np.average(np.stack(member_probas), axis=0, weights=self.weights)
+
+    def predict_proba(self, X):
+        """Class probabilities with the same semantics as the original ensemble."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or (self.n_features_in_ is not None and X.shape[1] != self.n_features_in_):
+            raise ValueError(f"Expected a 2D array with {self.n_features_in_} features")
+        if self.fallback is not None and X.shape[0] > self.max_rows:
+            return self.fallback.predict_proba(X)
+        n_trees = len(self.arrays['roots'])
+        chunk = max(1, _MAX_GATHER // max(n_trees * len(self.classes_), 1))
+        if X.shape[0] <= chunk:
+            return self._predict_chunk(X)
+        return np.concatenate([self._predict_chunk(X[i:i + chunk]) for i in range(0, X.shape[0], chunk)])
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def compile_model(model, check_rows=256, atol=1e-6, seed=0):
+    """
+    Flatten a soft-voting ensemble, or return the model unchanged if unsupported.
+
+    The flattened engine is checked against model.predict_proba on random
+    standardized rows; any difference above atol keeps the original model.
+    The returned engine scores small batches itself and delegates larger
+    ones (see FLAT_MAX_ROWS) to the original model.
+
+    Returns:
+        tuple: (model to use for predict_proba, True if the flat engine is used)
+    """
+    try:
+        flat = FlatEnsemble.from_voting_classifier(model, fallback=True)
+    except UnsupportedModelError:
+        return model, False
+    except (AttributeError, KeyError, ValueError):
+        # Malformed or unexpected tree dumps: keep the original model as well
+        return model, False
+
+    X_check = np.random.default_rng(seed).normal(size=(check_rows, flat.n_features_in_))
+    if not np.allclose(flat._predict_chunk(X_check), model.predict_proba(X_check), rtol=0, atol=atol):
+        return model, False
+    return flat, True
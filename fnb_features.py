@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Vectorized feature engineering for the FnB Business Success model.
+
+Computes the 20 derived features used in training over whole columns and
+writes them, together with the raw inputs, straight into a preallocated
+float64 matrix ordered like models/competition/feature_names_competition.txt.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Raw input columns required for every row before feature engineering
+RAW_COLUMNS = [
+    'Jumlah Penduduk',
+    'Luas Wilayah (km²)',
+    'Kepadatan (jiwa/km²)',
+    'jumlah_mall',
+    'jumlah_minimarket',
+    'jumlah_taman',
+    'jumlah_ulasan',
+    'google_rating',
+    'kategori_resto_encoded',
+    'price_range'
+]
+
+# Model feature order (same as feature_names_competition.txt and the scaler)
+FEATURE_NAMES = [
+    'Jumlah Penduduk',
+    'Luas Wilayah (km²)',
+    'Kepadatan (jiwa/km²)',
+    'jumlah_mall',
+    'jumlah_minimarket',
+    'jumlah_taman',
+    'jumlah_ulasan',
+    'google_rating',
+    'mall_per_capita',
+    'minimarket_density',
+    'taman_per_capita',
+    'ulasan_per_capita',
+    'competition_density',
+    'market_potential',
+    'infrastructure_score',
+    'retail_accessibility',
+    'rating_normalized',
+    'log_jumlah_ulasan',
+    'log_kepadatan',
+    'kategori_resto_encoded',
+    'price_range_encoded',
+    'high_rating',
+    'excellent_rating',
+    'high_volume_reviews',
+    'very_high_volume_reviews',
+    'price_category_interaction',
+    'rating_review_interaction',
+    'density_infrastructure'
+]
+
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_NAMES)}
+
+
+def check_feature_names(feature_names):
+    """Raise ValueError if feature_names does not match the engine's column order."""
+    if list(feature_names) != FEATURE_NAMES:
+        raise ValueError("Feature names do not match the order expected by fnb_features.FEATURE_NAMES")
+
+
+def raw_columns(data):
+    """
+    Extract the RAW_COLUMNS as equally sized float64 arrays.
+
+    Args:
+        data: DataFrame, dict of column -> scalar/array, or a 2D array whose
+            columns follow RAW_COLUMNS.
+
+    Returns:
+        dict: Column name -> 1D float64 array of length N.
+    """
+    if isinstance(data, np.ndarray):
+        if data.ndim != 2 or data.shape[1] != len(RAW_COLUMNS):
+            raise ValueError(f"Expected a 2D array with {len(RAW_COLUMNS)} columns ordered like RAW_COLUMNS")
+        return {name: data[:, i].astype(np.float64, copy=False) for i, name in enumerate(RAW_COLUMNS)}
+
+    columns = data.columns if isinstance(data, pd.DataFrame) else data
+    missing = [name for name in RAW_COLUMNS if name not in columns]
+    if missing:
+        raise KeyError(f"Missing input columns: {missing}")
+
+    if isinstance(data, pd.DataFrame):
+        arrays = [data[name].to_numpy(dtype=np.float64) for name in RAW_COLUMNS]
+    else:
+        arrays = [np.atleast_1d(np.asarray(data[name], dtype=np.float64)) for name in RAW_COLUMNS]
+    return dict(zip(RAW_COLUMNS, np.broadcast_arrays(*arrays)))
+
+
+# Features that depend only on the kecamatan (precomputable per kecamatan)
+KECAMATAN_COLUMNS = RAW_COLUMNS[:6]
+KECAMATAN_FEATURES = KECAMATAN_COLUMNS + [
+    'mall_per_capita',
+    'minimarket_density',
+    'taman_per_capita',
+    'market_potential',
+    'infrastructure_score',
+    'retail_accessibility',
+    'log_kepadatan',
+    'density_infrastructure'
+]
+
+
+def _allocate(n_rows, out):
+    """Return out, or a new column-major float64 feature matrix for n_rows rows."""
+    if out is None:
+        return np.empty((n_rows, len(FEATURE_NAMES)), dtype=np.float64, order='F')
+    if out.shape != (n_rows, len(FEATURE_NAMES)) or out.dtype != np.float64:
+        raise ValueError(f"out must be a float64 array of shape ({n_rows}, {len(FEATURE_NAMES)})")
+    return out
+
+
+def _fill_kecamatan_features(out, cols):
+    """Write the kecamatan-only columns of the feature matrix."""
+    def col(name):
+        return out[:, FEATURE_INDEX[name]]
+
+    for name in KECAMATAN_COLUMNS:
+        col(name)[:] = cols[name]
+
+    penduduk = cols['Jumlah Penduduk']
+    kepadatan = cols['Kepadatan (jiwa/km²)']
+
+    # Per-capita and density ratios (per 1000 residents)
+    np.multiply(np.divide(cols['jumlah_mall'], penduduk), 1000, out=col('mall_per_capita'))
+    np.divide(cols['jumlah_minimarket'], cols['Luas Wilayah (km²)'], out=col('minimarket_density'))
+    np.multiply(np.divide(cols['jumlah_taman'], penduduk), 1000, out=col('taman_per_capita'))
+
+    # Market and infrastructure metrics
+    np.add(cols['jumlah_mall'], cols['jumlah_minimarket'], out=col('retail_accessibility'))
+    np.multiply(kepadatan, col('retail_accessibility'), out=col('market_potential'))
+    np.add(col('retail_accessibility'), cols['jumlah_taman'], out=col('infrastructure_score'))
+    np.log1p(kepadatan, out=col('log_kepadatan'))
+    np.multiply(col('log_kepadatan'), col('infrastructure_score'), out=col('density_infrastructure'))
+
+
+def _fill_request_features(out, rating, ulasan, kategori_encoded, price_range):
+    """Write the rating-, review- and category-dependent columns (kecamatan columns must be filled)."""
+    def col(name):
+        return out[:, FEATURE_INDEX[name]]
+
+    col('jumlah_ulasan')[:] = ulasan
+    col('google_rating')[:] = rating
+    col('kategori_resto_encoded')[:] = kategori_encoded
+
+    ulasan = col('jumlah_ulasan')
+    rating = col('google_rating')
+
+    # Review ratios against the kecamatan population and area
+    np.multiply(np.divide(ulasan, col('Jumlah Penduduk')), 1000, out=col('ulasan_per_capita'))
+    np.divide(ulasan, col('Luas Wilayah (km²)'), out=col('competition_density'))
+
+    # Normalisation and log transform
+    np.divide(rating, 5.0, out=col('rating_normalized'))
+    np.log1p(ulasan, out=col('log_jumlah_ulasan'))
+
+    # Price range 1-4 becomes 0-3
+    np.subtract(price_range, 1, out=col('price_range_encoded'))
+
+    # Binary threshold features
+    col('high_rating')[:] = np.where(rating >= 4.0, 1.0, 0.0)
+    col('excellent_rating')[:] = np.where(rating >= 4.5, 1.0, 0.0)
+    col('high_volume_reviews')[:] = np.where(ulasan >= 100, 1.0, 0.0)
+    col('very_high_volume_reviews')[:] = np.where(ulasan >= 500, 1.0, 0.0)
+
+    # Interaction features
+    np.multiply(col('price_range_encoded'), col('kategori_resto_encoded'), out=col('price_category_interaction'))
+    np.multiply(col('rating_normalized'), col('log_jumlah_ulasan'), out=col('rating_review_interaction'))
+
+
+def build_feature_matrix(data, out=None):
+    """
+    Build the model feature matrix for N rows.
+
+    Args:
+        data: Input rows, see raw_columns().
+        out: Optional preallocated float64 array of shape (N, len(FEATURE_NAMES)).
+            Column-major (order='F') buffers are fastest because every
+            feature is written as one contiguous column.
+
+    Returns:
+        np.ndarray: Feature matrix with columns in FEATURE_NAMES order.
+    """
+    cols = raw_columns(data)
+    out = _allocate(len(cols['google_rating']), out)
+    _fill_kecamatan_features(out, cols)
+    _fill_request_features(out, cols['google_rating'], cols['jumlah_ulasan'],
+                           cols['kategori_resto_encoded'], cols['price_range'])
+    return out
+
+
+def build_kecamatan_table(df_kecamatan):
+    """
+    Precompute the kecamatan-only features once for every kecamatan.
+
+    Args:
+        df_kecamatan: DataFrame (or list of dicts) with a 'kecamatan' column and
+            the KECAMATAN_COLUMNS, e.g. bandung_kecamatan_data.json.
+
+    Returns:
+        dict: 'names' (kecamatan order), 'index' (name -> row), 'records'
+        (name -> raw data dict) and 'templates', a (K, len(FEATURE_NAMES))
+        matrix whose KECAMATAN_FEATURES columns are filled.
+    """
+    df_kecamatan = pd.DataFrame(df_kecamatan)
+    names = df_kecamatan['kecamatan'].tolist()
+    cols = {name: df_kecamatan[name].to_numpy(dtype=np.float64) for name in KECAMATAN_COLUMNS}
+
+    templates = np.zeros((len(names), len(FEATURE_NAMES)), dtype=np.float64)
+    _fill_kecamatan_features(templates, cols)
+
+    return {
+        'names': names,
+        'index': {name: i for i, name in enumerate(names)},
+        'records': {record['kecamatan']: record for record in df_kecamatan.to_dict('records')},
+        'templates': templates
+    }
+
+
+def build_kecamatan_feature_matrix(kecamatan_table, kecamatan_idx, google_rating, jumlah_ulasan,
+                                   kategori_resto_encoded, price_range, out=None):
+    """
+    Build the feature matrix from precomputed kecamatan rows.
+
+    Only the rating-, review- and category-dependent columns are computed;
+    everything else is copied from kecamatan_table['templates'].
+
+    Args:
+        kecamatan_table: Result of build_kecamatan_table().
+        kecamatan_idx: Row positions into the table (scalar or array of length N).
+        google_rating, jumlah_ulasan, kategori_resto_encoded, price_range:
+            Scalars or arrays broadcastable to length N.
+        out: Optional preallocated float64 array, see build_feature_matrix().
+
+    Returns:
+        np.ndarray: Feature matrix with columns in FEATURE_NAMES order.
+    """
+    kecamatan_idx, rating, ulasan, kategori, price = np.broadcast_arrays(
+        np.atleast_1d(kecamatan_idx), np.asarray(google_rating, dtype=np.float64),
+        np.asarray(jumlah_ulasan, dtype=np.float64), np.asarray(kategori_resto_encoded, dtype=np.float64),
+        np.asarray(price_range, dtype=np.float64)
+    )
+    out = _allocate(len(kecamatan_idx), out)
+    out[:] = kecamatan_table['templates'][kecamatan_idx]
+    _fill_request_features(out, rating, ulasan, kategori, price)
+    return out
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Batch scoring for the FnB Business Success model.
+
+Both the Streamlit app (app.py) and the CLI (predict_fnb_business_success.py)
+score through predict_batch(), so feature engineering, scaling and
+predict_proba are applied in exactly one place for any number of rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+from fnb_features import build_feature_matrix, build_kecamatan_feature_matrix, check_feature_names
+from stage_timer import stage
+
+
+def scale_features(scaler, X):
+    """
+    Standardize the feature matrix in place.
+
+    StandardScaler is applied directly from its mean_/scale_ arrays, which
+    gives the same result as scaler.transform without the DataFrame and
+    validation overhead. Other scalers fall back to transform().
+    """
+    mean = getattr(scaler, 'mean_', None)
+    scale = getattr(scaler, 'scale_', None)
+    if mean is None or scale is None:
+        return scaler.transform(X)
+
+    if getattr(scaler, 'with_mean', True):
+        X -= mean
+    if getattr(scaler, 'with_std', True):
+        X /= scale
+    return X
+
+
+def score_matrix(X, model, scaler):
+    """
+    Scale a feature matrix in place and run predict_proba once over it.
+
+    Returns:
+        tuple: (predicted class ids of shape (N,), probabilities of shape (N, n_classes))
+    """
+    with stage('scale_features'):
+        X_scaled = scale_features(scaler, X)
+    with stage('predict_proba'):
+        probabilities = model.predict_proba(X_scaled)
+    predictions = np.asarray(model.classes_)[np.argmax(probabilities, axis=1)]
+    return predictions, probabilities
+
+
+def predict_batch(data, model, scaler, feature_names):
+    """
+    Score N rows with a single scaling pass and predict_proba call.
+
+    Args:
+        data: DataFrame, dict of column -> scalar/array, or a 2D array whose
+            columns follow fnb_features.RAW_COLUMNS.
+        model: Fitted classifier exposing predict_proba and classes_.
+        scaler: Fitted scaler used during training.
+        feature_names: Feature order expected by the scaler and model.
+
+    Returns:
+        tuple: (predicted class ids of shape (N,), probabilities of shape (N, n_classes))
+    """
+    check_feature_names(feature_names)
+    with stage('build_features'):
+        X = build_feature_matrix(data)
+    return score_matrix(X, model, scaler)
+
+
+def predict_for_kecamatan(kecamatan_table, kecamatan_idx, google_rating, jumlah_ulasan,
+                          kategori_resto_encoded, price_range, model, scaler):
+    """
+    Score rows whose demographics come from a precomputed kecamatan table.
+
+    See fnb_features.build_kecamatan_feature_matrix() for the arguments.
+
+    Returns:
+        tuple: (predicted class ids of shape (N,), probabilities of shape (N, n_classes))
+    """
+    with stage('build_features'):
+        X = build_kecamatan_feature_matrix(kecamatan_table, kecamatan_idx, google_rating, jumlah_ulasan,
+                                           kategori_resto_encoded, price_range)
+    return score_matrix(X, model, scaler)
+
+
+def score_kecamatan_rows(kecamatan_table, rows, model, scaler):
+    """
+    Score encoded single-prediction requests in one predict_proba call.
+
+    Args:
+        kecamatan_table: Result of fnb_features.build_kecamatan_table().
+        rows: (N, 5) array-like, one row per request: kecamatan index,
+            google_rating, jumlah_ulasan, kategori_resto_encoded, price_range.
+        model, scaler: Fitted model and scaler.
+
+    Returns:
+        tuple: (predicted class ids of shape (N,), probabilities of shape (N, n_classes))
+    """
+    rows = np.asarray(rows, dtype=np.float64).reshape(-1, 5)
+    return predict_for_kecamatan(kecamatan_table, rows[:, 0].astype(np.intp), rows[:, 1], rows[:, 2],
+                                 rows[:, 3], rows[:, 4], model, scaler)
+
+
+def scan_grid(kecamatan_table, kategori_classes, model, scaler, target_mapping,
+              price_ranges=(1, 2, 3, 4), ratings=(4.0, 4.2, 4.4, 4.6), reviews=(50, 100, 200, 500),
+              kategori_encoder=None):
+    """
+    Score every kecamatan x kategori x price range x rating x review combination.
+
+    The whole grid is built as one feature matrix and scored with a single
+    predict_proba call.
+
+    Args:
+        kecamatan_table: Result of fnb_features.build_kecamatan_table().
+        kategori_classes: Category names to scan (e.g. le_kategori.classes_).
+        model, scaler: Fitted model and scaler.
+        target_mapping: Label -> class id mapping (target_mapping.json).
+        price_ranges, ratings, reviews: Values scanned for each dimension.
+        kategori_encoder: Optional LabelEncoder for kategori_classes; when
+            omitted the position in kategori_classes is used as the code.
+
+    Returns:
+        pd.DataFrame: One row per combination, ranked by the probability of
+        the 'Go' class (highest first).
+    """
+    kategori_classes = list(kategori_classes)
+    if kategori_encoder is not None:
+        kategori_codes = np.asarray(kategori_encoder.transform(kategori_classes), dtype=np.float64)
+    else:
+        kategori_codes = np.arange(len(kategori_classes), dtype=np.float64)
+
+    shape = (len(kecamatan_table['names']), len(kategori_classes), len(price_ranges), len(ratings), len(reviews))
+    kec_idx, kat_idx, price_idx, rating_idx, review_idx = (axis.ravel() for axis in np.indices(shape))
+
+    price_values = np.asarray(price_ranges, dtype=np.float64)[price_idx]
+    rating_values = np.asarray(ratings, dtype=np.float64)[rating_idx]
+    review_values = np.asarray(reviews, dtype=np.float64)[review_idx]
+
+    predictions, probabilities = predict_for_kecamatan(
+        kecamatan_table, kec_idx, rating_values, review_values, kategori_codes[kat_idx], price_values,
+        model, scaler
+    )
+
+    target_mapping_inv = {v: k for k, v in target_mapping.items()}
+    results = pd.DataFrame({
+        'kecamatan': np.asarray(kecamatan_table['names'], dtype=object)[kec_idx],
+        'kategori_resto': np.asarray(kategori_classes, dtype=object)[kat_idx],
+        'price_range': price_values.astype(int),
+        'google_rating': rating_values,
+        'jumlah_ulasan': review_values.astype(int),
+        'predicted_label': pd.Series(predictions).map(target_mapping_inv).to_numpy()
+    })
+    for i, class_id in enumerate(model.classes_):
+        results[f'prob_{target_mapping_inv[class_id]}'] = probabilities[:, i]
+
+    rank_column = 'prob_Go' if 'prob_Go' in results.columns else results.columns[-1]
+    return results.sort_values(rank_column, ascending=False, kind='stable').reset_index(drop=True)
@@ -13,6 +13,24 @@ import numpy as np
 import os
 from datetime import datetime
 
+from api_cache import CachedMapsClient, ResponseCache, normalize_query
+from query_cascade import DEFAULT_QUERY_WINDOW, first_hit, make_query_executor
+from row_journal import RowJournal, replay_journal
+
+# Journal hasil per baris (append-only) untuk melanjutkan proses yang terhenti
+JOURNAL_FILE = './datasets/journal_taman_address.jsonl'
+JOURNAL_SYNC_EVERY = 50
+
+# Kolom hasil -> key pada dict hasil cari_alamat_taman
+RESULT_COLUMNS = {
+    'alamat_lengkap': 'alamat',
+    'latitude': 'latitude',
+    'longitude': 'longitude',
+    'status': 'status',
+    'query_used': 'query_used',
+    'processed_at': 'processed_at'
+}
+
 def setup_google_maps_api():
     """Setup Google Maps API client"""
     # API Key yang sudah digunakan sebelumnya
@@ -26,7 +44,33 @@ def setup_google_maps_api():
         print(f"❌ Error inisialisasi Google Maps API: {e}")
         return None
 
-def cari_alamat_taman(gmaps, row, verbose=False):
+def build_taman_queries(nama_taman, kecamatan):
+    """Variasi query pencarian taman (prioritas dari yang paling spesifik)"""
+    return [
+        f"{nama_taman}, {kecamatan}, Bandung, Jawa Barat",
+        f"{nama_taman}, Kecamatan {kecamatan}, Kota Bandung",
+        f"Taman {nama_taman}, {kecamatan}, Bandung",
+        f"{nama_taman}, {kecamatan}, Bandung",
+        f"{nama_taman} Bandung"
+    ]
+
+def taman_key(row):
+    """Kunci journal: nama taman + kecamatan yang dinormalisasi (bukan posisi baris)"""
+    return tuple('' if pd.isna(row[column]) else normalize_query(row[column])
+                 for column in ('nama_taman', 'kecamatan'))
+
+def format_geocode_result(geocode_result, query):
+    """Alamat lengkap dan koordinat dari result geocoding pertama"""
+    location = geocode_result[0]['geometry']['location']
+    return {
+        'alamat': geocode_result[0]['formatted_address'],
+        'latitude': location['lat'],
+        'longitude': location['lng'],
+        'status': 'Success',
+        'query_used': query
+    }
+
+def cari_alamat_taman(gmaps, row, verbose=False, query_delay=0.1):
     """
     Mencari alamat lengkap berdasarkan nama taman dan kecamatan menggunakan Google Maps API.
     
@@ -34,6 +78,7 @@ def cari_alamat_taman(gmaps, row, verbose=False):
     - gmaps: Google Maps client
     - row: Baris dataframe yang berisi 'nama_taman' dan 'kecamatan'
     - verbose: Apakah menampilkan detail log (default False untuk batch processing)
+    - query_delay: Jeda antar variasi query (0 jika rate limit diatur oleh pemanggil)
     
     Returns:
     - Dict dengan alamat lengkap, koordinat, dan status
@@ -54,13 +99,7 @@ def cari_alamat_taman(gmaps, row, verbose=False):
         kecamatan = str(row['kecamatan']).strip()
         
         # Variasi query pencarian (prioritas dari yang paling spesifik)
-        search_queries = [
-            f"{nama_taman}, {kecamatan}, Bandung, Jawa Barat",
-            f"{nama_taman}, Kecamatan {kecamatan}, Kota Bandung",
-            f"Taman {nama_taman}, {kecamatan}, Bandung",
-            f"{nama_taman}, {kecamatan}, Bandung",
-            f"{nama_taman} Bandung"
-        ]
+        search_queries = build_taman_queries(nama_taman, kecamatan)
         
         if verbose:
             print(f"🔍 Mencari alamat untuk: {nama_taman} di {kecamatan}")
@@ -75,29 +114,18 @@ def cari_alamat_taman(gmaps, row, verbose=False):
                 geocode_result = gmaps.geocode(query)
                 
                 if geocode_result:
-                    # Ambil alamat lengkap dari result pertama
-                    formatted_address = geocode_result[0]['formatted_address']
-                    
-                    # Ambil koordinat juga
-                    location = geocode_result[0]['geometry']['location']
-                    lat = location['lat']
-                    lng = location['lng']
+                    # Ambil alamat lengkap dan koordinat dari result pertama
+                    result = format_geocode_result(geocode_result, query)
                     
                     if verbose:
-                        print(f"   ✅ Ditemukan: {formatted_address}")
-                        print(f"   📍 Koordinat: {lat}, {lng}")
+                        print(f"   ✅ Ditemukan: {result['alamat']}")
+                        print(f"   📍 Koordinat: {result['latitude']}, {result['longitude']}")
                     
-                    # Return dalam format yang terstruktur
-                    return {
-                        'alamat': formatted_address,
-                        'latitude': lat,
-                        'longitude': lng,
-                        'status': 'Success',
-                        'query_used': query
-                    }
+                    return result
                 
                 # Delay antar query untuk menghormati rate limit
-                time.sleep(0.1)
+                if query_delay:
+                    time.sleep(query_delay)
                 
             except Exception as query_error:
                 if verbose:
@@ -128,20 +156,35 @@ def cari_alamat_taman(gmaps, row, verbose=False):
             'query_used': 'Error occurred'
         }
 
-def save_checkpoint(df, checkpoint_name):
-    """Simpan checkpoint untuk recovery jika ada error"""
-    checkpoint_file = f'./datasets/checkpoint_{checkpoint_name}.csv'
-    df.to_csv(checkpoint_file, index=False)
-    print(f"📄 Checkpoint disimpan: {checkpoint_file}")
-
-def load_checkpoint(checkpoint_name):
-    """Load checkpoint jika ada"""
-    checkpoint_file = f'./datasets/checkpoint_{checkpoint_name}.csv'
-    if os.path.exists(checkpoint_file):
-        df = pd.read_csv(checkpoint_file)
-        print(f"📄 Checkpoint ditemukan dan dimuat: {checkpoint_file}")
-        return df
-    return None
+def resolve_alamat_taman(gmaps, row, executor, window=DEFAULT_QUERY_WINDOW):
+    """
+    Versi paralel cari_alamat_taman dengan hasil yang sama: hingga `window`
+    variasi query dikirim bersamaan dan hasil dari query dengan prioritas
+    tertinggi yang dipakai; query yang belum berjalan dibatalkan.
+    """
+    nama_taman = str(row['nama_taman']).strip()
+    kecamatan = str(row['kecamatan']).strip()
+    search_queries = build_taman_queries(nama_taman, kecamatan)
+    
+    i, geocode_result = first_hit(executor, search_queries, gmaps.geocode, bool, window=window)
+    if geocode_result is None:
+        return {
+            'alamat': 'Tidak Ditemukan',
+            'latitude': None,
+            'longitude': None,
+            'status': 'Not Found',
+            'query_used': 'All queries failed'
+        }
+    try:
+        return format_geocode_result(geocode_result, search_queries[i])
+    except Exception as e:
+        return {
+            'alamat': f'Error: {str(e)}',
+            'latitude': None,
+            'longitude': None,
+            'status': 'Error',
+            'query_used': 'Error occurred'
+        }
 
 def estimate_cost_and_time(total_records, daily_free_limit=200):
     """Estimasi biaya dan waktu processing"""
@@ -199,6 +242,10 @@ def main():
         print("❌ Tidak dapat melanjutkan tanpa Google Maps API")
         return
     
+    # Hasil geocoding dari run sebelumnya (termasuk 'Not Found') diambil dari cache
+    cache = ResponseCache()
+    gmaps = CachedMapsClient(gmaps, cache)
+    
     # Estimasi biaya dan waktu
     cost, time_minutes = estimate_cost_and_time(len(df))
     
@@ -209,43 +256,29 @@ def main():
             print("❌ Proses dibatalkan")
             return
     
-    # Cek apakah ada checkpoint yang bisa dilanjutkan
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-    checkpoint_name = f"taman_address_{timestamp}"
-    
-    existing_checkpoint = load_checkpoint("taman_address_latest")
-    if existing_checkpoint is not None:
-        use_checkpoint = input("🔄 Ditemukan checkpoint sebelumnya. Lanjutkan dari checkpoint? (y/n): ")
-        if use_checkpoint.lower() == 'y':
-            df = existing_checkpoint
-            print(f"✅ Melanjutkan dari checkpoint dengan {len(df)} records")
+    # Cek apakah ada journal dari proses sebelumnya yang bisa dilanjutkan
+    done_results = replay_journal(JOURNAL_FILE)
+    if done_results:
+        use_journal = input(f"🔄 Ditemukan journal dengan {len(done_results):,} hasil sebelumnya. Lanjutkan? (y/n): ")
+        if use_journal.lower() == 'y':
+            print(f"✅ Melanjutkan dari journal")
         else:
             print("🆕 Memulai proses baru...")
+            os.remove(JOURNAL_FILE)
+            done_results = {}
     
-    # Inisialisasi kolom hasil jika belum ada
-    if 'alamat_lengkap' not in df.columns:
-        df['alamat_lengkap'] = 'Belum Diproses'
-        df['latitude'] = None
-        df['longitude'] = None
-        df['status'] = 'Pending'
-        df['query_used'] = ''
-        df['processed_at'] = ''
-    
-    # Identifikasi data yang belum diproses
-    unprocessed_mask = (df['status'] == 'Pending') | (df['status'] == '') | (df['alamat_lengkap'] == 'Belum Diproses')
-    df_unprocessed = df[unprocessed_mask]
+    # Identifikasi taman yang belum diproses; taman yang sama (nama + kecamatan) dicari sekali
+    row_keys = pd.Series([taman_key(row) for _, row in df.iterrows()], index=df.index)
+    pending = row_keys[[key not in done_results for key in row_keys]]
+    df_unprocessed = df.loc[pending.drop_duplicates().index]
     
     print(f"\n🎯 Data yang akan diproses:")
     print(f"   📊 Total data: {len(df):,}")
-    print(f"   ✅ Sudah diproses: {len(df) - len(df_unprocessed):,}")
-    print(f"   🔄 Akan diproses: {len(df_unprocessed):,}")
-    
-    if len(df_unprocessed) == 0:
-        print("🎉 Semua data sudah diproses!")
-        return
+    print(f"   ✅ Sudah diproses: {len(df) - len(pending):,}")
+    print(f"   🔄 Akan diproses: {len(df_unprocessed):,} taman unik ({len(pending):,} baris)")
     
     print(f"\n🚀 Memulai proses pencarian alamat untuk {len(df_unprocessed)} taman...")
-    print(f"💡 Progress akan disimpan setiap 50 records untuk recovery")
+    print(f"💡 Hasil ditulis ke journal dan di-fsync setiap {JOURNAL_SYNC_EVERY} records untuk recovery")
     print("-" * 80)
     
     # Progress tracking
@@ -254,20 +287,27 @@ def main():
     not_found_count = 0
     processed_count = 0
     
+    # Variasi query setiap taman dikirim paralel
+    query_executor = make_query_executor(5)
+    
     # Proses setiap taman dengan progress bar
-    for idx, (index, row) in enumerate(tqdm(df_unprocessed.iterrows(), total=len(df_unprocessed), desc="🔍 Mencari alamat")):
-        
-        # Panggil fungsi pencarian alamat (verbose=False untuk batch processing)
-        result = cari_alamat_taman(gmaps, row, verbose=False)
-        
-        # Update dataframe dengan hasil
-        if isinstance(result, dict):
-            df.at[index, 'alamat_lengkap'] = result['alamat']
-            df.at[index, 'latitude'] = result['latitude']
-            df.at[index, 'longitude'] = result['longitude']
-            df.at[index, 'status'] = result['status']
-            df.at[index, 'query_used'] = result['query_used']
-            df.at[index, 'processed_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with query_executor, RowJournal(JOURNAL_FILE, sync_every=JOURNAL_SYNC_EVERY) as journal:
+        for index, row in tqdm(df_unprocessed.iterrows(), total=len(df_unprocessed), desc="🔍 Mencari alamat"):
+            
+            # Cari alamat; hasil sama dengan cari_alamat_taman tetapi variasi query paralel
+            requests_before = gmaps.requests
+            result = resolve_alamat_taman(gmaps, row, query_executor)
+            
+            # Fallback jika result bukan dict
+            if not isinstance(result, dict):
+                result = {'alamat': str(result), 'latitude': None, 'longitude': None,
+                          'status': 'Unknown', 'query_used': ''}
+            result['processed_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            
+            # Satu baris JSON per hasil; tidak menulis ulang seluruh DataFrame
+            key = row_keys[index]
+            journal.append(key, result)
+            done_results[key] = result
             
             # Count status
             if result['status'] == 'Success':
@@ -276,22 +316,28 @@ def main():
                 not_found_count += 1
             else:
                 error_count += 1
-        else:
-            # Fallback jika result bukan dict
-            df.at[index, 'alamat_lengkap'] = str(result)
-            df.at[index, 'status'] = 'Unknown'
-            error_count += 1
-        
-        processed_count += 1
-        
-        # Simpan checkpoint setiap 50 records
-        if processed_count % 50 == 0:
-            save_checkpoint(df, "taman_address_latest")
-            print(f"\n📊 Progress checkpoint - {processed_count}/{len(df_unprocessed)}")
-            print(f"   ✅ Berhasil: {success_count} | ⚠️ Tidak ditemukan: {not_found_count} | ❌ Error: {error_count}")
-        
-        # Delay antar request untuk menghormati rate limit
-        time.sleep(0.3)  # 300ms delay untuk memastikan tidak overload
+            
+            processed_count += 1
+            
+            if processed_count % JOURNAL_SYNC_EVERY == 0:
+                print(f"\n📊 Progress checkpoint - {processed_count}/{len(df_unprocessed)}")
+                print(f"   ✅ Berhasil: {success_count} | ⚠️ Tidak ditemukan: {not_found_count} | ❌ Error: {error_count}")
+            
+            # Delay antar request untuk menghormati rate limit; taman yang seluruhnya
+            # dijawab dari cache tidak memanggil API, jadi tidak perlu menunggu
+            if gmaps.requests != requests_before:
+                time.sleep(0.3)  # 300ms delay untuk memastikan tidak overload
+    
+    # Gabungkan semua hasil (journal lama + baru) ke DataFrame sekali saja
+    results = [done_results.get(key, {}) for key in row_keys]
+    for column, key in RESULT_COLUMNS.items():
+        df[column] = [result.get(key) for result in results]
+    
+    # Statistik dihitung dari seluruh hasil, termasuk yang dilanjutkan dari journal
+    statuses = df['status'].tolist()
+    success_count = statuses.count('Success')
+    not_found_count = statuses.count('Not Found')
+    error_count = len(statuses) - success_count - not_found_count
     
     print("\n" + "="*80)
     print("📊 HASIL AKHIR PROCESSING")
@@ -302,6 +348,14 @@ def main():
     print(f"⚠️  Tidak ditemukan   : {not_found_count:,}/{total_processed:,} ({not_found_count/total_processed*100:.1f}%)")
     print(f"❌ Error             : {error_count:,}/{total_processed:,} ({error_count/total_processed*100:.1f}%)")
     
+    cache_stats = cache.stats()
+    print(f"🗄️  Cache API         : {cache_stats['hits'] + cache_stats['negative_hits']:,} hit "
+          f"({cache_stats['negative_hits']:,} negatif), {cache_stats['misses']:,} request baru ke API, "
+          f"hit rate {cache_stats['hit_rate']:.1%}")
+    if success_count:
+        print(f"🔁 Rata-rata request API per taman berhasil: {cache_stats['misses'] / success_count:.2f}")
+    cache.close()
+    
     # Simpan hasil final
     output_file = './datasets/cleaned_taman_kota_bandung_with_address.csv'
     df.to_csv(output_file, index=False)
@@ -326,14 +380,10 @@ def main():
         for i, (kecamatan, count) in enumerate(success_by_kecamatan.head(10).items(), 1):
             print(f"   {i:2d}. {kecamatan:<20} : {count:3d} taman")
     
-    # Hapus checkpoint karena sudah selesai
-    try:
-        checkpoint_file = './datasets/checkpoint_taman_address_latest.csv'
-        if os.path.exists(checkpoint_file):
-            os.remove(checkpoint_file)
-            print(f"🗑️  Checkpoint dihapus: {checkpoint_file}")
-    except:
-        pass
+    # Hapus journal karena hasil final sudah ditulis
+    if os.path.exists(JOURNAL_FILE):
+        os.remove(JOURNAL_FILE)
+        print(f"🗑️  Journal dihapus: {JOURNAL_FILE}")
     
     print("\n🏁 Processing selesai!")
     print("✨ Dataset taman kota Bandung sekarang sudah dilengkapi dengan alamat dan koordinat!")
@@ -4,12 +4,32 @@ Versi sederhana - hanya kolom yang diperlukan
 """
 
 import os
+import argparse
+import functools
 import pandas as pd
 import googlemaps
 from datetime import datetime
 import time
+from collections import Counter
 from tqdm import tqdm
 
+from api_cache import DEFAULT_CACHE_PATH, ResponseCache, normalize_query
+from query_cascade import DEFAULT_QUERY_WINDOW, first_hit, make_query_executor
+from places_enrichment import (
+    DEFAULT_CONCURRENCY, DEFAULT_MAX_RETRIES, DEFAULT_REQUESTS_PER_SECOND, FakePlacesClient, enrich
+)
+from row_journal import truncate_torn_csv_record
+
+# Kolom hasil yang ditambahkan ke dataset
+RESULT_COLUMNS = ['place_id', 'google_rating', 'price_range_rupiah', 'business_status', 'processed_at']
+
+# Mode streaming: jumlah baris per chunk dan kolom kunci untuk resume
+DEFAULT_CHUNK_SIZE = 1000
+KEY_COLUMNS = ['nama', 'alamat']
+# Input dan output dibaca sama persis (teks apa adanya), agar kunci resume cocok:
+# nama seperti "NA" atau "null" tidak berubah menjadi NaN di salah satu sisi saja
+CSV_READ_OPTIONS = {'dtype': str, 'keep_default_na': False}
+
 def setup_google_maps_api():
     """Setup Google Maps API client"""
     try:
@@ -24,9 +44,55 @@ def setup_google_maps_api():
         print(f"❌ Error setting up Google Maps API: {e}")
         return None
 
-def search_place_details(gmaps, business_name, address, verbose=False):
+# Konversi price_level ke range harga rupiah berdasarkan standar Google Maps Indonesia
+PRICE_RANGES_RUPIAH = {
+    1: "Rp 15.000 - 50.000",      # Murah
+    2: "Rp 50.000 - 100.000",    # Sedang  
+    3: "Rp 100.000 - 200.000",   # Mahal
+    4: "Rp 200.000+"             # Sangat Mahal
+}
+
+# Jika hasil Text Search sudah memuat field ini, Place Details tidak perlu dipanggil
+SEARCH_PAYLOAD_FIELDS = ('rating', 'business_status')
+
+# Field yang diminta dari Place Details
+DETAIL_FIELDS = ['place_id', 'rating', 'price_level', 'business_status']
+
+def build_search_queries(business_name, address):
+    """Variasi query pencarian, dari yang paling spesifik"""
+    business_name = str(business_name).strip()
+    address = str(address).strip()
+    return [
+        f"{business_name}, {address}, Bandung",
+        f"{business_name}, {address}",
+        f"{business_name}, Bandung",
+        business_name
+    ]
+
+def format_place_result(place_id, result):
+    """Ambil rating, range harga rupiah dan status dari payload Places"""
+    price_level = result.get('price_level', None)
+    return {
+        'place_id': place_id,
+        'google_rating': result.get('rating', None),
+        'price_range_rupiah': PRICE_RANGES_RUPIAH.get(price_level, None) if price_level is not None else None,
+        'business_status': result.get('business_status', 'UNKNOWN'),
+        'status': 'Success'
+    }
+
+def empty_place_result(status):
+    return {
+        'place_id': None,
+        'google_rating': None,
+        'price_range_rupiah': None,
+        'business_status': None,
+        'status': status
+    }
+
+def search_place_details(gmaps, business_name, address, verbose=False, query_delay=0.1):
     """
     Mencari detail tempat dari Google Maps API
+    query_delay: jeda antar variasi query (0 jika rate limit diatur oleh pemanggil)
     Returns: dict dengan place_id, rating, price_range_rupiah, business_status
     """
     
@@ -45,12 +111,7 @@ def search_place_details(gmaps, business_name, address, verbose=False):
         address = str(address).strip()
         
         # Variasi query pencarian untuk meningkatkan akurasi
-        search_queries = [
-            f"{business_name}, {address}, Bandung",
-            f"{business_name}, {address}",
-            f"{business_name}, Bandung",
-            business_name
-        ]
+        search_queries = build_search_queries(business_name, address)
         
         if verbose:
             print(f"🔍 Mencari detail untuk: {business_name}")
@@ -71,47 +132,23 @@ def search_place_details(gmaps, business_name, address, verbose=False):
                     place_id = place['place_id']
                     
                     # Gunakan Place Details untuk mendapatkan informasi lengkap
-                    details = gmaps.place(
-                        place_id=place_id,
-                        fields=['place_id', 'rating', 'price_level', 'business_status']
-                    )
+                    details = gmaps.place(place_id=place_id, fields=DETAIL_FIELDS)
                     
                     if details['result']:
-                        result = details['result']
-                        
-                        # Extract data yang dibutuhkan
-                        rating = result.get('rating', None)
-                        price_level = result.get('price_level', None)
-                        business_status = result.get('business_status', 'UNKNOWN')
-                        
-                        # Konversi price_level ke range harga rupiah berdasarkan standar Google Maps Indonesia
-                        price_range_rupiah = None
-                        if price_level is not None:
-                            price_ranges_rupiah = {
-                                1: "Rp 15.000 - 50.000",      # Murah
-                                2: "Rp 50.000 - 100.000",    # Sedang  
-                                3: "Rp 100.000 - 200.000",   # Mahal
-                                4: "Rp 200.000+"             # Sangat Mahal
-                            }
-                            price_range_rupiah = price_ranges_rupiah.get(price_level, None)
+                        place_result = format_place_result(place_id, details['result'])
                         
                         if verbose:
                             print(f"   ✅ Ditemukan: Tempat berhasil ditemukan")
-                            print(f"   ⭐ Rating: {rating}")
-                            if price_range_rupiah:
-                                print(f"   💵 Range Harga: {price_range_rupiah}")
-                            print(f"   🏪 Status: {business_status}")
+                            print(f"   ⭐ Rating: {place_result['google_rating']}")
+                            if place_result['price_range_rupiah']:
+                                print(f"   💵 Range Harga: {place_result['price_range_rupiah']}")
+                            print(f"   🏪 Status: {place_result['business_status']}")
                         
-                        return {
-                            'place_id': place_id,
-                            'google_rating': rating,
-                            'price_range_rupiah': price_range_rupiah,
-                            'business_status': business_status,
-                            'status': 'Success'
-                        }
+                        return place_result
                 
                 # Delay antar query
-                time.sleep(0.1)
+                if query_delay:
+                    time.sleep(query_delay)
                 
             except Exception as query_error:
                 if verbose:
@@ -142,133 +179,336 @@ def search_place_details(gmaps, business_name, address, verbose=False):
             'status': 'Error'
         }
 
-def main():
-    """Fungsi utama untuk mengambil rating dan price_level"""
+def resolve_place(gmaps, business_name, address, executor, window=DEFAULT_QUERY_WINDOW):
+    """
+    Versi paralel search_place_details dengan hasil yang sama:
+    hingga `window` variasi query dikirim bersamaan, hasil dari query dengan
+    prioritas tertinggi yang dipakai, dan query yang belum berjalan dibatalkan.
+    Place Details dilewati jika hasil Text Search sudah memuat SEARCH_PAYLOAD_FIELDS.
+    """
+    if not gmaps:
+        return empty_place_result('Error')
+    
+    search_queries = build_search_queries(business_name, address)
+    start = 0
+    while start < len(search_queries):
+        i, places_result = first_hit(
+            executor, search_queries[start:], lambda query: gmaps.places(query=query),
+            lambda result: bool(result.get('results')), window=window
+        )
+        if places_result is None:
+            break
+        
+        place = places_result['results'][0]
+        if all(field in place for field in SEARCH_PAYLOAD_FIELDS):
+            return format_place_result(place['place_id'], place)
+        
+        try:
+            details = gmaps.place(place_id=place['place_id'], fields=DETAIL_FIELDS)
+            if details['result']:
+                return format_place_result(place['place_id'], details['result'])
+        except Exception:
+            pass
+        
+        # Seperti cascade serial: lanjut ke variasi query berikutnya
+        start += i + 1
+    
+    return empty_place_result('Not Found')
+
+def output_path_for(input_file):
+    """File output sesuai nama file input"""
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+    return f'./datasets/{base_name}_with_google_rupiah.csv'
+
+def row_key(business_name, address):
+    """Kunci resume: nama + alamat yang dinormalisasi"""
+    return tuple('' if pd.isna(value) else normalize_query(value) for value in (business_name, address))
+
+def output_columns(input_file):
+    """Urutan kolom file output: kolom input lalu kolom hasil yang belum ada"""
+    header = pd.read_csv(input_file, nrows=0)
+    return list(header.assign(**{column: None for column in RESULT_COLUMNS}).columns)
+
+def load_done_keys(output_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Hitung kunci baris yang sudah ada di file output (untuk resume).
+    Record terakhir yang terpotong karena crash dibuang terlebih dahulu (juga jika
+    potongannya berada di dalam alamat multi-baris yang diberi tanda kutip).
+    """
+    done = Counter()
+    if not os.path.exists(output_file) or os.path.getsize(output_file) == 0:
+        return done
+    truncate_torn_csv_record(output_file)
+    for chunk in pd.read_csv(output_file, usecols=KEY_COLUMNS, chunksize=chunk_size, **CSV_READ_OPTIONS):
+        done.update(row_key(name, address) for name, address in zip(chunk['nama'], chunk['alamat']))
+    return done
+
+def count_pending_rows(input_file, done, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Jumlah baris input yang belum ada di output (tanpa memuat seluruh file)"""
+    total = 0
+    for chunk in pd.read_csv(input_file, usecols=KEY_COLUMNS, chunksize=chunk_size, **CSV_READ_OPTIONS):
+        total += len(chunk)
+    return total, max(0, total - sum(done.values()))
+
+def enrich_csv_streaming(input_file, output_file, lookup, gmaps, chunk_size=DEFAULT_CHUNK_SIZE,
+                         done=None, on_row=None, **enrich_kwargs):
+    """
+    Proses CSV per chunk dan append hasil ke output_file setiap chunk selesai.
+    
+    Memori puncak sebanding dengan chunk_size, bukan ukuran file. Baris yang
+    kuncinya sudah ada di output dilewati (duplikat dihitung per kemunculan),
+    sehingga proses yang terhenti bisa dilanjutkan; paling banyak satu chunk
+    yang diulang, dan respons API-nya biasanya sudah ada di cache.
+    
+    Returns:
+        dict: ringkasan (rows, skipped, chunks, status, requests, retries,
+        failures, unique_rows, resolved, seconds)
+    """
+    done = Counter(done if done is not None else load_done_keys(output_file, chunk_size))
+    columns = output_columns(input_file)
+    write_header = not os.path.exists(output_file) or os.path.getsize(output_file) == 0
+    if not write_header:
+        existing = list(pd.read_csv(output_file, nrows=0).columns)
+        if existing != columns:
+            raise ValueError(f"Kolom {output_file} tidak cocok dengan input; hapus file output atau gunakan file lain")
+    
+    summary = Counter()
+    statuses = Counter()
+    for chunk in pd.read_csv(input_file, chunksize=chunk_size, **CSV_READ_OPTIONS):
+        # Lewati baris yang sudah tersimpan (per kemunculan, agar duplikat tetap lengkap)
+        keep = []
+        for name, address in zip(chunk['nama'], chunk['alamat']):
+            key = row_key(name, address)
+            if done[key] > 0:
+                done[key] -= 1
+                keep.append(False)
+            else:
+                keep.append(True)
+        summary['skipped'] += keep.count(False)
+        chunk = chunk[keep]
+        if chunk.empty:
+            continue
+        
+        rows = list(zip(chunk['nama'], chunk['alamat']))
+        processed_at = [None] * len(rows)
+        
+        def on_result(i, result):
+            processed_at[i] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            if on_row is not None:
+                on_row(result)
+        
+        results, report = enrich(rows, lookup, gmaps, on_result=on_result, **enrich_kwargs)
+        chunk = chunk.assign(**{column: [result[column] for result in results] for column in RESULT_COLUMNS[:-1]},
+                             processed_at=processed_at)
+        
+        # Append + fsync: chunk yang sudah ditulis aman dari crash
+        with open(output_file, 'a', encoding='utf-8', newline='') as f:
+            chunk[columns].to_csv(f, header=write_header, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+        write_header = False
+        
+        statuses.update(result['status'] for result in results)
+        summary['chunks'] += 1
+        for name in ('rows', 'unique_rows', 'resolved', 'requests', 'retries', 'failures', 'seconds'):
+            summary[name] += report[name]
+    
+    summary = dict(summary)
+    summary['status'] = dict(statuses)
+    return summary
+
+def print_summary(total_rows, statuses, report, cache=None, cache_path=None):
+    """Cetak ringkasan hasil pengambilan rating"""
+    success_count = statuses.get('Success', 0)
+    not_found_count = statuses.get('Not Found', 0)
+    error_count = total_rows - success_count - not_found_count
+    total_time = report['seconds']
+    requests_per_second = report['requests'] / total_time if total_time > 0 else 0.0
+    calls_per_resolved_row = report['requests'] / report['resolved'] if report['resolved'] else 0.0
+    
+    print("\n" + "="*80)
+    print("📊 HASIL PENGAMBILAN RATING & RANGE HARGA RUPIAH")
+    print("="*80)
     
-    import sys
+    if total_rows:
+        print(f"✅ Berhasil ditemukan : {success_count}/{total_rows} ({success_count/total_rows*100:.1f}%)")
+        print(f"⚠️  Tidak ditemukan   : {not_found_count}/{total_rows} ({not_found_count/total_rows*100:.1f}%)")
+        print(f"❌ Error             : {error_count}/{total_rows} ({error_count/total_rows*100:.1f}%)")
+    print(f"⏱️  Waktu total       : {total_time:.1f} detik ({total_time/60:.1f} menit)")
+    if total_time > 0:
+        print(f"📈 Rate processing   : {total_rows/total_time:.1f} records/detik")
+    print(f"🌐 Request API       : {report['requests']} ({requests_per_second:.1f} request/detik, "
+          f"{report['retries']} retry, {report['failures']} gagal)")
+    print(f"🔁 Bisnis unik       : {report['unique_rows']}/{report['rows']} | "
+          f"rata-rata {calls_per_resolved_row:.2f} request API per baris berhasil")
+    if cache is not None:
+        cache_stats = cache.stats()
+        print(f"🗄️  Cache API         : {cache_stats['hits'] + cache_stats['negative_hits']:,} hit "
+              f"({cache_stats['negative_hits']:,} negatif), {cache_stats['misses']:,} miss, "
+              f"hit rate {cache_stats['hit_rate']:.1%}, {cache_stats['size']:,} entri di {cache_path}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ambil rating & range harga dari Google Maps secara paralel")
+    parser.add_argument('input_file', nargs='?', default='./datasets/full_restaurant_dataset.csv',
+                        help="CSV restoran dengan kolom nama dan alamat")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Jumlah bisnis yang diproses bersamaan (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument('--rate', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help=f"Batas request API per detik (default: {DEFAULT_REQUESTS_PER_SECOND})")
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES,
+                        help="Jumlah retry untuk error sementara (timeout, OVER_QUERY_LIMIT)")
+    parser.add_argument('--fake', action='store_true',
+                        help="Gunakan FakePlacesClient (tanpa API, untuk uji coba)")
+    parser.add_argument('--resolver', choices=['concurrent', 'serial'], default='concurrent',
+                        help="concurrent: variasi query paralel + dedup bisnis; serial: cascade lama")
+    parser.add_argument('--query-window', type=int, default=DEFAULT_QUERY_WINDOW,
+                        help=f"Variasi query paralel per bisnis (default: {DEFAULT_QUERY_WINDOW})")
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH,
+                        help=f"File cache SQLite respons API (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument('--no-cache', action='store_true', help="Nonaktifkan cache respons API")
+    parser.add_argument('--stream', action='store_true',
+                        help="Proses per chunk dan append ke output (memori terbatas, bisa dilanjutkan)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Baris per chunk pada mode --stream (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--yes', action='store_true', help="Lewati konfirmasi")
+    args = parser.parse_args(argv)
+    if args.concurrency <= 0 or args.rate <= 0 or args.chunk_size <= 0:
+        parser.error("--concurrency, --rate dan --chunk-size harus positif")
+    return args
+
+def main(argv=None):
+    """Fungsi utama untuk mengambil rating dan price_level"""
+    args = parse_args(argv)
     
     print("="*80)
     print("⭐ SCRIPT PENGAMBILAN RATING & RANGE HARGA RUPIAH - GOOGLE MAPS")
     print("="*80)
     
-    # Tentukan file input
-    if len(sys.argv) > 1:
-        input_file = sys.argv[1]
-    else:
-        input_file = './datasets/full_restaurant_dataset.csv'
+    # Tentukan file input dan output
+    input_file = args.input_file
+    output_file = output_path_for(input_file)
     
     # Load dataset utama
     print(f"\n📂 Membaca dataset: {input_file}...")
-    try:
-        df = pd.read_csv(input_file)
-        print(f"✅ Dataset berhasil dimuat: {len(df)} records")
-        print(f"📊 Kolom yang tersedia: {list(df.columns)}")
-    except Exception as e:
-        print(f"❌ Error membaca dataset: {e}")
-        return
-    
-    # Karena file input sudah hanya berisi restoran, gunakan semua data
-    df_business = df.copy()
-    print(f"🏪 Data restoran untuk diproses: {len(df_business)} records")
+    if args.stream:
+        # Mode streaming: hanya kolom kunci yang dibaca di sini
+        try:
+            done = load_done_keys(output_file, args.chunk_size)
+            total_rows, pending_rows = count_pending_rows(input_file, done, args.chunk_size)
+        except Exception as e:
+            print(f"❌ Error membaca dataset: {e}")
+            return
+        print(f"✅ Mode streaming: {total_rows} records, diproses per {args.chunk_size} baris")
+        if done:
+            print(f"♻️  Melanjutkan: {sum(done.values())} baris sudah ada di {output_file}")
+    else:
+        try:
+            df = pd.read_csv(input_file)
+            print(f"✅ Dataset berhasil dimuat: {len(df)} records")
+            print(f"📊 Kolom yang tersedia: {list(df.columns)}")
+        except Exception as e:
+            print(f"❌ Error membaca dataset: {e}")
+            return
+        
+        # Karena file input sudah hanya berisi restoran, gunakan semua data
+        df_business = df.copy()
+        pending_rows = len(df_business)
+        print(f"🏪 Data restoran untuk diproses: {len(df_business)} records")
     
-    # Setup Google Maps API
+    # Setup Google Maps API (atau client palsu untuk uji coba)
     print(f"\n🔧 Setup Google Maps API...")
-    gmaps = setup_google_maps_api()
+    if args.fake:
+        gmaps = FakePlacesClient()
+        print("🧪 Menggunakan FakePlacesClient (tanpa request ke Google)")
+    else:
+        gmaps = setup_google_maps_api()
     
     if not gmaps:
         print("❌ Tidak dapat melanjutkan tanpa Google Maps API")
         return
     
     # PRODUCTION MODE: Proses semua data restoran
-    print(f"\n� PRODUCTION MODE: Memproses semua {len(df_business)} data restoran...")
-    df_test = df_business.copy()
+    print(f"\n� PRODUCTION MODE: Memproses semua {pending_rows} data restoran...")
     
     # Estimasi biaya untuk Places API
-    estimated_requests = len(df_test) * 2  # Search + Details
+    estimated_requests = pending_rows * 2  # Search + Details
     estimated_cost = (estimated_requests / 1000) * 34
     
-    print(f"💰 Estimasi untuk {len(df_test)} restoran:")
+    print(f"💰 Estimasi untuk {pending_rows} restoran:")
     print(f"   📊 Total API calls: ~{estimated_requests} (Search + Details)")
     print(f"   💰 Estimasi biaya: ${estimated_cost:.2f}")
-    print(f"   ⏱️  Estimasi waktu: ~{len(df_test) * 0.5 / 60:.1f} menit")
+    print(f"   ⏱️  Estimasi waktu: ~{estimated_requests / args.rate / 60:.1f} menit "
+          f"({args.concurrency} paralel, maks {args.rate:g} request/detik)")
     
     # Konfirmasi untuk melanjutkan
-    proceed = input(f"\n🚀 Lanjutkan dengan proses full dataset? (y/n): ")
-    if proceed.lower() != 'y':
-        print("❌ Proses dibatalkan")
-        return
+    if not args.yes:
+        proceed = input(f"\n🚀 Lanjutkan dengan proses full dataset? (y/n): ")
+        if proceed.lower() != 'y':
+            print("❌ Proses dibatalkan")
+            return
     
-    # Inisialisasi kolom hasil (hanya kolom yang diperlukan)
-    df_test['place_id'] = None
-    df_test['google_rating'] = None
-    df_test['price_range_rupiah'] = None
-    df_test['business_status'] = None
-    df_test['processed_at'] = None
-    
-    print(f"\n🚀 Memulai pengambilan rating dan range harga untuk {len(df_test)} bisnis...")
+    print(f"\n🚀 Memulai pengambilan rating dan range harga untuk {pending_rows} bisnis...")
     print("-" * 80)
     
-    # Progress tracking
-    success_count = 0
-    error_count = 0
-    not_found_count = 0
+    # Jeda antar query ditangani token bucket, bukan time.sleep
+    query_executor = None
+    if args.resolver == 'concurrent':
+        query_executor = make_query_executor(args.concurrency * 4)
+        lookup = functools.partial(resolve_place, executor=query_executor, window=args.query_window)
+    else:
+        lookup = functools.partial(search_place_details, query_delay=0)
+    enrich_kwargs = dict(concurrency=args.concurrency, requests_per_second=args.rate,
+                         max_retries=args.max_retries, dedupe=args.resolver == 'concurrent')
     
-    # Proses setiap bisnis dengan progress bar
-    start_time = time.time()
+    # Respons dari run sebelumnya (termasuk 'Not Found') diambil dari cache
+    cache = None if args.no_cache else ResponseCache(args.cache)
     
-    for index, row in tqdm(df_test.iterrows(), total=len(df_test), desc="⭐ Mengambil rating & range harga"):
+    if args.stream:
+        with tqdm(total=pending_rows, desc="⭐ Mengambil rating & range harga") as progress:
+            summary = enrich_csv_streaming(
+                input_file, output_file, lookup, gmaps, chunk_size=args.chunk_size, done=done,
+                on_row=lambda result: progress.update(1), cache=cache, **enrich_kwargs
+            )
+        statuses = summary['status']
+        processed_rows = summary.get('rows', 0)
+        report = {name: summary.get(name, 0)
+                  for name in ('rows', 'unique_rows', 'resolved', 'requests', 'retries', 'failures', 'seconds')}
+    else:
+        df_test = df_business.copy()
         
-        # Debug untuk beberapa record pertama
-        verbose_mode = index < 5  # Verbose untuk 5 record pertama
+        # Inisialisasi kolom hasil (hanya kolom yang diperlukan)
+        for column in RESULT_COLUMNS:
+            df_test[column] = None
         
-        if verbose_mode:
-            print(f"\n[{index+1}/{len(df_test)}] Processing: {row['nama']}")
+        rows = list(zip(df_test['nama'], df_test['alamat']))
+        processed_at = [None] * len(rows)
         
-        # Panggil fungsi pencarian detail
-        result = search_place_details(
-            gmaps, 
-            row['nama'], 
-            row['alamat'], 
-            verbose=verbose_mode
-        )
+        with tqdm(total=len(rows), desc="⭐ Mengambil rating & range harga") as progress:
+            def on_result(i, result):
+                processed_at[i] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                progress.update(1)
+            
+            results, report = enrich(rows, lookup, gmaps, on_result=on_result, cache=cache, **enrich_kwargs)
         
         # Update dataframe dengan hasil (hanya kolom yang diperlukan)
-        df_test.at[index, 'place_id'] = result['place_id']
-        df_test.at[index, 'google_rating'] = result['google_rating']
-        df_test.at[index, 'price_range_rupiah'] = result['price_range_rupiah']
-        df_test.at[index, 'business_status'] = result['business_status']
-        df_test.at[index, 'processed_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Count status
-        if result['status'] == 'Success':
-            success_count += 1
-        elif result['status'] == 'Not Found':
-            not_found_count += 1
-        else:
-            error_count += 1
-        
-        # Delay untuk rate limiting
-        time.sleep(0.5)  # 500ms delay untuk menghormati API limits
+        for column in RESULT_COLUMNS[:-1]:
+            df_test[column] = [result[column] for result in results]
+        df_test['processed_at'] = processed_at
+        statuses = Counter(result['status'] for result in results)
+        processed_rows = len(df_test)
+    if query_executor is not None:
+        query_executor.shutdown()
     
-    end_time = time.time()
-    total_time = end_time - start_time
-    
-    print("\n" + "="*80)
-    print("📊 HASIL PENGAMBILAN RATING & RANGE HARGA RUPIAH")
-    print("="*80)
-    
-    success_rate = success_count / len(df_test) * 100
-    print(f"✅ Berhasil ditemukan : {success_count}/{len(df_test)} ({success_rate:.1f}%)")
-    print(f"⚠️  Tidak ditemukan   : {not_found_count}/{len(df_test)} ({not_found_count/len(df_test)*100:.1f}%)")
-    print(f"❌ Error             : {error_count}/{len(df_test)} ({error_count/len(df_test)*100:.1f}%)")
-    print(f"⏱️  Waktu total       : {total_time:.1f} detik ({total_time/60:.1f} menit)")
-    print(f"📈 Rate processing   : {len(df_test)/total_time:.1f} records/detik")
+    print_summary(processed_rows, statuses, report, cache, args.cache)
+    if args.stream:
+        print(f"⏭️  Dilewati (sudah ada di output): {summary.get('skipped', 0)} | "
+              f"{summary.get('chunks', 0)} chunk ditulis")
+    if cache is not None:
+        cache.close()
     
     # Simpan hasil dengan nama yang sesuai input file
-    import os
-    base_name = os.path.splitext(os.path.basename(input_file))[0]
-    output_file = f'./datasets/{base_name}_with_google_rupiah.csv'
-    df_test.to_csv(output_file, index=False)
+    if not args.stream:
+        df_test.to_csv(output_file, index=False)
     print(f"\n💾 Hasil processing disimpan ke: {output_file}")
     
     print("\n🏁 Full processing selesai!")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Micro-batching of concurrent single-item requests.
+
+MicroBatcher collects items submitted from many threads on a queue. A
+background thread takes the first waiting item, keeps collecting until the
+batch holds max_batch_size items or max_wait seconds have passed, and hands
+the whole batch to one process_batch() call (for the ensemble: one scaling
+pass and one predict_proba over an N-row matrix instead of N single-row
+calls). Each caller gets a Future that resolves to its own row of the
+result.
+
+process_batch may also return a concurrent.futures.Future (e.g. from a
+process pool); the batcher then starts collecting the next batch right
+away, with at most max_in_flight batches outstanding. While all of them
+are busy, new items keep queueing, so batches grow with the load even
+with max_wait=0.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_SECONDS = 0.002
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent submissions into batched calls.
+
+    Args:
+        process_batch: Callable taking a list of items and returning a
+            sequence of results in the same order (or a Future of one).
+        max_batch_size: Upper bound on items per call.
+        max_wait: Seconds to wait for more items after the first one arrives.
+        max_in_flight: Batches allowed to run concurrently when
+            process_batch returns Futures.
+        name: Name of the background thread.
+    """
+
+    def __init__(self, process_batch, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait=DEFAULT_MAX_WAIT_SECONDS, max_in_flight=1, name='micro-batcher'):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_wait < 0:
+            raise ValueError("max_wait must not be negative")
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._in_flight = threading.BoundedSemaphore(max(1, max_in_flight))
+        self._lock = threading.Lock()
+        self._closed = False
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """Queue one item; returns a Future resolving to its result."""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put((item, future))
+        return future
+
+    def __call__(self, item, timeout=None):
+        """Submit one item and wait for its result."""
+        return self.submit(item).result(timeout)
+
+    def _collect(self):
+        """Block for the first item, then gather more until full or timed out."""
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                # Finish this batch, then stop
+                self._queue.put(_STOP)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            # Wait for a free slot first: while every slot is busy, new
+            # items pile up in the queue and form the next, larger batch
+            self._in_flight.acquire()
+            batch = self._collect()
+            if batch is None:
+                self._in_flight.release()
+                return
+            # Callers that cancelled while queued are dropped from the batch
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+            if not items:
+                self._in_flight.release()
+                continue
+            with self._lock:
+                self.batches += 1
+                self.items += len(items)
+                self.largest_batch = max(self.largest_batch, len(items))
+
+            try:
+                results = self.process_batch(items)
+            except BaseException as exc:
+                self._in_flight.release()
+                _fail(futures, exc)
+                continue
+            if isinstance(results, Future):
+                results.add_done_callback(lambda done, futures=futures: self._finish(futures, done))
+            else:
+                self._in_flight.release()
+                _resolve(futures, results)
+
+    def _finish(self, futures, done):
+        self._in_flight.release()
+        try:
+            results = done.result()
+        except BaseException as exc:
+            _fail(futures, exc)
+        else:
+            _resolve(futures, results)
+
+    def stats(self):
+        """Batches and items processed so far."""
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'items': self.items,
+                'mean_batch_size': self.items / self.batches if self.batches else 0.0,
+                'largest_batch': self.largest_batch,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+            }
+
+    def close(self, timeout=None):
+        """Stop accepting items, finish the queued ones and join the thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+
+def _resolve(futures, results):
+    if len(results) != len(futures):
+        _fail(futures, RuntimeError(f"process_batch returned {len(results)} results for {len(futures)} items"))
+        return
+    for future, result in zip(futures, results):
+        future.set_result(result)
+
+
+def _fail(futures, exc):
+    for future in futures:
+        future.set_exception(exc)
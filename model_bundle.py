@@ -0,0 +1,364 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Single-file, memory-mappable model bundle.
+
+Packs everything needed for scoring (feature order, encoder classes, target
+mapping, scaler mean/scale, the flattened ensemble arrays and the pickled
+original model) into one versioned file:
+
+    offset 0   : header  = magic b'FNBMODEL', format version (uint32),
+                 flags (uint32, reserved), manifest length (uint64)
+    offset 24  : manifest (UTF-8 JSON)
+    aligned    : data section; every array starts on a 64-byte boundary and
+                 is stored uncompressed in native little-endian layout
+
+Arrays are opened with np.memmap, so several Streamlit worker processes
+share one page-cached copy. The original model is only unpickled when a
+batch is too large for the flat engine (see flat_ensemble.FLAT_MAX_ROWS).
+
+Usage:
+    python model_bundle.py write            # models/competition -> model_bundle.fnb
+    python model_bundle.py verify
+    python model_bundle.py info
+"""
+
+import argparse
+import json
+import os
+import pickle
+import struct
+import sys
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+from flat_ensemble import FlatEnsemble
+
+MAGIC = b'FNBMODEL'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sIIQ')
+ALIGNMENT = 64
+
+BUNDLE_FILE = 'model_bundle.fnb'
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'competition')
+KECAMATAN_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bandung_kecamatan_data.json')
+
+# Source files the bundle is built from (used for staleness checks)
+SOURCE_FILES = (
+    'final_competition_model.pkl',
+    'competition_scaler.pkl',
+    'feature_names_competition.txt',
+    'label_encoder_kategori.pkl',
+    'label_encoder_target.pkl',
+    'target_mapping.json'
+)
+OPTIONAL_SOURCE_FILES = ('category_mapping.json',)
+
+# Columns identifying one scan_grid combination
+GRID_KEYS = ['kecamatan', 'kategori_resto', 'price_range', 'google_rating', 'jumlah_ulasan']
+
+
+class BundleScaler:
+    """StandardScaler stand-in backed by bundle arrays (see fnb_scoring.scale_features)."""
+
+    def __init__(self, mean, scale, with_mean=True, with_std=True):
+        self.mean_ = mean
+        self.scale_ = scale
+        self.with_mean = with_mean
+        self.with_std = with_std
+        self.n_features_in_ = len(mean)
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        if self.with_mean:
+            X -= self.mean_
+        if self.with_std:
+            X /= self.scale_
+        return X
+
+
+class BundleLabelEncoder:
+    """LabelEncoder stand-in over sorted classes_ (same codes as sklearn)."""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes, dtype=object)
+
+    def transform(self, y):
+        y = np.asarray(y, dtype=object)
+        codes = np.searchsorted(self.classes_, y)
+        valid = (codes < len(self.classes_)) & (self.classes_[np.minimum(codes, len(self.classes_) - 1)] == y)
+        if not np.all(valid):
+            raise ValueError(f"y contains previously unseen labels: {list(y[~valid])}")
+        return codes
+
+    def inverse_transform(self, y):
+        return self.classes_[np.asarray(y, dtype=np.int64)]
+
+
+class LazyPickledModel:
+    """Original model stored as pickle bytes; unpickled on first use."""
+
+    def __init__(self, blob, classes):
+        self._blob = blob
+        self._model = None
+        self._lock = threading.Lock()
+        self.classes_ = np.asarray(classes)
+
+    def get(self):
+        with self._lock:
+            if self._model is None:
+                self._model = pickle.loads(self._blob)
+            return self._model
+
+    def predict_proba(self, X):
+        return self.get().predict_proba(X)
+
+    def predict(self, X):
+        return self.get().predict(X)
+
+
+def bundle_path(model_dir):
+    return os.path.join(model_dir, BUNDLE_FILE)
+
+
+def bundle_is_current(model_dir):
+    """True if the bundle exists and is newer than every source file in model_dir."""
+    path = bundle_path(model_dir)
+    if not os.path.exists(path):
+        return False
+    bundle_mtime = os.stat(path).st_mtime_ns
+    for name in SOURCE_FILES + OPTIONAL_SOURCE_FILES:
+        source = os.path.join(model_dir, name)
+        if os.path.exists(source) and os.stat(source).st_mtime_ns > bundle_mtime:
+            return False
+    return True
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_bundle(model_dir=DEFAULT_MODEL_DIR, path=None):
+    """
+    Build a bundle from the artifacts in model_dir.
+
+    Returns:
+        str: Path of the written bundle.
+    """
+    from artifact_loader import load_artifacts
+
+    path = path or bundle_path(model_dir)
+    artifacts, _ = load_artifacts(model_dir, use_bundle=False)
+    model, scaler = artifacts['model'], artifacts['scaler']
+
+    arrays = {
+        'scaler/mean': np.asarray(scaler.mean_, dtype=np.float64),
+        'scaler/scale': np.asarray(scaler.scale_, dtype=np.float64),
+        'model/pickle': np.frombuffer(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL), dtype=np.uint8)
+    }
+    flat_meta = None
+    if artifacts['flat_model_enabled']:
+        flat_arrays, flat_meta = artifacts['scoring_model'].to_state()
+        arrays.update({f'flat/{name}': np.ascontiguousarray(array) for name, array in flat_arrays.items()})
+
+    category_mapping = None
+    category_mapping_path = os.path.join(model_dir, 'category_mapping.json')
+    if os.path.exists(category_mapping_path):
+        with open(category_mapping_path, 'r', encoding='utf-8') as f:
+            category_mapping = json.load(f)
+
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        offset = _align(offset)
+        layout[name] = {'dtype': array.dtype.newbyteorder('<').str, 'shape': list(array.shape),
+                        'offset': offset, 'nbytes': array.nbytes}
+        offset += array.nbytes
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'feature_names': artifacts['feature_names'],
+        'kategori_classes': [str(c) for c in artifacts['le_kategori'].classes_],
+        'target_classes': [str(c) for c in artifacts['le_target'].classes_],
+        'target_mapping': artifacts['target_mapping'],
+        'category_mapping': category_mapping,
+        'scaler': {'with_mean': bool(getattr(scaler, 'with_mean', True)),
+                   'with_std': bool(getattr(scaler, 'with_std', True))},
+        'model': {'classes': np.asarray(model.classes_).tolist(), 'flat': flat_meta},
+        'arrays': layout
+    }
+    manifest_bytes = json.dumps(manifest, ensure_ascii=False).encode('utf-8')
+    data_start = _align(HEADER.size + len(manifest_bytes))
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(manifest_bytes)))
+        f.write(manifest_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]['offset'])
+            f.write(array.astype(layout[name]['dtype'], copy=False).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_manifest(path):
+    """Return (manifest, data section offset) after validating the header."""
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError(f"{path} is not a model bundle (file too short)")
+        magic, version, _, manifest_length = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a model bundle (bad magic)")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported bundle format version {version} (expected {FORMAT_VERSION})")
+        manifest = json.loads(f.read(manifest_length).decode('utf-8'))
+    return manifest, _align(HEADER.size + manifest_length)
+
+
+def load_bundle(path, mmap=True):
+    """
+    Load a bundle written by write_bundle().
+
+    Args:
+        path: Bundle file.
+        mmap: Memory-map the arrays (shared page cache) instead of reading them.
+
+    Returns:
+        dict: Same keys as artifact_loader.load_artifacts() plus 'manifest'.
+    """
+    manifest, data_start = read_manifest(path)
+    if mmap:
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+    else:
+        data = np.fromfile(path, dtype=np.uint8)
+
+    def array(name):
+        spec = manifest['arrays'][name]
+        start = data_start + spec['offset']
+        return data[start:start + spec['nbytes']].view(np.dtype(spec['dtype'])).reshape(spec['shape'])
+
+    model = LazyPickledModel(array('model/pickle'), manifest['model']['classes'])
+    flat_meta = manifest['model']['flat']
+    if flat_meta is not None:
+        flat_arrays = {name[len('flat/'):]: array(name) for name in manifest['arrays'] if name.startswith('flat/')}
+        scoring_model = FlatEnsemble.from_state(flat_arrays, flat_meta, fallback=model)
+    else:
+        scoring_model = model
+
+    return {
+        'model': model,
+        'scoring_model': scoring_model,
+        'flat_model_enabled': flat_meta is not None,
+        'scaler': BundleScaler(array('scaler/mean'), array('scaler/scale'), **manifest['scaler']),
+        'feature_names': manifest['feature_names'],
+        'le_kategori': BundleLabelEncoder(manifest['kategori_classes']),
+        'le_target': BundleLabelEncoder(manifest['target_classes']),
+        'target_mapping': manifest['target_mapping'],
+        'manifest': manifest
+    }
+
+
+def verify_bundle(path, model_dir=DEFAULT_MODEL_DIR, kecamatan_path=KECAMATAN_DATA_PATH, atol=1e-6):
+    """
+    Check that a bundle reproduces the original artifacts' predictions.
+
+    Scores the full kecamatan x kategori x price x rating x review grid with
+    the original pickles and with the bundle (flat engine, in batches small
+    enough to stay on it) and compares labels and probabilities.
+
+    Returns:
+        dict: rows, label_mismatches, max_abs_diff and ok.
+    """
+    from artifact_loader import load_artifacts
+    from fnb_features import build_kecamatan_table
+    from fnb_scoring import scan_grid
+
+    original, _ = load_artifacts(model_dir, compile_flat=False, use_bundle=False)
+    bundle = load_bundle(path)
+
+    if bundle['feature_names'] != original['feature_names']:
+        raise AssertionError("Bundle feature order differs from feature_names_competition.txt")
+    if bundle['target_mapping'] != original['target_mapping']:
+        raise AssertionError("Bundle target mapping differs from target_mapping.json")
+    kategori_classes = list(original['le_kategori'].classes_)
+    if not np.array_equal(bundle['le_kategori'].transform(kategori_classes),
+                          original['le_kategori'].transform(kategori_classes)):
+        raise AssertionError("Bundle category codes differ from label_encoder_kategori.pkl")
+
+    with open(kecamatan_path, 'r', encoding='utf-8') as f:
+        kecamatan_table = build_kecamatan_table(json.load(f))
+
+    def scan(artifacts, model):
+        # scan_grid ranks by prob_Go; re-sort on the grid keys so near-ties line up
+        results = scan_grid(kecamatan_table, kategori_classes, model, artifacts['scaler'],
+                            artifacts['target_mapping'], kategori_encoder=artifacts['le_kategori'])
+        return results.sort_values(GRID_KEYS, kind='stable').reset_index(drop=True)
+
+    expected = scan(original, original['model'])
+    actual = scan(bundle, _SmallBatches(bundle['scoring_model']))
+
+    prob_columns = [c for c in expected.columns if c.startswith('prob_')]
+    max_abs_diff = float(np.abs(expected[prob_columns].to_numpy() - actual[prob_columns].to_numpy()).max())
+    label_mismatches = int((expected['predicted_label'] != actual['predicted_label']).sum())
+    return {
+        'rows': len(expected),
+        'label_mismatches': label_mismatches,
+        'max_abs_diff': max_abs_diff,
+        'ok': label_mismatches == 0 and max_abs_diff <= atol
+    }
+
+
+class _SmallBatches:
+    """Scores in batches no larger than the flat engine's max_rows so the flat path is exercised."""
+
+    def __init__(self, model):
+        self.model = model
+        self.classes_ = model.classes_
+        self.batch_size = getattr(model, 'max_rows', None) or 1024
+
+    def predict_proba(self, X):
+        return np.concatenate([self.model.predict_proba(X[i:i + self.batch_size])
+                               for i in range(0, len(X), self.batch_size)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write, verify or inspect the single-file model bundle")
+    parser.add_argument('command', choices=['write', 'verify', 'info'])
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR, help="Directory with the source artifacts")
+    parser.add_argument('--bundle', help=f"Bundle path (default: <model-dir>/{BUNDLE_FILE})")
+    args = parser.parse_args(argv)
+    path = args.bundle or bundle_path(args.model_dir)
+
+    if args.command == 'write':
+        write_bundle(args.model_dir, path)
+        print(f"✅ Bundle written to: {path} ({os.path.getsize(path):,} bytes)")
+        args.command = 'verify'
+
+    if args.command == 'verify':
+        result = verify_bundle(path, args.model_dir)
+        status = "✅ Bundle reproduces" if result['ok'] else "❌ Bundle does NOT reproduce"
+        print(f"{status} the original predictions: {result['rows']:,} rows, "
+              f"{result['label_mismatches']} label mismatches, max prob diff {result['max_abs_diff']:.2e}")
+        if not result['ok']:
+            sys.exit(1)
+        return
+
+    manifest, data_start = read_manifest(path)
+    print(f"Bundle: {path}")
+    print(f"Format version: {manifest['format_version']} | created {manifest['created_at']}")
+    print(f"Features: {len(manifest['feature_names'])} | categories: {len(manifest['kategori_classes'])} | "
+          f"engine: {'flat' if manifest['model']['flat'] else 'pickle'}")
+    for name, spec in manifest['arrays'].items():
+        print(f"  {name:<20} {spec['dtype']:<5} {str(tuple(spec['shape'])):<16} "
+              f"@{data_start + spec['offset']:>10,} ({spec['nbytes']:,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Concurrent Google Places enrichment engine for get_rating_API.py.
+
+Rows are looked up with get_rating_API.search_place_details (same query
+cascade and result format), with several businesses in flight at once.
+Every Places call goes through RateLimitedClient, which paces requests with
+a shared token bucket instead of fixed sleeps and retries transient errors
+with exponential backoff. FakePlacesClient stands in for googlemaps.Client
+so the engine can be exercised offline.
+"""
+
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api_cache import CachedMapsClient
+from query_cascade import dedupe_keys
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 8.0
+
+# Places API statuses / googlemaps exception names worth retrying
+RETRYABLE_STATUSES = {'OVER_QUERY_LIMIT', 'UNKNOWN_ERROR', 'RESOURCE_EXHAUSTED'}
+RETRYABLE_EXCEPTIONS = {'Timeout', 'TransportError', '_OverQueryLimit', '_RetriableRequest'}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, up to `capacity` at once.
+
+    acquire() blocks until a token is available, so calls are spread evenly
+    instead of being paced by fixed sleeps.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1.0):
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+def is_retryable(error):
+    """True for transient errors: timeouts, transport failures and quota/unknown API statuses."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in RETRYABLE_EXCEPTIONS:
+        return True
+    return getattr(error, 'status', None) in RETRYABLE_STATUSES
+
+
+class RateLimitedClient:
+    """
+    Wraps a googlemaps-style client (places/place) with rate limiting and retries.
+
+    Counts every attempt so the achieved request rate can be reported.
+    """
+
+    def __init__(self, client, bucket, max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF_SECONDS,
+                 sleep=time.sleep):
+        self.client = client
+        self.bucket = bucket
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _call(self, method, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            with self._lock:
+                self.requests += 1
+            try:
+                return getattr(self.client, method)(**kwargs)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    with self._lock:
+                        self.failures += 1
+                    raise
+                with self._lock:
+                    self.retries += 1
+                # Exponential backoff with jitter
+                delay = min(MAX_BACKOFF_SECONDS, self.backoff * 2 ** attempt)
+                self._sleep(delay * random.uniform(0.5, 1.0))
+
+    def places(self, **kwargs):
+        return self._call('places', **kwargs)
+
+    def place(self, **kwargs):
+        return self._call('place', **kwargs)
+
+    def stats(self):
+        with self._lock:
+            return {'requests': self.requests, 'retries': self.retries, 'failures': self.failures}
+
+
+async def enrich_async(rows, lookup, client, concurrency=DEFAULT_CONCURRENCY,
+                       requests_per_second=DEFAULT_REQUESTS_PER_SECOND, max_retries=DEFAULT_MAX_RETRIES,
+                       on_result=None, cache=None, dedupe=False):
+    """
+    Look up many businesses concurrently.
+
+    Args:
+        rows: Sequence of (business_name, address) pairs.
+        lookup: Callable (client, business_name, address) -> result dict,
+            e.g. a partial of get_rating_API.search_place_details.
+        client: googlemaps.Client or FakePlacesClient.
+        concurrency: Maximum businesses in flight.
+        requests_per_second: Token bucket rate shared by all requests.
+        max_retries: Retries per request for transient errors.
+        on_result: Optional callback (index, result) called as rows finish.
+        cache: Optional api_cache.ResponseCache; cached responses skip both
+            the rate limiter and the API.
+        dedupe: Resolve identical (name, address) pairs only once.
+
+    Returns:
+        tuple: (results in input order, report dict with rows, unique_rows,
+        resolved, requests, retries, failures, seconds, requests_per_second
+        and calls_per_resolved_row)
+    """
+    limited = RateLimitedClient(client, TokenBucket(requests_per_second), max_retries=max_retries)
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    results = [None] * len(rows)
+    api = CachedMapsClient(limited, cache) if cache is not None else limited
+
+    if dedupe:
+        unique_rows, inverse = dedupe_keys(rows)
+    else:
+        unique_rows, inverse = list(rows), list(range(len(rows)))
+    targets = [[] for _ in unique_rows]
+    for index, unique_index in enumerate(inverse):
+        targets[unique_index].append(index)
+
+    async def run(unique_index, business_name, address):
+        async with semaphore:
+            result = await loop.run_in_executor(executor, lookup, api, business_name, address)
+        for index in targets[unique_index]:
+            results[index] = dict(result)
+            if on_result is not None:
+                on_result(index, results[index])
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(run(i, name, address) for i, (name, address) in enumerate(unique_rows)))
+    finally:
+        executor.shutdown(wait=True)
+    elapsed = time.perf_counter() - start
+
+    resolved = sum(result['status'] == 'Success' for result in results)
+    report = dict(limited.stats(), rows=len(rows), unique_rows=len(unique_rows), resolved=resolved, seconds=elapsed)
+    report['requests_per_second'] = report['requests'] / elapsed if elapsed > 0 else 0.0
+    report['calls_per_resolved_row'] = report['requests'] / resolved if resolved else 0.0
+    return results, report
+
+
+def enrich(rows, lookup, client, **kwargs):
+    """Synchronous wrapper around enrich_async()."""
+    return asyncio.run(enrich_async(rows, lookup, client, **kwargs))
+
+
+class FakePlacesClient:
+    """
+    Offline stand-in for googlemaps.Client (places/place/geocode only).
+
+    Results are deterministic per query. latency simulates network time;
+    not_found_rate makes a share of queries return no results and
+    error_rate raises transient Timeout errors that the engine retries.
+    search_payload=False returns bare place_ids from places(), forcing a
+    place() details call per hit.
+    """
+
+    class Timeout(Exception):
+        pass
+
+    def __init__(self, latency=0.05, not_found_rate=0.3, error_rate=0.0, search_payload=True, seed=0):
+        self.latency = latency
+        self.search_payload = search_payload
+        self.not_found_rate = not_found_rate
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = {'places': 0, 'place': 0, 'geocode': 0}
+
+    def _fraction(self, text):
+        digest = hashlib.md5(text.encode('utf-8')).digest()
+        return int.from_bytes(digest[:4], 'little') / 2 ** 32
+
+    def _simulate(self, method):
+        with self._lock:
+            self.calls[method] += 1
+            fail = self._random.random() < self.error_rate
+        time.sleep(self.latency)
+        if fail:
+            raise FakePlacesClient.Timeout(f"Simulated timeout in {method}")
+
+    def _payload(self, place_id):
+        fraction = self._fraction(place_id)
+        return {
+            'place_id': place_id,
+            'rating': round(3.5 + 1.5 * fraction, 1),
+            'price_level': 1 + int(fraction * 4),
+            'business_status': 'OPERATIONAL'
+        }
+
+    def places(self, query, **kwargs):
+        self._simulate('places')
+        if self._fraction(query) < self.not_found_rate:
+            return {'results': [], 'status': 'ZERO_RESULTS'}
+        place_id = 'fake-' + hashlib.md5(query.encode('utf-8')).hexdigest()[:16]
+        # Like the real Text Search, results carry rating/price_level/business_status
+        result = self._payload(place_id) if self.search_payload else {'place_id': place_id}
+        return {'results': [result], 'status': 'OK'}
+
+    def place(self, place_id, fields=None, **kwargs):
+        self._simulate('place')
+        return {'result': self._payload(place_id), 'status': 'OK'}
+
+    def geocode(self, address, **kwargs):
+        self._simulate('geocode')
+        fraction = self._fraction(address)
+        if fraction < self.not_found_rate:
+            return []
+        return [{
+            'place_id': 'fake-' + hashlib.md5(address.encode('utf-8')).hexdigest()[:16],
+            'formatted_address': f"{address}, Kota Bandung, Jawa Barat, Indonesia",
+            'geometry': {'location': {'lat': -6.95 + 0.1 * fraction, 'lng': 107.55 + 0.15 * fraction}}
+        }]
@@ -9,11 +9,15 @@ based on strategic location factors using a pre-trained ensemble model.
 
 Usage:
     python predict_fnb_business_success.py
+    python predict_fnb_business_success.py --input candidates.csv --output predictions.csv
+    python predict_fnb_business_success.py --sweep --kategori Cafe --top 20
 """
 
 import os
 import sys
 import json
+import time
+import argparse
 
 # Check for required packages
 try:
@@ -21,11 +25,6 @@ try:
     import numpy as np
     import pandas as pd
     from pathlib import Path
-    import matplotlib.pyplot as plt
-    from sklearn.preprocessing import LabelEncoder
-    # Explicitly import model packages that are required
-    import xgboost as xgb
-    import lightgbm as lgb
 except ImportError as e:
     print(f"\n❌ Missing required package: {str(e)}")
     print("\nPlease install the missing package using:")
@@ -34,83 +33,74 @@ except ImportError as e:
     print(f"pip install {str(e).split()[-1]}")
     sys.exit(1)
 
+from fnb_features import build_kecamatan_table
+from fnb_scoring import predict_batch, scan_grid
+from artifact_loader import load_artifacts
+from dataset_store import iter_chunks
+from business_rules import evaluate_rules
+from validation_stats import load_thresholds
+
 # Configuration
 COMPETITION_DIR = os.path.join(os.path.dirname(__file__), 'models', 'competition')
 RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+KECAMATAN_DATA_PATH = os.path.join(os.path.dirname(__file__), 'bandung_kecamatan_data.json')
+
+# Default number of rows scored per chunk in batch mode
+DEFAULT_CHUNK_SIZE = 50000
 
 # Ensure results directory exists
 os.makedirs(RESULTS_DIR, exist_ok=True)
 
-def load_model_and_components():
+def load_model_and_components(timings_path=None):
     """Load the trained model and all necessary components for prediction."""
     try:
-        # Verify competition directory exists
-        if not os.path.exists(COMPETITION_DIR):
-            raise FileNotFoundError(f"Competition directory not found: {COMPETITION_DIR}")
-        
-        # Load model
-        model_path = os.path.join(COMPETITION_DIR, 'final_competition_model.pkl')
-        if not os.path.exists(model_path):
-            raise FileNotFoundError(f"Model file not found: {model_path}")
-        model = joblib.load(model_path)
-        print(f"✅ Model loaded from: {model_path}")
-
-        # Load scaler
-        scaler_path = os.path.join(COMPETITION_DIR, 'competition_scaler.pkl')
-        if not os.path.exists(scaler_path):
-            raise FileNotFoundError(f"Scaler file not found: {scaler_path}")
-        scaler = joblib.load(scaler_path)
-        print(f"✅ Scaler loaded from: {scaler_path}")
-
-        # Load feature names
-        feature_names_path = os.path.join(COMPETITION_DIR, 'feature_names_competition.txt')
-        if not os.path.exists(feature_names_path):
-            raise FileNotFoundError(f"Feature names file not found: {feature_names_path}")
-        with open(feature_names_path, 'r') as f:
-            feature_names = [line.strip() for line in f.readlines()]
-        print(f"✅ Feature names loaded: {len(feature_names)} features")
-
-        # Load category label encoder
-        label_encoder_kategori_path = os.path.join(COMPETITION_DIR, 'label_encoder_kategori.pkl')
-        if not os.path.exists(label_encoder_kategori_path):
-            raise FileNotFoundError(f"Category label encoder file not found: {label_encoder_kategori_path}")
-        label_encoder_kategori = joblib.load(label_encoder_kategori_path)
-        print(f"✅ Category label encoder loaded")
-
-        # Load target label encoder
-        target_encoder_path = os.path.join(COMPETITION_DIR, 'label_encoder_target.pkl')
-        if not os.path.exists(target_encoder_path):
-            raise FileNotFoundError(f"Target label encoder file not found: {target_encoder_path}")
-        le_target = joblib.load(target_encoder_path)
-        print(f"✅ Target label encoder loaded")
-
-        # Load target mapping
-        target_mapping_path = os.path.join(COMPETITION_DIR, 'target_mapping.json')
-        if not os.path.exists(target_mapping_path):
-            raise FileNotFoundError(f"Target mapping file not found: {target_mapping_path}")
-        with open(target_mapping_path, 'r') as f:
-            target_mapping = json.load(f)
-        print(f"✅ Target mapping loaded: {target_mapping}")
-
-        return {
-            'model': model,
-            'scaler': scaler,
-            'feature_names': feature_names,
-            'label_encoder_kategori': label_encoder_kategori,
-            'le_target': le_target,
-            'target_mapping': target_mapping
-        }
+        artifacts, timings = load_artifacts(COMPETITION_DIR)
     except FileNotFoundError as e:
         print(f"\n❌ {str(e)}")
         print("\nPlease make sure all model files exist in the correct location.")
         print(f"Expected model directory: {COMPETITION_DIR}")
         sys.exit(1)
+    except ImportError as e:
+        print(f"\n❌ Missing required package: {str(e)}")
+        print("\nPlease install the missing package using:")
+        print("pip install -r requirements.txt")
+        sys.exit(1)
     except Exception as e:
         print(f"\n❌ Error loading model components: {str(e)}")
         print("\nThis might be due to incompatible model files or corrupt data.")
         print("Make sure all model files are properly created and compatible with the current environment.")
         sys.exit(1)
 
+    print(f"✅ Model loaded from: {COMPETITION_DIR}")
+    print(f"✅ Feature names loaded: {len(artifacts['feature_names'])} features")
+    print(f"✅ Target mapping loaded: {artifacts['target_mapping']}")
+    if artifacts['flat_model_enabled']:
+        print("✅ Flattened ensemble engine enabled")
+    else:
+        print("ℹ️ Flattened ensemble not supported for this model, using predict_proba")
+
+    print("\n⏱️ Load times per component:")
+    for line in timings.report():
+        print(f"   {line}")
+    if timings_path:
+        timings.to_json(timings_path)
+        print(f"   Timings written to: {timings_path}")
+
+    return {
+        'model': artifacts['model'],
+        'scoring_model': artifacts['scoring_model'],
+        'flat_model_enabled': artifacts['flat_model_enabled'],
+        'scaler': artifacts['scaler'],
+        'feature_names': artifacts['feature_names'],
+        'label_encoder_kategori': artifacts['le_kategori'],
+        'le_target': artifacts['le_target'],
+        'target_mapping': artifacts['target_mapping'],
+        # Class id -> label, built once instead of per prediction/chunk
+        'target_mapping_inv': {v: k for k, v in artifacts['target_mapping'].items()},
+        # Business-rule thresholds from datasets/validation_stats.json ({} = built-in values)
+        'validation_thresholds': load_thresholds()
+    }
+
 def input_location_data(label_encoder_kategori):
     """Collect location data from user input."""
     print("\n=== FnB Business Location Data Input ===")
@@ -223,64 +213,21 @@ def input_location_data(label_encoder_kategori):
     return data
 
 def preprocess_data(data, components):
-    """Preprocess input data to match the model's expected features."""
-    # Create derived features
-    data['mall_per_capita'] = data['jumlah_mall'] / data['Jumlah Penduduk'] * 1000  # per 1000 residents
-    data['minimarket_density'] = data['jumlah_minimarket'] / data['Luas Wilayah (km²)']
-    data['taman_per_capita'] = data['jumlah_taman'] / data['Jumlah Penduduk'] * 1000  # per 1000 residents
-    data['ulasan_per_capita'] = data['jumlah_ulasan'] / data['Jumlah Penduduk'] * 1000  # per 1000 residents
-    
-    # Competition and market metrics - CORRECTED FORMULAS FROM TRAINING
-    data['competition_density'] = data['jumlah_ulasan'] / data['Luas Wilayah (km²)']
-    data['market_potential'] = data['Kepadatan (jiwa/km²)'] * (data['jumlah_mall'] + data['jumlah_minimarket'])
-    data['infrastructure_score'] = data['jumlah_mall'] + data['jumlah_minimarket'] + data['jumlah_taman']
-    data['retail_accessibility'] = data['jumlah_mall'] + data['jumlah_minimarket']
-    
-    # Normalize and log transform features
-    data['rating_normalized'] = data['google_rating'] / 5.0
-    data['log_jumlah_ulasan'] = np.log1p(data['jumlah_ulasan'])
-    data['log_kepadatan'] = np.log1p(data['Kepadatan (jiwa/km²)'])
-    
-    # Encode categorical variables
-    data['kategori_resto_encoded'] = components['label_encoder_kategori'].transform([data['kategori_resto']])[0]
-    data['price_range_encoded'] = data['price_range'] - 1  # Assuming 1-4 range becomes 0-3
-    
-    # Binary features
-    data['high_rating'] = 1 if data['google_rating'] >= 4.0 else 0
-    data['excellent_rating'] = 1 if data['google_rating'] >= 4.5 else 0
-    data['high_volume_reviews'] = 1 if data['jumlah_ulasan'] >= 100 else 0
-    data['very_high_volume_reviews'] = 1 if data['jumlah_ulasan'] >= 500 else 0
-    
-    # Interaction features
-    data['price_category_interaction'] = data['price_range_encoded'] * data['kategori_resto_encoded']
-    data['rating_review_interaction'] = data['rating_normalized'] * data['log_jumlah_ulasan']
-    data['density_infrastructure'] = data['log_kepadatan'] * data['infrastructure_score']
-    
-    # Create DataFrame with feature names to avoid warnings
-    feature_data = {}
-    for feature in components['feature_names']:
-        feature_data[feature] = [data.get(feature, 0)]  # Default to 0 if feature is missing
-    
-    # Create DataFrame to maintain feature names
-    X_df = pd.DataFrame(feature_data)
-    
-    # Scale features using DataFrame to preserve feature names
-    X_scaled = components['scaler'].transform(X_df)
-    
-    return X_scaled, X_df
+    """Prepare raw input data as a single row for the shared batch scoring path."""
+    row = dict(data)
+    row['kategori_resto_encoded'] = components['label_encoder_kategori'].transform([data['kategori_resto']])[0]
+    return row
 
-def predict_and_visualize(X_df, components, input_data):
+def predict_and_visualize(row, components, input_data):
     """Make prediction and visualize results."""
-    model = components['model']
-    le_target = components['le_target']
-    target_mapping_inv = {v: k for k, v in components['target_mapping'].items()}
-    
-    # Get prediction probabilities using DataFrame to maintain feature names
-    probas = model.predict_proba(X_df)[0]
+    target_mapping_inv = components['target_mapping_inv']
     
-    # Get predicted class
-    predicted_class_idx = np.argmax(probas)
-    predicted_class = target_mapping_inv[predicted_class_idx]
+    # Score through the same batch path used by the Streamlit app (N=1)
+    predictions, probas = predict_batch(
+        row, components['scoring_model'], components['scaler'], components['feature_names']
+    )
+    probas = probas[0]
+    predicted_class = target_mapping_inv[predictions[0]]
     
     # Class names for visualization
     class_names = [target_mapping_inv[i] for i in range(len(probas))]
@@ -292,7 +239,8 @@ def predict_and_visualize(X_df, components, input_data):
     for i, class_name in enumerate(class_names):
         print(f"- {class_name}: {probas[i]:.2%}")
     
-    # Create and save visualization
+    # Create and save visualization (matplotlib is only imported when plotting)
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(10, 6))
     
     # Bar chart of probabilities
@@ -342,14 +290,164 @@ def predict_and_visualize(X_df, components, input_data):
     # Show the plot
     plt.show()
 
-def main():
+class PredictionWriter:
+    """Append scored chunks to a CSV or Parquet output file."""
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.extension = os.path.splitext(output_path)[1].lower()
+        if self.extension not in ('.csv', '.parquet', '.pq'):
+            raise ValueError(f"Unsupported output format: {output_path} (expected .csv or .parquet)")
+        self._parquet_writer = None
+        self._header_written = False
+
+    def write(self, df):
+        if self.extension == '.csv':
+            df.to_csv(self.output_path, mode='a' if self._header_written else 'w',
+                      header=not self._header_written, index=False)
+            self._header_written = True
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.output_path, table.schema)
+            self._parquet_writer.write_table(table)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+def score_chunk(chunk, components):
+    """Score one DataFrame chunk and return it with prediction and probability columns."""
+    if 'kategori_resto_encoded' not in chunk.columns:
+        if 'kategori_resto' not in chunk.columns:
+            raise KeyError("Input must contain a 'kategori_resto' or 'kategori_resto_encoded' column")
+        chunk = chunk.assign(
+            kategori_resto_encoded=components['label_encoder_kategori'].transform(chunk['kategori_resto'])
+        )
+
+    predictions, probas = predict_batch(
+        chunk, components['scoring_model'], components['scaler'], components['feature_names']
+    )
+
+    target_mapping_inv = components['target_mapping_inv']
+    class_names = [target_mapping_inv[c] for c in components['scoring_model'].classes_]
+    result = chunk.copy()
+    result['predicted_label'] = pd.Series(predictions, index=result.index).map(target_mapping_inv)
+    for i, class_name in enumerate(class_names):
+        result[f'prob_{class_name}'] = probas[:, i]
+
+    # Same business rules as the app, as a bitmask per row (see business_rules.RULE_CODES)
+    violations = evaluate_rules(chunk['jumlah_ulasan'].to_numpy(), chunk['google_rating'].to_numpy(),
+                                chunk['Jumlah Penduduk'].to_numpy(), components.get('validation_thresholds'))
+    result['business_rule_codes'] = violations.codes
+    result['business_rule_error'] = violations.has_errors
+    return result
+
+def score_file(input_path, output_path, components, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Score every row of a CSV/Parquet file in chunks and write the results.
+
+    Memory stays bounded by chunk_size; no figures are created.
+
+    Returns:
+        tuple: (rows scored, elapsed seconds)
+    """
+    writer = PredictionWriter(output_path)
+    total_rows = 0
+    flagged_rows = 0
+    start_time = time.perf_counter()
+    try:
+        for chunk in iter_chunks(input_path, chunk_size):
+            scored = score_chunk(chunk, components)
+            writer.write(scored)
+            total_rows += len(chunk)
+            flagged_rows += int(scored['business_rule_error'].sum())
+            print(f"   Scored {total_rows:,} rows ({flagged_rows:,} fail the business rules)...")
+    finally:
+        writer.close()
+    return total_rows, time.perf_counter() - start_time
+
+def run_batch_mode(args):
+    """Non-interactive scoring of an input file, suitable for pipelines."""
+    components = load_model_and_components(args.timings_json)
+    print(f"\n📂 Scoring {args.input} in chunks of {args.chunk_size:,} rows")
+    total_rows, elapsed = score_file(args.input, args.output, components, args.chunk_size)
+    rate = total_rows / elapsed if elapsed > 0 else float('inf')
+    print(f"\n✅ Predictions written to: {args.output}")
+    print(f"📈 {total_rows:,} rows in {elapsed:.2f}s ({rate:,.0f} rows/second)")
+
+def parse_list(value, cast):
+    """Parse a comma-separated command line value."""
+    return [cast(item.strip()) for item in value.split(',') if item.strip()]
+
+def run_sweep_mode(args):
+    """Score every kecamatan x category x price range x rating x review combination."""
+    components = load_model_and_components(args.timings_json)
+    with open(KECAMATAN_DATA_PATH, 'r', encoding='utf-8') as f:
+        kecamatan_table = build_kecamatan_table(json.load(f))
+    
+    kategori_classes = list(components['label_encoder_kategori'].classes_)
+    if args.kategori:
+        kategori_classes = parse_list(args.kategori, str)
+    
+    start_time = time.perf_counter()
+    results = scan_grid(
+        kecamatan_table, kategori_classes, components['scoring_model'], components['scaler'],
+        components['target_mapping'], price_ranges=parse_list(args.price_ranges, int),
+        ratings=parse_list(args.ratings, float), reviews=parse_list(args.reviews, int),
+        kategori_encoder=components['label_encoder_kategori']
+    )
+    elapsed = time.perf_counter() - start_time
+    
+    print(f"\n=== Sweep Results ({len(results):,} combinations in {elapsed:.3f}s) ===")
+    print(results.head(args.top).to_string(index=False))
+    
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"\n✅ Full ranked table written to: {args.output}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="FnB Business Success Predictor")
+    parser.add_argument('--input', help="CSV or Parquet file of candidate locations to score non-interactively")
+    parser.add_argument('--output', help="Output file for predictions (required with --input, optional CSV with --sweep)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Rows scored per chunk in batch mode (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--sweep', action='store_true',
+                        help="Rank every kecamatan for the given categories, price ranges, ratings and reviews")
+    parser.add_argument('--kategori', help="Comma-separated categories to sweep (default: all)")
+    parser.add_argument('--price-ranges', default='1,2,3,4', help="Comma-separated price ranges to sweep")
+    parser.add_argument('--ratings', default='4.0,4.2,4.4,4.6', help="Comma-separated target ratings to sweep")
+    parser.add_argument('--reviews', default='50,100,200,500', help="Comma-separated target review counts to sweep")
+    parser.add_argument('--top', type=int, default=20, help="Rows of the ranked sweep table to print")
+    parser.add_argument('--timings-json', help="Write per-component import/load times to this JSON file")
+    args = parser.parse_args(argv)
+    if args.sweep and args.input:
+        parser.error("--sweep cannot be combined with --input")
+    if args.input and not args.output:
+        parser.error("--output is required when --input is given")
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be positive")
+    return args
+
+def main(argv=None):
     """Main function to run the prediction process."""
+    args = parse_args(argv)
+    if args.input:
+        run_batch_mode(args)
+        return
+    if args.sweep:
+        run_sweep_mode(args)
+        return
+    
     print("=" * 60)
     print("   FnB Business Success Predictor based on Strategic Location   ")
     print("=" * 60)
     
     # Load model and components
-    components = load_model_and_components()
+    components = load_model_and_components(args.timings_json)
     label_encoder_kategori = components['label_encoder_kategori']
     
     # Ask user if they want to use sample data
@@ -414,10 +512,10 @@ def main():
             input_data = input_location_data(label_encoder_kategori)
     
     # Preprocess data
-    X_scaled, X_df = preprocess_data(input_data, components)
+    row = preprocess_data(input_data, components)
     
     # Make prediction and visualize
-    predict_and_visualize(X_df, components, input_data)
+    predict_and_visualize(row, components, input_data)
     
     print("\nThank you for using the FnB Business Success Predictor!")
 
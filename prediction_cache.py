@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Memoized prediction cache for the FnB Business Success app.
+
+Caches make_prediction results keyed on the normalized input tuple
+(kecamatan, kategori, price_range, rating, ulasan) with LRU eviction, a
+time-to-live, hit/miss counters, and automatic invalidation whenever a file
+in the model directory changes (size or modification time).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Defaults used by the Streamlit app
+DEFAULT_MAXSIZE = 1024
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_CHECK_INTERVAL_SECONDS = 1.0
+
+
+def model_dir_fingerprint(model_dir):
+    """Return a hashable fingerprint of every file in model_dir (name, size, mtime)."""
+    entries = []
+    with os.scandir(model_dir) as it:
+        for entry in it:
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((entry.name, stat.st_size, stat.st_mtime_ns))
+    return tuple(sorted(entries))
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU + TTL cache for prediction results.
+
+    Args:
+        maxsize: Maximum number of cached predictions before LRU eviction.
+        ttl: Seconds an entry stays valid; None disables expiry.
+        model_dir: Directory whose files invalidate the cache when they change.
+        check_interval: Minimum seconds between model directory checks.
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL_SECONDS, model_dir=None,
+                 check_interval=DEFAULT_CHECK_INTERVAL_SECONDS, clock=time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.model_dir = model_dir
+        self.check_interval = check_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._fingerprint = model_dir_fingerprint(model_dir) if model_dir else None
+        self._last_check = clock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(kecamatan, kategori, price_range, rating, ulasan):
+        """
+        Normalize prediction inputs; rating is rounded to the UI's 0.1 step.
+
+        Names are only stripped, not case-folded: make_prediction looks them
+        up exactly, so the key must not map an unknown name onto a known one.
+        """
+        return (str(kecamatan).strip(), str(kategori).strip(), int(price_range),
+                round(float(rating), 1), int(ulasan))
+
+    def refresh_if_models_changed(self, force=False):
+        """
+        Clear the cache if the model directory changed since the last check.
+
+        Returns:
+            bool: True if the cache was invalidated.
+        """
+        if not self.model_dir:
+            return False
+        now = self._clock()
+        with self._lock:
+            if not force and now - self._last_check < self.check_interval:
+                return False
+            self._last_check = now
+            fingerprint = model_dir_fingerprint(self.model_dir)
+            if fingerprint == self._fingerprint:
+                return False
+            self._fingerprint = fingerprint
+            self._entries.clear()
+            self.invalidations += 1
+            return True
+
+    def get(self, key):
+        """Return (True, value) on a hit, (False, None) on a miss."""
+        self.refresh_if_models_changed()
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or now < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries beyond maxsize."""
+        expires_at = self._clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss."""
+        found, value = self.get(key)
+        if found:
+            return value
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
@@ -0,0 +1,391 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+HTTP prediction service for the FnB Business Success model.
+
+A standard-library JSON API for systems that need predictions without the
+Streamlit app:
+
+    GET  /health          status, pool size and micro-batching counters
+    GET  /options         valid kecamatan, kategori_resto, price_range and rating/ulasan bounds
+    POST /predict         one prediction, same semantics as app.make_prediction
+    POST /predict/batch   {"rows": [...]} scored together
+
+Single predictions go through a MicroBatcher (micro_batching.py): requests
+that arrive within --max-wait-ms of each other are scored as one matrix
+with one predict_proba call. Scoring runs on a process pool whose workers
+load the models/competition artifacts once at start-up (--workers 0 scores
+in the server process instead). Validation and label encoding happen in
+the server process, so invalid inputs never reach the pool.
+
+Usage:
+    python prediction_service.py --port 8000 --workers 2
+    curl -s localhost:8000/predict -d '{"kecamatan": "coblong", "kategori_resto": "Cafe",
+        "target_rating": 4.5, "target_ulasan": 200, "price_range": 2}'
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from artifact_loader import load_artifacts
+from business_rules import validate_business_logic
+from fnb_features import build_kecamatan_table, check_feature_names
+from fnb_scoring import score_kecamatan_rows
+from micro_batching import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_SECONDS, MicroBatcher
+from validation_stats import load_thresholds
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(ROOT_DIR, 'models', 'competition')
+KECAMATAN_DATA_PATH = os.path.join(ROOT_DIR, 'bandung_kecamatan_data.json')
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+DEFAULT_WORKERS = 2
+
+PRICE_RANGES = (1, 2, 3, 4)
+# Same limits as the app's input widgets; the model never saw values outside them
+RATING_RANGE = (1.0, 5.0)
+MIN_ULASAN = 0
+REQUEST_FIELDS = ('kecamatan', 'kategori_resto', 'target_rating', 'target_ulasan', 'price_range')
+
+# Upper bounds on one request
+MAX_BATCH_ROWS = 10_000
+MAX_BODY_BYTES = 4 * 1024 * 1024
+
+# Artifacts of this worker process (set by _init_worker)
+_worker_assets = None
+
+
+def load_service_assets(model_dir=MODEL_DIR, kecamatan_path=KECAMATAN_DATA_PATH):
+    """Load the scoring artifacts and the precomputed kecamatan table."""
+    artifacts, timings = load_artifacts(model_dir)
+    check_feature_names(artifacts['feature_names'])
+    with open(kecamatan_path, 'r', encoding='utf-8') as f:
+        kecamatan_table = build_kecamatan_table(json.load(f))
+    artifacts.update({'kecamatan_table': kecamatan_table, 'load_timings': timings.as_dict()})
+    return artifacts
+
+
+def score_rows(assets, rows):
+    """Probabilities (N, n_classes) for encoded rows (see fnb_scoring.score_kecamatan_rows)."""
+    _, probabilities = score_kecamatan_rows(assets['kecamatan_table'], rows, assets['scoring_model'],
+                                            assets['scaler'])
+    return probabilities
+
+
+def _init_worker(model_dir, kecamatan_path):
+    global _worker_assets
+    _worker_assets = load_service_assets(model_dir, kecamatan_path)
+
+
+def _score_in_worker(rows):
+    return score_rows(_worker_assets, rows)
+
+
+def _worker_ready():
+    return os.getpid()
+
+
+def _number(payload, field, kind, min=None, max=None):
+    value = payload[field]
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"'{field}' must be a number")
+    if not math.isfinite(value):
+        raise ValueError(f"'{field}' must be finite")
+    if kind is int and value != int(value):
+        raise ValueError(f"'{field}' must be an integer")
+    if min is not None and value < min:
+        raise ValueError(f"'{field}' must be at least {min}")
+    if max is not None and value > max:
+        raise ValueError(f"'{field}' must be at most {max}")
+    return int(value) if kind is int else float(value)
+
+
+class PredictionService:
+    """
+    Validation, encoding and (micro-)batched scoring behind the HTTP API.
+
+    Args:
+        model_dir: Directory with the model artifacts.
+        kecamatan_path: bandung_kecamatan_data.json.
+        workers: Scoring processes; 0 scores in this process.
+        max_batch_size: Largest micro-batch of single predictions.
+        max_wait: Seconds a micro-batch waits for more requests.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, kecamatan_path=KECAMATAN_DATA_PATH, workers=DEFAULT_WORKERS,
+                 max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait=DEFAULT_MAX_WAIT_SECONDS):
+        if workers < 0:
+            raise ValueError("workers must not be negative")
+        self.model_dir = model_dir
+        self.workers = workers
+        self.assets = load_service_assets(model_dir, kecamatan_path)
+        kecamatan_table = self.assets['kecamatan_table']
+        self.kecamatan_names = sorted(kecamatan_table['names'])
+        self.kategori_codes = {kategori: code for code, kategori in enumerate(self.assets['le_kategori'].classes_)}
+        self.class_labels = [label for label, _ in sorted(self.assets['target_mapping'].items(),
+                                                          key=lambda item: item[1])]
+        # Validation runs in this process only, so the workers don't need them
+        self.thresholds = load_thresholds()
+
+        self.pool = None
+        if workers:
+            # spawn: the server already runs threads, which fork() does not copy safely
+            self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=_init_worker, initargs=(model_dir, kecamatan_path))
+            # One task per worker so every worker loads its artifacts before the first request
+            for future in [self.pool.submit(_worker_ready) for _ in range(workers)]:
+                future.result()
+
+        self.batcher = MicroBatcher(self._score_async, max_batch_size=max_batch_size, max_wait=max_wait,
+                                    max_in_flight=max(1, workers), name='prediction-batcher')
+        self._lock = threading.Lock()
+        self.counters = {'predictions': 0, 'rejected': 0, 'batch_requests': 0, 'batch_rows': 0}
+
+    def _count(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self.counters[key] += value
+
+    def _score_async(self, rows):
+        rows = np.asarray(rows, dtype=np.float64)
+        if self.pool is None:
+            return score_rows(self.assets, rows)
+        return self.pool.submit(_score_in_worker, rows)
+
+    def _score_now(self, rows):
+        """Score a batch request directly, split across the pool's workers."""
+        if self.pool is None or len(rows) <= self.batcher.max_batch_size:
+            result = self._score_async(rows)
+            return result.result() if isinstance(result, Future) else result
+        parts = np.array_split(np.asarray(rows, dtype=np.float64), min(self.workers, len(rows)))
+        futures = [self.pool.submit(_score_in_worker, part) for part in parts]
+        return np.concatenate([future.result() for future in futures])
+
+    def encode(self, payload):
+        """
+        Validate one request and encode it as a scoring row.
+
+        Returns:
+            tuple: (row or None if the business rules reject it, warnings, errors)
+
+        Raises:
+            ValueError: If a field is missing, has the wrong type or an unknown value.
+        """
+        if not isinstance(payload, dict):
+            raise ValueError("request must be a JSON object")
+        missing = [field for field in REQUEST_FIELDS if field not in payload]
+        if missing:
+            raise ValueError(f"missing field(s): {', '.join(missing)}")
+
+        kecamatan_table = self.assets['kecamatan_table']
+        kecamatan = payload['kecamatan']
+        if kecamatan not in kecamatan_table['index']:
+            raise ValueError(f"unknown kecamatan: {kecamatan!r}")
+        kategori = payload['kategori_resto']
+        if kategori not in self.kategori_codes:
+            raise ValueError(f"unknown kategori_resto: {kategori!r}")
+        target_rating = _number(payload, 'target_rating', float, min=RATING_RANGE[0], max=RATING_RANGE[1])
+        target_ulasan = _number(payload, 'target_ulasan', int, min=MIN_ULASAN)
+        price_range = _number(payload, 'price_range', int)
+        if price_range not in PRICE_RANGES:
+            raise ValueError(f"price_range must be one of {list(PRICE_RANGES)}")
+
+        warnings, errors = validate_business_logic(target_ulasan, target_rating,
+                                                   kecamatan_table['records'][kecamatan], self.thresholds)
+        if errors:
+            return None, warnings, errors
+        row = (kecamatan_table['index'][kecamatan], target_rating, target_ulasan,
+               self.kategori_codes[kategori], price_range)
+        return row, warnings, errors
+
+    def format_result(self, probabilities, warnings, errors):
+        """Response body for one prediction (label None when rejected)."""
+        if probabilities is None:
+            return {'label': None, 'confidence': None, 'probabilities': None,
+                    'warnings': warnings, 'errors': errors}
+        probabilities = [float(p) for p in probabilities]
+        best = int(np.argmax(probabilities))
+        return {
+            'label': self.class_labels[best],
+            'confidence': probabilities[best],
+            'probabilities': dict(zip(self.class_labels, probabilities)),
+            'warnings': warnings,
+            'errors': errors,
+        }
+
+    def make_prediction(self, payload):
+        """One prediction, micro-batched with concurrent callers."""
+        row, warnings, errors = self.encode(payload)
+        if row is None:
+            self._count(rejected=1)
+            return self.format_result(None, warnings, errors)
+        probabilities = self.batcher(row)
+        self._count(predictions=1)
+        return self.format_result(probabilities, warnings, errors)
+
+    def predict_batch(self, payloads):
+        """Score a list of requests together; rejected rows keep their errors."""
+        if not isinstance(payloads, list):
+            raise ValueError("'rows' must be a list")
+        if len(payloads) > MAX_BATCH_ROWS:
+            raise ValueError(f"at most {MAX_BATCH_ROWS} rows per request")
+        encoded = []
+        for i, payload in enumerate(payloads):
+            try:
+                encoded.append(self.encode(payload))
+            except ValueError as e:
+                raise ValueError(f"rows[{i}]: {e}") from None
+
+        rows = [row for row, _, _ in encoded if row is not None]
+        probabilities = iter(self._score_now(rows) if rows else [])
+        results = [self.format_result(next(probabilities) if row is not None else None, warnings, errors)
+                   for row, warnings, errors in encoded]
+        self._count(batch_requests=1, batch_rows=len(payloads), rejected=len(payloads) - len(rows))
+        return results
+
+    def options(self):
+        return {
+            'kecamatan': self.kecamatan_names,
+            'kategori_resto': list(self.kategori_codes),
+            'price_range': list(PRICE_RANGES),
+            'target_rating': list(RATING_RANGE),
+            'target_ulasan_min': MIN_ULASAN,
+            'labels': self.class_labels,
+        }
+
+    def health(self):
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            'status': 'ok',
+            'model_dir': self.model_dir,
+            'workers': self.workers,
+            'flat_model_enabled': self.assets['flat_model_enabled'],
+            'micro_batching': self.batcher.stats(),
+            'counters': counters,
+        }
+
+    def close(self):
+        self.batcher.close()
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+class PredictionRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints; the service is taken from the server."""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FnBPredictionService/1.0'
+    # Headers and body are written separately; without TCP_NODELAY the body
+    # waits for the client's delayed ACK (~40 ms per keep-alive request)
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length < 0:
+            # rfile.read(-1) would block until the client closes the connection
+            raise ValueError("invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise ValueError(f"request body larger than {MAX_BODY_BYTES} bytes")
+        try:
+            return json.loads(self.rfile.read(length) or b'null')
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON: {e}") from None
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == '/health':
+            self._send_json(200, service.health())
+        elif self.path == '/options':
+            self._send_json(200, service.options())
+        else:
+            self._send_json(404, {'error': f"unknown path: {self.path}"})
+
+    def do_POST(self):
+        service = self.server.service
+        try:
+            body = self._read_json()
+            if self.path == '/predict':
+                result = service.make_prediction(body)
+                self._send_json(422 if result['errors'] else 200, result)
+            elif self.path == '/predict/batch':
+                if not isinstance(body, dict) or 'rows' not in body:
+                    raise ValueError("request must be a JSON object with a 'rows' list")
+                self._send_json(200, {'results': service.predict_batch(body['rows'])})
+            else:
+                self._send_json(404, {'error': f"unknown path: {self.path}"})
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+        except Exception as e:
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class PredictionHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server bound to one PredictionService."""
+
+    daemon_threads = True
+    # socketserver's default backlog of 5 drops connections under load
+    request_queue_size = 128
+
+    def __init__(self, address, service, verbose=False):
+        super().__init__(address, PredictionRequestHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP JSON API for FnB Business Success predictions")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"Scoring processes, 0 = score in the server process (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help=f"Largest micro-batch of /predict requests (default: {DEFAULT_MAX_BATCH_SIZE})")
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_SECONDS * 1000,
+                        help=f"Micro-batch collection window in ms (default: {DEFAULT_MAX_WAIT_SECONDS * 1000:g})")
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args(argv)
+
+    service = PredictionService(args.model_dir, workers=args.workers, max_batch_size=args.max_batch_size,
+                                max_wait=args.max_wait_ms / 1000)
+    server = PredictionHTTPServer((args.host, args.port), service, verbose=args.verbose)
+    print(f"✅ Serving predictions on http://{args.host}:{server.server_port} "
+          f"({args.workers} worker(s), batch ≤{args.max_batch_size}, wait {args.max_wait_ms:g} ms)", flush=True)
+    # SIGTERM shuts down like Ctrl+C so the worker processes are not orphaned
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+KLL streaming quantile sketch (Karnin, Lang & Liberty, 2016).
+
+Keeps a hierarchy of compactors; level h holds items of weight 2**h. When
+the sketch is full, the lowest over-capacity level is sorted and every
+other item (random offset) is promoted to the next level. Memory stays
+O(k) regardless of the stream length, sketches of separate chunks can be
+merged, and the rank error is about 1.7 / k with high probability
+(~0.9% for the default k=200).
+"""
+
+import math
+import random
+
+import numpy as np
+
+DEFAULT_K = 200
+CAPACITY_DECAY = 2.0 / 3.0
+
+
+class KLLSketch:
+    """
+    Mergeable streaming quantile sketch for float values.
+
+    Args:
+        k: Capacity of the top compactor; larger k = more accurate, more memory.
+        seed: Seed for the compaction offsets (None = nondeterministic).
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=None):
+        if k < 2:
+            raise ValueError("k must be at least 2")
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._random = random.Random(seed)
+        self._levels = [np.empty(0)]
+        self._max_size = self._capacity(0)
+
+    def _capacity(self, level):
+        depth = len(self._levels) - level - 1
+        return int(math.ceil(self.k * CAPACITY_DECAY ** depth)) + 1
+
+    def _grow(self):
+        self._levels.append(np.empty(0))
+        self._max_size = sum(self._capacity(level) for level in range(len(self._levels)))
+
+    @property
+    def size(self):
+        """Number of items retained."""
+        return sum(len(items) for items in self._levels)
+
+    def _compress(self):
+        while self.size >= self._max_size:
+            for level, items in enumerate(self._levels):
+                if len(items) >= self._capacity(level):
+                    if level + 1 == len(self._levels):
+                        self._grow()
+                    items = np.sort(items)
+                    # With an odd count the smallest item stays behind
+                    keep, pairs = items[:len(items) % 2], items[len(items) % 2:]
+                    promoted = pairs[self._random.getrandbits(1)::2]
+                    self._levels[level] = keep
+                    self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+                    break
+
+    def update(self, values):
+        """Add a scalar or an array of values (NaNs are ignored)."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        """Fold another sketch into this one."""
+        while len(self._levels) < len(other._levels):
+            self._grow()
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _weighted(self):
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level, dtype=np.float64)
+                                  for level, items in enumerate(self._levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        """Approximate quantiles for the probabilities in qs (NaN if empty)."""
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        values, cumulative = self._weighted()
+        positions = np.searchsorted(cumulative, qs * cumulative[-1], side='left')
+        result = values[np.minimum(positions, len(values) - 1)]
+        # The exact extremes are tracked separately
+        result = np.where(qs <= 0, self.min, result)
+        return np.where(qs >= 1, self.max, result)
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def rank(self, value):
+        """Approximate fraction of items <= value."""
+        if self.n == 0:
+            return math.nan
+        values, cumulative = self._weighted()
+        position = np.searchsorted(values, value, side='right')
+        return float(cumulative[position - 1] / cumulative[-1]) if position else 0.0
+
+    def to_dict(self):
+        """JSON-serializable state."""
+        return {
+            'k': self.k,
+            'n': self.n,
+            'min': self.min if self.n else None,
+            'max': self.max if self.n else None,
+            'levels': [items.tolist() for items in self._levels],
+        }
+
+    @classmethod
+    def from_dict(cls, state, seed=None):
+        sketch = cls(k=state['k'], seed=seed)
+        for _ in range(len(state['levels']) - 1):
+            sketch._grow()
+        sketch._levels = [np.asarray(items, dtype=np.float64) for items in state['levels']]
+        sketch.n = state['n']
+        if state['n']:
+            sketch.min, sketch.max = state['min'], state['max']
+        return sketch
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Concurrent query cascade helpers for the Google Maps enrichment scripts.
+
+search_place_details and cari_alamat_taman try several query variants in
+priority order until one returns a hit. first_hit() sends the variants
+concurrently but keeps the serial cascade's answer: the hit from the
+highest-priority variant wins, and variants that have not started yet
+are cancelled as soon as the winner is known. dedupe_keys() collapses
+repeated businesses so each is resolved only once.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from api_cache import normalize_query
+
+DEFAULT_QUERY_WORKERS = 16
+
+# Variants in flight per lookup: lower-priority variants beyond the window
+# are only sent once a higher-priority one misses, which bounds wasted quota
+DEFAULT_QUERY_WINDOW = 2
+
+
+def first_hit(executor, candidates, call, is_hit, window=None):
+    """
+    Run call(candidate) concurrently; return the first hit in priority order.
+
+    At most `window` candidates are in flight ahead of the highest-priority
+    unresolved one (None = all at once, 1 = the serial cascade). Exceptions
+    count as misses, like in the serial cascade.
+
+    Returns:
+        tuple: (index of the winning candidate, its result), or (None, None).
+    """
+    window = len(candidates) if window is None else max(1, window)
+    futures = []
+
+    def submit_next():
+        if len(futures) < len(candidates):
+            futures.append(executor.submit(call, candidates[len(futures)]))
+
+    for _ in range(min(window, len(candidates))):
+        submit_next()
+    try:
+        for i in range(len(candidates)):
+            try:
+                result = futures[i].result()
+                hit = is_hit(result)
+            except Exception:
+                hit = False
+            if hit:
+                return i, result
+            submit_next()
+        return None, None
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def dedupe_keys(pairs):
+    """
+    Group identical (name, address) pairs after query normalization.
+
+    Returns:
+        tuple: (unique pairs in first-seen order, list mapping every input
+        position to its unique pair's position)
+    """
+    positions = {}
+    unique = []
+    inverse = []
+    for name, address in pairs:
+        key = (normalize_query(name), normalize_query(address))
+        if key not in positions:
+            positions[key] = len(unique)
+            unique.append((name, address))
+        inverse.append(positions[key])
+    return unique, inverse
+
+
+def make_query_executor(max_workers=DEFAULT_QUERY_WORKERS):
+    """Thread pool for query variants (separate from the row-level pool to avoid nested waits)."""
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='query')
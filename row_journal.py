@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Append-only JSONL journal for resumable per-row enrichment.
+
+Each processed row is appended as one JSON line; the file is flushed and
+fsync'd every `sync_every` records, so a checkpoint costs the same no matter
+how many rows are already done. On resume, replay_journal() rebuilds the
+row results (the last entry per key wins) and tolerates a torn last line
+left by a crash. truncate_torn_csv_record() does the same for append-only
+CSV outputs, whose records may span several lines.
+"""
+
+import json
+import os
+
+import numpy as np
+
+CSV_SCAN_BLOCK_BYTES = 4 * 1024 * 1024
+
+
+class RowJournal:
+    """
+    Append-only journal of row results.
+
+    Args:
+        path: JSONL file; appended to if it already exists.
+        sync_every: Records between flush + fsync.
+    """
+
+    def __init__(self, path, sync_every=50):
+        if sync_every <= 0:
+            raise ValueError("sync_every must be positive")
+        self.path = path
+        self.sync_every = sync_every
+        self._pending = 0
+        truncate_torn_tail(path)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def append(self, key, result):
+        """Record the result dict of one row (key must be JSON-serializable)."""
+        self._file.write(json.dumps({'key': key, 'result': result}, ensure_ascii=False, default=str) + '\n')
+        self._pending += 1
+        if self._pending >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        """Flush buffered records and fsync them to disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def truncate_torn_tail(path):
+    """Drop a partial last line so new records start on a fresh line."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        # Scan backwards in blocks for the last newline
+        end = size
+        while end > 0:
+            start = max(0, end - 4096)
+            f.seek(start)
+            block = f.read(end - start)
+            newline = block.rfind(b'\n')
+            if newline != -1:
+                last_newline = start + newline + 1
+                break
+            end = start
+        else:
+            last_newline = 0
+        if last_newline != size:
+            f.truncate(last_newline)
+
+
+def truncate_torn_csv_record(path):
+    """
+    Drop a partial last CSV record so appended records start cleanly.
+
+    A quoted field (e.g. a multi-line address) may contain newlines, so a
+    crash can cut the file after a newline that does not end a record. The
+    file is scanned from the start, tracking quote parity, and truncated
+    just past the last newline outside quotes.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        offset = 0
+        last_record_end = 0
+        inside_quotes = False
+        while True:
+            block = f.read(CSV_SCAN_BLOCK_BYTES)
+            if not block:
+                break
+            buf = np.frombuffer(block, dtype=np.uint8)
+            # Escaped quotes ("") flip the parity twice, so they cancel out
+            quote_parity = (np.cumsum(buf == ord('"')) + inside_quotes) & 1
+            newlines = np.flatnonzero((buf == ord('\n')) & (quote_parity == 0))
+            if len(newlines):
+                last_record_end = offset + int(newlines[-1]) + 1
+            inside_quotes = bool(quote_parity[-1])
+            offset += len(block)
+        if last_record_end != offset:
+            f.truncate(last_record_end)
+
+
+def replay_journal(path):
+    """
+    Read a journal back into {key: result}.
+
+    Returns an empty dict if the file does not exist. A malformed line can
+    only be the torn tail of an interrupted write, so it is skipped. Keys
+    written as tuples (JSON arrays) come back as tuples.
+    """
+    results = {}
+    if not os.path.exists(path):
+        return results
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            key = record['key']
+            results[tuple(key) if isinstance(key, list) else key] = record['result']
+    return results
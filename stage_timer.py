@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Per-stage timing of the prediction hot path.
+
+Code wraps each stage in `with stage('name'):`. While STAGE_TIMER is
+disabled (the default) stage() returns a shared no-op context manager, so
+the instrumentation costs one attribute check per stage. When enabled
+(FNB_STAGE_TIMING=1 or STAGE_TIMER.enabled = True), every duration goes
+into a per-stage histogram with fixed log-spaced buckets: memory does not
+grow with the number of requests, and p50/p95/p99 are interpolated within
+a bucket (relative error below the bucket growth factor, 25%).
+
+Histograms export as Prometheus text (one `histogram` metric with a
+`stage` label) or as a JSON-serializable dict.
+"""
+
+import bisect
+import contextlib
+import math
+import os
+import threading
+import time
+
+# Bucket upper bounds in seconds: 1 µs .. ~10 s, each 25% larger than the last
+BUCKET_GROWTH = 1.25
+BUCKET_BOUNDS = [1e-6 * BUCKET_GROWTH ** i for i in range(73)]
+
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+PROMETHEUS_METRIC = 'fnb_stage_duration_seconds'
+
+_NO_OP = contextlib.nullcontext()
+
+
+class StageHistogram:
+    """Bucketed durations of one stage (not thread-safe, see StageTimer)."""
+
+    def __init__(self, bounds=BUCKET_BOUNDS):
+        self.bounds = bounds
+        # One extra bucket for durations above the last bound (+Inf)
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Estimated q-quantile in seconds (NaN when empty)."""
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                if i == len(self.bounds):
+                    return self.max
+                lower = self.bounds[i - 1] if i else 0.0
+                estimate = lower + (self.bounds[i] - lower) * (rank - cumulative) / count
+                return min(max(estimate, self.min), self.max)
+            cumulative += count
+        return self.max
+
+
+class StageTimer:
+    """
+    Context-manager timers feeding per-stage histograms.
+
+    Args:
+        enabled: Record durations; when False, stage() is a no-op.
+        bounds: Histogram bucket upper bounds in seconds.
+    """
+
+    def __init__(self, enabled=False, bounds=BUCKET_BOUNDS):
+        self.enabled = enabled
+        self.bounds = bounds
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def stage(self, name):
+        """Context manager timing one execution of stage `name`."""
+        if not self.enabled:
+            return _NO_OP
+        return _Span(self, name)
+
+    def observe(self, name, seconds):
+        """Record a duration measured elsewhere."""
+        seconds = float(seconds)
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = StageHistogram(self.bounds)
+            histogram.observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def stages(self):
+        with self._lock:
+            return list(self._histograms)
+
+    def summary(self, quantiles=DEFAULT_QUANTILES):
+        """
+        Per-stage statistics in milliseconds, in first-seen stage order.
+
+        Returns:
+            list: One dict per stage with stage, count, mean_ms, p50_ms,
+            p95_ms, p99_ms (for the default quantiles) and max_ms.
+        """
+        rows = []
+        with self._lock:
+            for name, histogram in self._histograms.items():
+                row = {'stage': name, 'count': histogram.count, 'mean_ms': histogram.sum / histogram.count * 1000}
+                for q in quantiles:
+                    row[f'p{q * 100:g}_ms'] = histogram.quantile(q) * 1000
+                row['max_ms'] = histogram.max * 1000
+                rows.append(row)
+        return rows
+
+    def to_dict(self):
+        """JSON-serializable snapshot: summary plus raw bucket counts."""
+        with self._lock:
+            histograms = {
+                name: {'count': histogram.count, 'sum_seconds': histogram.sum, 'bucket_counts': list(histogram.counts)}
+                for name, histogram in self._histograms.items()
+            }
+        return {'enabled': self.enabled, 'bucket_bounds_seconds': list(self.bounds),
+                'stages': self.summary(), 'histograms': histograms}
+
+    def to_prometheus(self, metric=PROMETHEUS_METRIC):
+        """Prometheus text exposition format (cumulative `le` buckets)."""
+        lines = [f"# HELP {metric} Duration of prediction pipeline stages.", f"# TYPE {metric} histogram"]
+        with self._lock:
+            for name, histogram in self._histograms.items():
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                cumulative = 0
+                for bound, count in zip(self.bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{stage="{label}",le="{bound:.6g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{stage="{label}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{stage="{label}"}} {histogram.sum!r}')
+                lines.append(f'{metric}_count{{stage="{label}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+class _Span:
+    """One timed execution of a stage (cheaper than a generator context manager)."""
+
+    __slots__ = ('timer', 'name', 'start')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.timer.observe(self.name, time.perf_counter() - self.start)
+
+
+# Process-wide timer used by app.py and fnb_scoring.py
+STAGE_TIMER = StageTimer(enabled=os.environ.get('FNB_STAGE_TIMING') == '1')
+
+
+def stage(name):
+    """STAGE_TIMER.stage(name)."""
+    return STAGE_TIMER.stage(name)
@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dataset statistics behind the business-rule thresholds.
+
+business_rules.THRESHOLDS holds cut-offs from a one-off analysis of the
+enriched dataset (mean rating 4.51, review P90/P95/P99 958/2,819/5,025,
+at most 200 reviews for rating >= 4.8). ValidationStats recomputes them
+in one streaming pass: exact counts, sums and maxima plus a KLL sketch
+(quantile_sketch.py) of the review counts. The store remembers how many
+bytes of the source CSV it has consumed, so when enrichment rows are
+appended only the new records are read; if the consumed part changed,
+the store is rebuilt.
+
+The saved JSON has a fixed size (bounded by the sketch), so load_assets
+reads it in O(1) instead of rescanning the dataset.
+
+Usage:
+    python validation_stats.py update      # incremental, builds if missing
+    python validation_stats.py build       # full rescan
+    python validation_stats.py show
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from business_rules import THRESHOLDS
+from dataset_store import DATASETS, ROOT_DIR
+from quantile_sketch import KLLSketch
+
+DEFAULT_SOURCE = DATASETS['deployment']
+STATS_PATH = os.path.join(ROOT_DIR, 'datasets', 'validation_stats.json')
+
+# Rank error ~0.1%. Quantiles are sampled values, not interpolated: on the
+# current dataset P90/P95/P99 are 964/2,833/5,025 vs 958/2,819/5,025 exact
+# (rank error <= 0.04%); only the REVIEW_STEP-floored cut-offs match exactly
+STATS_SKETCH_K = 2000
+STATS_VERSION = 1
+
+# Review cut-offs are rounded down to a multiple of this (P95 2,819 -> 2,800)
+REVIEW_STEP = 50
+
+READ_BLOCK_BYTES = 4 * 1024 * 1024
+TAIL_HASH_BYTES = 4096
+
+STAT_COLUMNS = ['google_rating', 'jumlah_ulasan']
+
+
+def _relative(path):
+    path = os.path.abspath(path)
+    return os.path.relpath(path, ROOT_DIR) if path.startswith(ROOT_DIR + os.sep) else path
+
+
+def _record_end(data):
+    """
+    Offset just past the last newline in data that ends a CSV record.
+
+    data must start at a record boundary; newlines inside quoted fields
+    (addresses span several lines) are skipped by tracking quote parity.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    outside_quotes = (np.cumsum(buf == ord('"')) & 1) == 0
+    newlines = np.flatnonzero((buf == ord('\n')) & outside_quotes)
+    return int(newlines[-1]) + 1 if len(newlines) else 0
+
+
+def _tail_hash(f, offset):
+    start = max(0, offset - TAIL_HASH_BYTES)
+    f.seek(start)
+    return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+
+class ValidationStats:
+    """
+    Streaming rating/review statistics of one CSV source.
+
+    Args:
+        sketch_k: KLL capacity for the review-count quantiles.
+        high_rating: Rating from which the review cap is tracked.
+    """
+
+    def __init__(self, sketch_k=STATS_SKETCH_K, high_rating=THRESHOLDS['high_rating']):
+        self.high_rating = high_rating
+        self.rows = 0
+        self.rating_count = 0
+        self.rating_sum = 0.0
+        self.review_count = 0
+        self.review_sum = 0.0
+        self.reviews = KLLSketch(k=sketch_k, seed=0)
+        self.high_rating_rows = 0
+        self.high_rating_review_sum = 0.0
+        self.high_rating_review_max = -math.inf
+        # Consumed part of the source: path, header, byte offset, hash of the last bytes
+        self.source = None
+
+    def update(self, df):
+        """Fold one DataFrame chunk (google_rating, jumlah_ulasan columns) in."""
+        rating = pd.to_numeric(df['google_rating'], errors='coerce').to_numpy(dtype=np.float64)
+        ulasan = pd.to_numeric(df['jumlah_ulasan'], errors='coerce').to_numpy(dtype=np.float64)
+        self.rows += len(df)
+        valid_rating = rating[~np.isnan(rating)]
+        self.rating_count += len(valid_rating)
+        self.rating_sum += float(valid_rating.sum())
+        valid_ulasan = ulasan[~np.isnan(ulasan)]
+        self.review_count += len(valid_ulasan)
+        self.review_sum += float(valid_ulasan.sum())
+        self.reviews.update(valid_ulasan)
+
+        high = ulasan[(rating >= self.high_rating) & ~np.isnan(ulasan)]
+        if len(high):
+            self.high_rating_rows += len(high)
+            self.high_rating_review_sum += float(high.sum())
+            self.high_rating_review_max = max(self.high_rating_review_max, float(high.max()))
+
+    def consume(self, path, chunk_rows=50_000):
+        """
+        Read the records of path that were appended since the last call.
+
+        A torn last record (no terminating newline yet) is left for later.
+
+        Returns:
+            int: Rows added.
+
+        Raises:
+            ValueError: If the already consumed part of the file changed.
+        """
+        added = 0
+        with open(path, 'rb') as f:
+            if self.source is None:
+                header = f.readline()
+                self.source = {'path': _relative(path), 'header': header.decode('utf-8'),
+                               'offset': len(header), 'tail_sha1': _tail_hash(f, len(header))}
+                f.seek(len(header))
+            elif not self.source_matches(f):
+                raise ValueError(f"{path} changed before byte {self.source['offset']}; rebuild the statistics")
+
+            columns = pd.read_csv(io.StringIO(self.source['header']), nrows=0).columns.tolist()
+            offset = self.source['offset']
+            f.seek(offset)
+            pending = b''
+            while True:
+                block = f.read(READ_BLOCK_BYTES)
+                if not block:
+                    break
+                data = pending + block
+                end = _record_end(data)
+                if not end:
+                    pending = data
+                    continue
+                reader = pd.read_csv(io.BytesIO(data[:end]), header=None, names=columns,
+                                     usecols=STAT_COLUMNS, chunksize=chunk_rows)
+                for chunk in reader:
+                    self.update(chunk)
+                    added += len(chunk)
+                offset += end
+                pending = data[end:]
+            self.source['offset'] = offset
+            self.source['tail_sha1'] = _tail_hash(f, offset)
+        return added
+
+    def source_matches(self, f):
+        """True if the open source file still starts with the consumed bytes."""
+        size = f.seek(0, os.SEEK_END)
+        if size < self.source['offset']:
+            return False
+        f.seek(0)
+        if f.readline().decode('utf-8') != self.source['header']:
+            return False
+        return _tail_hash(f, self.source['offset']) == self.source['tail_sha1']
+
+    def summary(self):
+        """Current statistics (NaN where there is no data)."""
+        p50, p90, p95, p99 = self.reviews.quantiles([0.5, 0.9, 0.95, 0.99])
+        return {
+            'rows': self.rows,
+            'rating_mean': self.rating_sum / self.rating_count if self.rating_count else math.nan,
+            'reviews_mean': self.review_sum / self.review_count if self.review_count else math.nan,
+            'reviews_median': float(p50),
+            'reviews_p90': float(p90),
+            'reviews_p95': float(p95),
+            'reviews_p99': float(p99),
+            'high_rating_rows': self.high_rating_rows,
+            'high_rating_reviews_mean': (self.high_rating_review_sum / self.high_rating_rows
+                                         if self.high_rating_rows else math.nan),
+            'high_rating_reviews_max': self.high_rating_review_max if self.high_rating_rows else math.nan,
+        }
+
+    def thresholds(self):
+        """Overrides for business_rules.THRESHOLDS derived from the data ({} if empty)."""
+        if not self.review_count:
+            return {}
+        summary = self.summary()
+        thresholds = {
+            key: int(summary[key] // REVIEW_STEP * REVIEW_STEP) for key in ('reviews_p90', 'reviews_p95', 'reviews_p99')
+        }
+        if self.rating_count:
+            thresholds['rating_mean'] = round(summary['rating_mean'], 2)
+        if self.high_rating_rows:
+            thresholds['high_rating_review_cap'] = int(summary['high_rating_reviews_max'])
+            thresholds['high_rating_review_mean'] = int(round(summary['high_rating_reviews_mean']))
+        return thresholds
+
+    def to_dict(self):
+        return {
+            'version': STATS_VERSION,
+            'source': self.source,
+            'high_rating': self.high_rating,
+            'rows': self.rows,
+            'rating_count': self.rating_count,
+            'rating_sum': self.rating_sum,
+            'review_count': self.review_count,
+            'review_sum': self.review_sum,
+            'high_rating_rows': self.high_rating_rows,
+            'high_rating_review_sum': self.high_rating_review_sum,
+            'high_rating_review_max': self.high_rating_review_max if self.high_rating_rows else None,
+            # Precomputed so readers only need this key
+            'thresholds': self.thresholds(),
+            'reviews_sketch': self.reviews.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        if state.get('version') != STATS_VERSION:
+            raise ValueError(f"Unsupported statistics version: {state.get('version')}")
+        stats = cls(sketch_k=state['reviews_sketch']['k'], high_rating=state['high_rating'])
+        for key in ('rows', 'rating_count', 'rating_sum', 'review_count', 'review_sum',
+                    'high_rating_rows', 'high_rating_review_sum'):
+            setattr(stats, key, state[key])
+        if state['high_rating_review_max'] is not None:
+            stats.high_rating_review_max = state['high_rating_review_max']
+        stats.reviews = KLLSketch.from_dict(state['reviews_sketch'], seed=0)
+        stats.source = state['source']
+        return stats
+
+    def save(self, path=STATS_PATH):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=STATS_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def build_stats(source=DEFAULT_SOURCE, sketch_k=STATS_SKETCH_K):
+    """Full scan of source."""
+    stats = ValidationStats(sketch_k=sketch_k)
+    stats.consume(source)
+    return stats
+
+
+def refresh_stats(path=STATS_PATH, source=DEFAULT_SOURCE, save=True):
+    """
+    Bring the saved statistics up to date with source.
+
+    Returns:
+        tuple: (ValidationStats, status, rows read) where status is
+        'current', 'appended' or 'rebuilt'.
+    """
+    status = 'rebuilt'
+    try:
+        stats = ValidationStats.load(path)
+        if stats.source['path'] != _relative(source):
+            raise ValueError("different source")
+        rows = stats.consume(source)
+        status = 'appended' if rows else 'current'
+    except (OSError, ValueError, KeyError):
+        stats = build_stats(source)
+        rows = stats.rows
+    if save and status != 'current':
+        stats.save(path)
+    return stats, status, rows
+
+
+def load_thresholds(path=STATS_PATH, source=DEFAULT_SOURCE, refresh=True):
+    """
+    Threshold overrides for business_rules, for load_assets.
+
+    Reads the saved statistics; with refresh=True and a source that grew,
+    only the appended rows are read. Without a saved store (or readable
+    source) the built-in THRESHOLDS apply: {} is returned and nothing is
+    scanned.
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        stats = ValidationStats.load(path)
+        if refresh and os.path.exists(source) and os.path.getsize(source) != stats.source['offset']:
+            stats = refresh_stats(path, source)[0]
+    except (OSError, ValueError, KeyError):
+        return {}
+    return stats.thresholds()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rating/review statistics behind the business-rule thresholds")
+    parser.add_argument('command', choices=['update', 'build', 'show'])
+    parser.add_argument('--source', default=DEFAULT_SOURCE, help="Enriched dataset CSV")
+    parser.add_argument('--stats', default=STATS_PATH, help="Statistics JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        stats = build_stats(args.source)
+        stats.save(args.stats)
+        print(f"✅ {stats.rows:,} rows scanned -> {args.stats}")
+    elif args.command == 'update':
+        stats, status, rows = refresh_stats(args.stats, args.source)
+        print(f"✅ {status}: {rows:,} rows read, {stats.rows:,} total -> {args.stats}")
+    else:
+        stats = ValidationStats.load(args.stats)
+
+    for key, value in stats.summary().items():
+        print(f"  {key:<26} {value:,.2f}" if isinstance(value, float) else f"  {key:<26} {value:,}")
+    print("  thresholds:")
+    for key, value in stats.thresholds().items():
+        print(f"    {key:<24} {value}  (built-in: {THRESHOLDS.get(key)})")
+
+
+if __name__ == "__main__":
+    main()